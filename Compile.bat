@@ -24,6 +24,10 @@ set "DATA_1=%SCRIPT_DIR%\Icons;Icons"
 set "DATA_2=%SCRIPT_DIR%\fonts;fonts"
 set "DATA_3=%SCRIPT_DIR%\envelope;envelope"
 set "DATA_4=%SCRIPT_DIR%\LICENSE.txt;LICENSE.txt"
+REM Helper run by LibreOffice's own Python for the warm soffice pool
+set "DATA_5=%SCRIPT_DIR%\office_worker.py;."
+REM Resident Node worker for Envelope parsing
+set "DATA_6=%SCRIPT_DIR%\envelope_worker.js;."
 REM ===================================================================
 REM ================== SCRIPT EXECUTION (No Need to Edit) =============
 REM ===================================================================
@@ -83,6 +87,8 @@ echo Setting up hidden imports for PyInstaller...
 set "HIDDEN_IMPORTS="
 REM Add all required hidden imports based on your list.
 REM Standard libraries like os, sys, json, etc., are usually found automatically.
+REM GUI module is imported lazily by wormhole.py so headless runs skip tkinter
+set "HIDDEN_IMPORTS=!HIDDEN_IMPORTS! --hidden-import=wormhole_gui"
 set "HIDDEN_IMPORTS=!HIDDEN_IMPORTS! --hidden-import=customtkinter"
 set "HIDDEN_IMPORTS=!HIDDEN_IMPORTS! --hidden-import=tkinter"
 set "HIDDEN_IMPORTS=!HIDDEN_IMPORTS! --hidden-import=PIL"
@@ -145,6 +151,8 @@ if /I "%COMPILE_WORMHOLE%" == "YES" (
         --add-data "%DATA_2%" ^
         --add-data "%DATA_3%" ^
         --add-data "%DATA_4%" ^
+        --add-data "%DATA_5%" ^
+        --add-data "%DATA_6%" ^
         --distpath "%OUTPUT_DIR%" ^
         --workpath "%LOG_DIR%\build\%WORMHOLE_BUILD_NAME%" ^
         --specpath "%LOG_DIR%" ^
@@ -0,0 +1,210 @@
+// Long-lived Envelope worker used by Wormhole.
+//
+// Started as `node envelope_worker.js <path to envelope/test/test.js>`. Instead
+// of spawning Node for every file, Wormhole keeps a few of these running and
+// sends requests as JSON lines on stdin:
+//
+//     {"id": 1, "cmd": "parse", "path": "/abs/file.docx"}
+//     {"id": 2, "cmd": "ping"}
+//
+// For each parse request the Envelope test harness is re-run in this process
+// (its parser modules stay loaded between requests) and the `output.html` it
+// writes is captured in memory and sent back as {"id": 1, "ok": true, "html": ...}.
+// Replies are prefixed with MARKER; anything else is sent to stderr.
+'use strict';
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const readline = require('readline');
+const { Writable } = require('stream');
+const { pathToFileURL } = require('url');
+
+const MARKER = '@@wormhole ';
+const OUTPUT_NAME = 'output.html';
+const harness = path.resolve(process.argv[2]);
+
+// Keep stdout for protocol replies only.
+const writeStdout = process.stdout.write.bind(process.stdout);
+const toStderr = (...args) => process.stderr.write(args.map(String).join(' ') + '\n');
+console.log = console.info = console.debug = toStderr;
+process.stdout.write = (chunk, ...rest) => process.stderr.write(chunk, ...rest);
+
+function reply(message) {
+  writeStdout(MARKER + JSON.stringify(message) + '\n');
+}
+
+// Anything the harness doesn't capture lands in a private scratch directory.
+const workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'wormhole_envelope_'));
+process.chdir(workDir);
+
+let current = null;  // {resolve, reject} of the request being parsed
+let runCount = 0;
+
+function isOutput(file) {
+  return typeof file === 'string' && path.basename(file) === OUTPUT_NAME;
+}
+
+function finish(data) {
+  if (!current) return;
+  const { resolve } = current;
+  current = null;
+  resolve(Buffer.isBuffer(data) ? data.toString('utf8') : String(data));
+}
+
+function fail(error) {
+  if (!current) return;
+  const { reject } = current;
+  current = null;
+  reject(error instanceof Error ? error : new Error(String(error)));
+}
+
+// Capture output.html in memory instead of writing it to disk.
+const original = {
+  writeFileSync: fs.writeFileSync,
+  writeFile: fs.writeFile,
+  promisesWriteFile: fs.promises.writeFile,
+  createWriteStream: fs.createWriteStream,
+  exit: process.exit,
+};
+fs.writeFileSync = function (file, data, ...rest) {
+  if (current && isOutput(file)) return finish(data);
+  return original.writeFileSync.call(fs, file, data, ...rest);
+};
+fs.writeFile = function (file, data, ...rest) {
+  if (current && isOutput(file)) {
+    const callback = rest.find((arg) => typeof arg === 'function');
+    finish(data);
+    if (callback) process.nextTick(callback, null);
+    return undefined;
+  }
+  return original.writeFile.call(fs, file, data, ...rest);
+};
+fs.promises.writeFile = function (file, data, ...rest) {
+  if (current && isOutput(file)) {
+    finish(data);
+    return Promise.resolve();
+  }
+  return original.promisesWriteFile.call(fs.promises, file, data, ...rest);
+};
+fs.createWriteStream = function (file, ...rest) {
+  if (current && isOutput(file)) {
+    const chunks = [];
+    return new Writable({
+      write(chunk, encoding, callback) {
+        chunks.push(Buffer.from(chunk, encoding));
+        callback();
+      },
+      final(callback) {
+        finish(Buffer.concat(chunks));
+        callback();
+      },
+    });
+  }
+  return original.createWriteStream.call(fs, file, ...rest);
+};
+// The harness may call process.exit() when it is done; that must not end the
+// worker. Only closing stdin does. Exiting before output.html was written is
+// a failure whatever the exit code.
+process.exit = function (code) {
+  if (code) fail(new Error(`Envelope parser exited with code ${code}`));
+  else fail(new Error('Envelope parser did not produce output.html'));
+};
+process.on('uncaughtException', fail);
+process.on('unhandledRejection', fail);
+
+function isEsModule(file) {
+  if (file.endsWith('.mjs')) return true;
+  if (file.endsWith('.cjs')) return false;
+  for (let dir = path.dirname(file); ; dir = path.dirname(dir)) {
+    const pkg = path.join(dir, 'package.json');
+    if (fs.existsSync(pkg)) {
+      try {
+        return JSON.parse(fs.readFileSync(pkg, 'utf8')).type === 'module';
+      } catch (error) {
+        return false;
+      }
+    }
+    if (path.dirname(dir) === dir) return false;
+  }
+}
+
+const harnessIsEsm = isEsModule(harness);
+
+async function runHarness(file) {
+  process.argv = [process.argv[0], harness, file];
+  runCount += 1;
+  if (harnessIsEsm) {
+    // a fresh query string re-evaluates the harness; the modules it imports stay cached
+    await import(pathToFileURL(harness).href + `?run=${runCount}`);
+  } else {
+    delete require.cache[require.resolve(harness)];
+    require(harness);
+  }
+}
+
+// Once the harness has returned, it can only still write output.html from a
+// callback: a timer, a file system request, a child process... A one-shot
+// `node` exits when none of those are left, and so does the wait here. The
+// worker's own stdio pipes don't count, and the poll timer is unref'd so it
+// doesn't count either.
+const OWN_RESOURCES = new Set(['PipeWrap', 'TTYWrap']);
+const IDLE_POLL_MS = 10;
+
+function harnessBusy() {
+  return process.getActiveResourcesInfo().some((type) => !OWN_RESOURCES.has(type));
+}
+
+function failWhenIdle(request) {
+  if (current !== request) return;
+  if (harnessBusy()) {
+    setTimeout(failWhenIdle, IDLE_POLL_MS, request).unref();
+  } else {
+    fail(new Error('Envelope parser did not produce output.html'));
+  }
+}
+
+function parse(file) {
+  return new Promise((resolve, reject) => {
+    const request = { resolve, reject };
+    current = request;
+    runHarness(file).then(() => {
+      // Node < 17 can't tell; envelope_timeout still applies there
+      if (process.getActiveResourcesInfo) setImmediate(failWhenIdle, request);
+    }, fail);
+  });
+}
+
+async function handle(request) {
+  if (request.cmd === 'ping') return {};
+  if (request.cmd === 'parse') return { html: await parse(request.path) };
+  throw new Error(`Unknown command: ${request.cmd}`);
+}
+
+// Requests are handled one at a time; Wormhole never sends the next one early.
+const queue = [];
+let busy = false;
+
+async function drain() {
+  if (busy) return;
+  busy = true;
+  while (queue.length) {
+    const request = queue.shift();
+    try {
+      reply(Object.assign(await handle(request), { id: request.id, ok: true }));
+    } catch (error) {
+      reply({ id: request.id, ok: false, error: error && error.message ? error.message : String(error) });
+    }
+  }
+  busy = false;
+}
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  if (!line.trim()) return;
+  queue.push(JSON.parse(line));
+  drain();
+}).on('close', () => original.exit.call(process, 0));
+
+process.on('exit', () => fs.rmSync(workDir, { recursive: true, force: true }));
+
+reply({ id: null, ok: true, event: 'ready' });
@@ -0,0 +1,231 @@
+"""Long-lived LibreOffice conversion worker used by Wormhole.
+
+Wormhole starts this script with a Python interpreter that can `import uno`
+(the one bundled with LibreOffice works) and passes the path to soffice. The
+worker launches its own headless soffice listener with a private profile,
+connects to it over a UNO pipe and then answers JSON requests, one per line,
+on stdin/stdout:
+
+    {"id": 1, "cmd": "convert", "src": "/abs/in.docx", "dst": "/abs/out.pdf"}
+    {"id": 2, "cmd": "ping"}
+
+Replies are prefixed with MARKER so wormhole.py can ignore anything else that
+ends up on stdout. If soffice crashes it is restarted and the request retried
+once. Closing stdin shuts the worker and its soffice down.
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import uno
+from com.sun.star.beans import PropertyValue
+from com.sun.star.connection import NoConnectException
+
+MARKER = "@@wormhole "
+
+# export filters per document kind and target extension; a tuple carries the
+# filter options as well
+FILTERS = {
+    'writer': {
+        'pdf': 'writer_pdf_Export',
+        'docx': 'MS Word 2007 XML',
+        'odt': 'writer8',
+        'rtf': 'Rich Text Format',
+        'html': 'HTML (StarWriter)',
+        'txt': ('Text (encoded)', 'UTF8'),
+    },
+    'impress': {
+        'pdf': 'impress_pdf_Export',
+        'pptx': 'Impress MS PowerPoint 2007 XML',
+        'odp': 'impress8',
+        'html': 'impress_html_Export',
+    },
+    'calc': {
+        'pdf': 'calc_pdf_Export',
+        'xlsx': 'Calc MS Excel 2007 XML',
+        'ods': 'calc8',
+        'html': 'HTML (StarCalc)',
+        # comma separated, double quoted, UTF-8
+        'csv': ('Text - txt - csv (StarCalc)', '44,34,76'),
+    },
+}
+
+
+class UnsupportedConversion(Exception):
+    pass
+
+
+def props(**kwargs):
+    result = []
+    for name, value in kwargs.items():
+        prop = PropertyValue()
+        prop.Name = name
+        prop.Value = value
+        result.append(prop)
+    return tuple(result)
+
+
+def document_kind(doc):
+    if doc.supportsService("com.sun.star.presentation.PresentationDocument"):
+        return 'impress'
+    if doc.supportsService("com.sun.star.sheet.SpreadsheetDocument"):
+        return 'calc'
+    if doc.supportsService("com.sun.star.text.TextDocument"):
+        return 'writer'
+    return None
+
+
+class Office:
+    """One headless soffice process and the UNO connection to it."""
+
+    def __init__(self, soffice):
+        self.soffice = soffice
+        self.pipe_name = f"wormhole_{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        # a private profile lets several instances run side by side
+        self.profile_dir = tempfile.mkdtemp(prefix="wormhole_office_")
+        self.process = None
+        self.desktop = None
+
+    def start(self, timeout=120):
+        self.process = subprocess.Popen(
+            [self.soffice, '--headless', '--invisible', '--nologo', '--norestore',
+             '--nodefault', '--nolockcheck',
+             f'-env:UserInstallation={uno.systemPathToFileUrl(self.profile_dir)}',
+             f'--accept=pipe,name={self.pipe_name};urp;StarOffice.ComponentContext'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                ctx = resolver.resolve(f"uno:pipe,name={self.pipe_name};urp;StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"soffice exited during startup (code {self.process.returncode})")
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Timed out waiting for soffice to accept connections")
+                time.sleep(0.25)
+        self.desktop = ctx.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", ctx)
+
+    def alive(self):
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            # cheap round trip over the bridge
+            self.desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            try:
+                self.desktop.terminate()
+            except Exception:
+                pass
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+        self.desktop = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+
+    def convert(self, src, dst):
+        ext = os.path.splitext(dst)[1].lower()[1:]
+        load_args = {'Hidden': True, 'ReadOnly': True}
+        if os.path.splitext(src)[1].lower() in ('.html', '.htm'):
+            # open HTML in Writer rather than Writer/Web so the Writer filters apply
+            load_args['FilterName'] = 'HTML (StarWriter)'
+        doc = self.desktop.loadComponentFromURL(uno.systemPathToFileUrl(src), "_blank", 0, props(**load_args))
+        if doc is None:
+            raise RuntimeError("LibreOffice could not open the file")
+        try:
+            kind = document_kind(doc)
+            export = FILTERS.get(kind, {}).get(ext)
+            if export is None:
+                raise UnsupportedConversion(f"LibreOffice cannot export {kind or 'this'} documents to {ext.upper()}")
+            store_args = {'Overwrite': True}
+            if isinstance(export, tuple):
+                store_args['FilterName'], store_args['FilterOptions'] = export
+            else:
+                store_args['FilterName'] = export
+            doc.storeToURL(uno.systemPathToFileUrl(dst), props(**store_args))
+        finally:
+            try:
+                doc.close(True)
+            except Exception:
+                doc.dispose()
+
+
+def reply(message, office):
+    if office.process is not None:
+        message['pids'] = [office.process.pid]
+    sys.stdout.write(MARKER + json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def handle(office, request):
+    cmd = request.get('cmd')
+    if cmd == 'ping':
+        if not office.alive():
+            office.restart()
+        return {}
+    if cmd == 'convert':
+        if not office.alive():
+            office.restart()
+        try:
+            office.convert(request['src'], request['dst'])
+        except UnsupportedConversion:
+            raise
+        except Exception:
+            # a crashed soffice surfaces as a disposed bridge; restart and retry once
+            if office.alive():
+                raise
+            office.restart()
+            office.convert(request['src'], request['dst'])
+        return {}
+    raise ValueError(f"Unknown command: {cmd}")
+
+
+def main():
+    office = Office(sys.argv[1])
+    try:
+        try:
+            office.start()
+        except Exception as e:
+            reply({'id': None, 'ok': False, 'event': 'ready', 'error': str(e)}, office)
+            return
+        reply({'id': None, 'ok': True, 'event': 'ready'}, office)
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                result = handle(office, request)
+                result.update(id=request.get('id'), ok=True)
+            except UnsupportedConversion as e:
+                result = {'id': request.get('id'), 'ok': False, 'unsupported': True, 'error': str(e)}
+            except Exception as e:
+                result = {'id': request.get('id'), 'ok': False, 'error': f"{e.__class__.__name__}: {e}"}
+            reply(result, office)
+    finally:
+        office.close()
+
+
+if __name__ == "__main__":
+    main()
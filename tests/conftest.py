@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# settings and the conversion cache live under LOCALAPPDATA; keep the tests
+# away from the real ones
+os.environ['LOCALAPPDATA'] = tempfile.mkdtemp(prefix="wormhole_tests_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wormhole  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def settings():
+    saved = dict(wormhole.SETTINGS)
+    wormhole.SETTINGS['use_cache'] = False
+    yield wormhole.SETTINGS
+    wormhole.SETTINGS.clear()
+    wormhole.SETTINGS.update(saved)
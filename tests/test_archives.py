@@ -0,0 +1,81 @@
+import os
+import stat
+import tarfile
+import zipfile
+
+import pytest
+
+import wormhole
+
+
+@pytest.mark.parametrize("target", ["ZIP", "TGZ", "TBZ2", "7Z"])
+def test_archive_output_mode_follows_umask(tmp_path, target):
+    source = tmp_path / ("in.tar" if target == "ZIP" else "in.zip")
+    if target == "ZIP":
+        with tarfile.open(source, "w") as tar:
+            member = tmp_path / "a.txt"
+            member.write_text("hello")
+            tar.add(member, arcname="a.txt")
+    else:
+        with zipfile.ZipFile(source, "w") as zf:
+            zf.writestr("a.txt", "hello")
+
+    output = wormhole.convert_archive(str(source), target)
+
+    assert stat.S_IMODE(os.stat(output).st_mode) == wormhole.FILE_MODE
+
+
+def archive_contents(path):
+    """Map the names of an archive's files to their bytes and list its directories."""
+    files, dirs = {}, []
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            assert zf.testzip() is None
+            for info in zf.infolist():
+                if info.is_dir():
+                    dirs.append(info.filename.rstrip("/"))
+                else:
+                    files[info.filename] = zf.read(info)
+    else:
+        with tarfile.open(path) as tar:
+            for member in tar:
+                if member.isdir():
+                    dirs.append(member.name)
+                else:
+                    files[member.name] = tar.extractfile(member).read()
+    return files, sorted(dirs)
+
+
+@pytest.mark.parametrize("target", ["ZIP", "TGZ", "TBZ2"])
+def test_parallel_archive_writers_round_trip(tmp_path, settings, target):
+    # several compression blocks of compressible text, one of noise, plus
+    # the edge cases: an empty file, a tiny one and a directory of its own
+    files = {
+        "logs/app.log": b"".join(b"line %d of the log\n" % i for i in range(80000)),
+        "noise.bin": os.urandom(300 * 1024),
+        "empty.txt": b"",
+        "docs/readme.txt": b"hello",
+    }
+    source = tmp_path / ("in.tar" if target == "ZIP" else "in.zip")
+    if target == "ZIP":
+        with tarfile.open(source, "w") as tar:
+            for name in ("docs", "logs", "empty"):
+                info = tarfile.TarInfo(name)
+                info.type = tarfile.DIRTYPE
+                tar.addfile(info)
+            for name, data in files.items():
+                path = tmp_path / "data"
+                path.write_bytes(data)
+                tar.add(path, arcname=name)
+    else:
+        with zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name in ("docs/", "logs/", "empty/"):
+                zf.writestr(name, b"")
+            for name, data in files.items():
+                zf.writestr(name, data)
+    settings['archive_workers'] = 4
+    settings['archive_level'] = 1
+
+    output = wormhole.convert_archive(str(source), target)
+
+    assert archive_contents(output) == (files, ["docs", "empty", "logs"])
@@ -0,0 +1,42 @@
+import os
+import threading
+
+import wormhole
+
+
+def test_per_file_workers_share_the_batch(monkeypatch, settings):
+    cpus = os.cpu_count() or 1
+    settings['sheet_workers'] = None
+    assert wormhole.per_file_workers('sheet_workers') == cpus
+
+    # what a batch worker process is started with when the pool has one job per CPU
+    monkeypatch.setattr(wormhole, '_batch_jobs_at_once', 1)
+    wormhole._init_batch_worker(dict(settings), cpus)
+    assert wormhole.per_file_workers('sheet_workers') == 1
+
+    settings['sheet_workers'] = 3
+    assert wormhole.per_file_workers('sheet_workers') == 3
+
+
+def test_shared_audio_runs_go_alongside_other_jobs(tmp_path, monkeypatch):
+    other_started = threading.Event()
+    seen = {}
+
+    def audio_clips(clips, workers, on_done):
+        # with the runs done first, the other job could never start meanwhile
+        seen['alongside'] = other_started.wait(5)
+        for n, (file_path, targets) in enumerate(clips):
+            on_done(n, [{'input': file_path, 'target': t, 'status': 'ok'} for t in targets])
+
+    def batch_job(file_path, targets, progress_cb=None):
+        other_started.set()
+        return [{'input': file_path, 'target': t, 'status': 'ok'} for t in targets]
+    monkeypatch.setattr(wormhole, 'audio_batchable', lambda fp, targets: fp.endswith(".wav"))
+    monkeypatch.setattr(wormhole, '_batch_audio_clips', audio_clips)
+    monkeypatch.setattr(wormhole, '_batch_job', batch_job)
+    jobs = [(str(tmp_path / name), target) for name, target in [("a.wav", "MP3"), ("b.wav", "MP3"), ("c.png", "JPG")]]
+
+    results = wormhole.batch_convert(jobs, workers=2)
+
+    assert seen['alongside']
+    assert [r['input'] for r in results] == [fp for fp, _ in jobs]
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+import wormhole
+
+
+@pytest.fixture
+def cache(settings, monkeypatch):
+    monkeypatch.setattr(wormhole, 'ENVELOPE_SUPPORT', False)
+    settings['use_cache'] = True
+    wormhole.cache_clear()
+    yield
+    wormhole.cache_clear()
+
+
+def convert(path, target="ODS"):
+    result, = wormhole.batch_convert([(str(path), target)], workers=1)
+    assert result['status'] == 'ok', result['error']
+    return result
+
+
+def test_cache_hit_replays_the_output(tmp_path, cache):
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n")
+
+    first = convert(source)
+    with open(first['output'], 'rb') as f:
+        produced = f.read()
+    os.remove(first['output'])
+    second = convert(source)
+
+    assert not first['cached'] and second['cached']
+    assert second['output'] == first['output']
+    with open(second['output'], 'rb') as f:
+        assert f.read() == produced
+    stats = wormhole.cache_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_cache_misses_when_input_or_settings_change(tmp_path, cache, settings):
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n")
+    convert(source)
+
+    source.write_text("a,b\n1,3\n")
+    assert not convert(source)['cached']
+    settings['csv_delimiter'] = ";"
+    assert not convert(source)['cached']
+    # a copy of the input under another name converts from the same entry
+    copy = tmp_path / "copy.csv"
+    copy.write_bytes(source.read_bytes())
+    assert convert(copy)['cached']
+
+    stats = wormhole.cache_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 3, 3)
+
+
+def test_cache_stays_out_of_the_way_when_disabled(tmp_path, cache, settings):
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n")
+    settings['use_cache'] = False
+
+    assert not convert(source)['cached']
+    assert not convert(source)['cached']
+    assert wormhole.cache_stats()['entries'] == 0
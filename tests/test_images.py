@@ -0,0 +1,40 @@
+from PIL import Image, ImageSequence
+
+import wormhole
+
+
+def frame_timing(path):
+    with Image.open(path) as img:
+        durations = []
+        for frame in ImageSequence.Iterator(img):
+            frame.load()
+            durations.append(frame.info.get('duration'))
+        return durations, img.info.get('loop')
+
+
+def test_apng_timing_carries_over(tmp_path):
+    source = tmp_path / "anim.png"
+    frames = [Image.new("RGBA", (32, 32), color) for color in ("red", "green", "blue")]
+    frames[0].save(source, "PNG", save_all=True, append_images=frames[1:], duration=[100, 200, 150], loop=3)
+    with Image.open(source) as img:
+        # what makes the AVIF writer fail if it is passed through
+        assert isinstance(img.info['duration'], float)
+
+    results = wormhole.convert_images_multi(str(source), ["AVIF", "WEBP"])
+
+    assert frame_timing(results["AVIF"])[0] == [100, 200, 150]
+    assert frame_timing(results["WEBP"]) == ([100, 200, 150], 3)
+
+
+def test_same_format_target_leaves_input_alone(tmp_path, settings):
+    source = tmp_path / "big.jpg"
+    Image.new("RGB", (64, 64), "red").save(source)
+    original = source.read_bytes()
+    settings['image_resize'] = "50%"
+
+    info = {}
+    results = wormhole.convert_file_multi(str(source), ["JPG", "PNG"], info)
+
+    assert source.read_bytes() == original
+    assert list(results) == ["PNG"]
+    assert isinstance(info['errors']["JPG"], ValueError)
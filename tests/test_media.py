@@ -0,0 +1,175 @@
+import json
+import subprocess
+
+import pytest
+
+import wormhole
+
+needs_ffmpeg = pytest.mark.skipif(not (wormhole.has_ffmpeg and wormhole.has_ffprobe), reason="needs ffmpeg and ffprobe")
+
+CHAPTERS = """;FFMETADATA1
+title=Segmented
+[CHAPTER]
+TIMEBASE=1/1000
+START=0
+END=4000
+title=One
+[CHAPTER]
+TIMEBASE=1/1000
+START=4000
+END=8000
+title=Two
+"""
+
+
+def stream(kind, cover=False):
+    return {'type': kind, 'codec': None, 'cover': cover}
+
+
+def ffprobe(path):
+    output = subprocess.check_output(['ffprobe', '-v', 'error', '-count_frames', '-print_format', 'json',
+                                      '-show_format', '-show_streams', '-show_chapters', str(path)])
+    return json.loads(output)
+
+
+def test_batch_audio_without_ffmpeg(tmp_path, monkeypatch):
+    monkeypatch.setattr(wormhole, 'has_ffmpeg', False)
+    monkeypatch.delitem(wormhole.formats, 'media_audio', raising=False)
+    monkeypatch.delitem(wormhole.formats, 'media_video', raising=False)
+    clips = []
+    for name in ("a.wav", "b.wav"):
+        clip = tmp_path / name
+        clip.write_bytes(b"RIFF")
+        clips.append((str(clip), "MP3"))
+
+    results = wormhole.batch_convert(clips, workers=1)
+
+    assert [r['status'] for r in results] == ['failed', 'failed']
+    assert all("ffmpeg not found" in r['error'] for r in results)
+
+
+@pytest.mark.skipif('media_video' not in wormhole.formats, reason="needs ffmpeg")
+def test_encoder_options_fall_back_without_encoder(monkeypatch):
+    monkeypatch.setattr(wormhole, '_ffmpeg_encoders', {'mpeg4', 'aac'})
+
+    assert wormhole.media_encoder_options("MP4", 'video', 'balanced') == []
+    assert wormhole.media_encoder_options("MP4", 'audio', 'balanced') == ['-c:a', 'aac', '-b:a', '160k']
+    assert wormhole.media_encoder_options("AVI", 'video', 'balanced') == ['-c:v', 'mpeg4', '-q:v', '4']
+
+
+@pytest.mark.skipif('media_video' not in wormhole.formats, reason="needs ffmpeg")
+def test_cache_key_follows_the_effective_encoder_and_segments(tmp_path, monkeypatch, settings):
+    source = tmp_path / "clip.mkv"
+    source.write_bytes(b"not really a video")
+    monkeypatch.setattr(wormhole, '_ffmpeg_encoders', {'libx264', 'aac'})
+    settings.update(media_threads=None, media_segment_workers=1)
+    keys = [wormhole.cache_key(str(source), "MP4")]
+
+    settings['media_threads'] = 2
+    keys.append(wormhole.cache_key(str(source), "MP4"))
+    monkeypatch.setattr(wormhole, '_ffmpeg_encoders', {'mpeg4', 'aac'})
+    keys.append(wormhole.cache_key(str(source), "MP4"))
+    settings['media_segment_workers'] = 4
+    keys.append(wormhole.cache_key(str(source), "MP4"))
+    monkeypatch.setattr(wormhole, 'MEDIA_SEGMENT_MIN_LENGTH', 30)
+    keys.append(wormhole.cache_key(str(source), "MP4"))
+
+    assert len(set(keys)) == len(keys)
+
+
+def test_segmentable_only_when_the_join_keeps_every_stream():
+    assert wormhole.segmentable({'streams': [stream('video'), stream('audio'), stream('video', cover=True)]})
+    assert wormhole.segmentable({'streams': [stream('video')]})
+    assert not wormhole.segmentable({'streams': [stream('video'), stream('audio'), stream('subtitle')]})
+    assert not wormhole.segmentable({'streams': [stream('video'), stream('audio'), stream('audio')]})
+    assert not wormhole.segmentable({'streams': [stream('video'), stream('video')]})
+
+
+@needs_ffmpeg
+def test_segmented_transcode_to_mp4(tmp_path, settings, monkeypatch):
+    metadata = tmp_path / "chapters.txt"
+    metadata.write_text(CHAPTERS)
+    source = tmp_path / "clip.mkv"
+    # a keyframe every second, so the split has somewhere to cut
+    subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'testsrc2=size=128x72:rate=25:duration=8',
+                    '-f', 'lavfi', '-i', 'sine=frequency=440:duration=8', '-i', str(metadata),
+                    '-map', '0:v', '-map', '1:a', '-map_metadata', '2', '-map_chapters', '2',
+                    '-c:v', 'mpeg4', '-g', '25', '-c:a', 'pcm_s16le', str(source)], check=True)
+    monkeypatch.setattr(wormhole, 'MEDIA_SEGMENT_MIN_SECONDS', 4)
+    monkeypatch.setattr(wormhole, 'MEDIA_SEGMENT_MIN_LENGTH', 1)
+    settings.update(media_segment_workers=2, media_profile='fast')
+    pieces = []
+    transcode_segmented = wormhole.transcode_segmented
+    monkeypatch.setattr(wormhole, 'transcode_segmented',
+                        lambda *args, **kwargs: pieces.append(transcode_segmented(*args, **kwargs)) or pieces[-1])
+
+    output = wormhole.convert_media(str(source), "MP4")
+
+    assert pieces and pieces[0] > 1
+    info = ffprobe(output)
+    video = [st for st in info['streams'] if st['codec_type'] == 'video']
+    audio = [st for st in info['streams'] if st['codec_type'] == 'audio']
+    # edit lists in the pieces would show up as repeated or missing frames at the joins
+    assert len(video) == 1 and int(video[0]['nb_read_frames']) == 200
+    assert len(audio) == 1
+    assert abs(float(info['format']['duration']) - 8) < 0.2
+    assert info['format']['tags']['title'] == "Segmented"
+    assert [c['tags']['title'] for c in info['chapters']] == ["One", "Two"]
+    assert not list(tmp_path.glob(".wormhole_segments_*"))
+
+
+def test_failed_audio_run_retries_only_pending_targets(tmp_path, monkeypatch, settings):
+    settings['use_cache'] = True
+    clips = []
+    for name in ("a.wav", "b.wav"):
+        clip = tmp_path / name
+        clip.write_bytes(b"RIFF")
+        clips.append((str(clip), ["MP3", "OGG"]))
+    cached = {(fp, "OGG"): fp[:-4] + ".ogg" for fp, _ in clips}
+    monkeypatch.setattr(wormhole, 'cache_key', lambda fp, target: (fp, target))
+    monkeypatch.setattr(wormhole, 'cache_lookup', lambda key, fp: cached.get(key))
+
+    def failing_run(batch, cancel=None):
+        raise RuntimeError("ffmpeg failed")
+    retried = []
+
+    def batch_job(file_path, targets, progress_cb=None):
+        retried.append((file_path, list(targets)))
+        return [{'input': file_path, 'target': t, 'status': 'ok', 'output': "out", 'error': None,
+                 'cached': False, 'seconds': 0.0} for t in targets]
+    monkeypatch.setattr(wormhole, 'convert_audio_batch', failing_run)
+    monkeypatch.setattr(wormhole, '_batch_job', batch_job)
+    done = {}
+
+    wormhole._batch_audio_clips(clips, 1, done.__setitem__)
+
+    assert retried == [(fp, ["MP3"]) for fp, _ in clips]
+    for n, (fp, _) in enumerate(clips):
+        assert [r['target'] for r in done[n]] == ["MP3", "OGG"]
+        assert done[n][1]['cached'] and done[n][1]['output'] == cached[(fp, "OGG")]
+
+
+def id3v2(version, frame):
+    size = len(frame)
+    syncsafe = bytes((size >> shift) & 0x7f for shift in (21, 14, 7, 0))
+    return b"ID3" + bytes([version, 0, 0]) + syncsafe + frame
+
+
+def test_cover_art_detection(tmp_path):
+    samples = {
+        "plain.mp3": id3v2(3, b"TIT2\x00\x00\x00\x03\x00\x00\x00hi") + b"\xff\xfb" * 100,
+        "apic.mp3": id3v2(3, b"APIC\x00\x00\x00\x04\x00\x00\x00\x00jpeg") + b"\xff\xfb" * 100,
+        "pic22.mp3": id3v2(2, b"PIC\x00\x00\x04JPG\x00") + b"\xff\xfb" * 100,
+        # STREAMINFO, then a PICTURE block marked last
+        "cover.flac": b"fLaC" + b"\x00\x00\x00\x22" + b"\x00" * 34 + b"\x86\x00\x00\x02" + b"\x00\x00",
+        "plain.flac": b"fLaC" + b"\x80\x00\x00\x22" + b"\x00" * 34 + b"\xff\xf8" * 50,
+        "cover.ogg": b"OggS" + b"\x00" * 40 + b"\x03vorbis" + b"Metadata_Block_Picture=AAAA",
+    }
+    found = {}
+    for name, data in samples.items():
+        path = tmp_path / name
+        path.write_bytes(data)
+        found[name] = wormhole.has_cover_art(str(path))
+
+    assert found == {"plain.mp3": False, "apic.mp3": True, "pic22.mp3": True,
+                     "cover.flac": True, "plain.flac": False, "cover.ogg": True}
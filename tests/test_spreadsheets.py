@@ -0,0 +1,146 @@
+import datetime
+import locale
+import os
+import tracemalloc
+
+import wormhole
+
+
+def peak_kib(rows):
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in rows)
+        return count, tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+def test_ods_sheets_before_the_selected_one_are_not_kept(tmp_path):
+    path = str(tmp_path / "book.ods")
+    with wormhole.OdsWriter(path) as writer:
+        for name in "ABC":
+            writer.add_sheet(name, ([i, f"text {i}", i * 0.5] for i in range(5000)))
+
+    count, peak = peak_kib(wormhole.spreadsheet_rows(path, "C"))
+
+    assert count == 5000
+    # holding sheets A and B in the element tree took about 17 MB
+    assert peak < 5 * 1024
+
+
+def test_sheet_setting_does_not_bypass_libreoffice_for_csv(tmp_path, monkeypatch, settings):
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n")
+    calls = []
+
+    def libreoffice_convert(file_path, new_file_path):
+        calls.append(file_path)
+        open(new_file_path, "wb").close()
+    monkeypatch.setattr(wormhole, 'ENVELOPE_SUPPORT', True)
+    monkeypatch.setattr(wormhole, 'libreoffice_convert', libreoffice_convert)
+    settings['sheets'] = "1"
+
+    wormhole.convert_spreadsheets(str(source), "XLSX")
+
+    assert calls == [str(source)]
+
+
+def test_sheet_names_with_commas_survive_the_cache(tmp_path):
+    path = str(tmp_path / "book.ods")
+    with wormhole.OdsWriter(path) as writer:
+        writer.add_sheet("North, South", iter([[1, 2]]))
+        writer.add_sheet("East", iter([[3, 4]]))
+
+    result = wormhole.convert_spreadsheets(path, "CSV")
+    key = wormhole.cache_key(path, "CSV")
+    wormhole.cache_store(key, path, result)
+    for out in result:
+        os.remove(out)
+
+    assert result == [wormhole.sheet_csv_path(path, "North, South"), wormhole.sheet_csv_path(path, "East")]
+    assert wormhole.cache_lookup(key, path) == result
+    assert all(os.path.isfile(out) for out in result)
+
+
+def test_xlsx_and_csv_stream_round_trip(tmp_path):
+    rows = [["id", "name", "price"]] + [[i, f"item {i}", i * 0.25] for i in range(2000)]
+
+    for target in ("XLSX", "CSV"):
+        path = str(tmp_path / f"out.{target.lower()}")
+        assert wormhole.write_spreadsheet_rows(iter(rows), path, target) == len(rows)
+        back = list(wormhole.spreadsheet_rows(path))
+        if target == "CSV":
+            # CSV cells come back as text
+            back = [[str(v) for v in row] for row in back]
+            assert back == [[str(v) for v in row] for row in rows]
+        else:
+            assert back == rows
+
+
+def test_ods_writer_reads_back(tmp_path):
+    path = str(tmp_path / "book.ods")
+    rows = [
+        ["name", "count", "share", "ok", "day", "at"],
+        ["a  b\tc & <d>", 1, 2.5, True, datetime.date(2024, 1, 2), datetime.datetime(2024, 1, 2, 3, 4, 5)],
+        ["", None, -3, False],
+        ["two\nlines", "", "", "", "", "last"],
+    ]
+    with wormhole.OdsWriter(path) as writer:
+        assert writer.add_sheet("Data", iter(rows)) == len(rows)
+        writer.add_sheet("Empty", iter([]))
+        writer.add_sheet("R&D <x>", iter([[1]]))
+
+    assert wormhole.spreadsheet_sheet_names(path) == ["Data", "Empty", "R&D <x>"]
+    assert list(wormhole.spreadsheet_rows(path)) == [rows[0], rows[1], ["", "", -3, False], rows[3]]
+    assert list(wormhole.spreadsheet_rows(path, "Empty")) == []
+    assert list(wormhole.spreadsheet_rows(path, "R&D <x>")) == [[1]]
+
+
+def test_csv_encoding_and_delimiter_are_sniffed(tmp_path, monkeypatch):
+    semicolons = tmp_path / "semicolons.csv"
+    semicolons.write_bytes("name;city\nJos\xe9;M\xfcnchen\n".encode("cp1252"))
+    tabs = tmp_path / "tabs.csv"
+    tabs.write_bytes("\ufeffname\tcity\nZo\xeb\t\"Paris, France\"\n".encode("utf-8"))
+    # a UTF-8 locale can't read a file that isn't UTF-8
+    monkeypatch.setattr(locale, 'getpreferredencoding', lambda do_setlocale=True: "UTF-8")
+
+    assert wormhole.detect_csv_encoding(str(semicolons)) == "cp1252"
+    assert wormhole.detect_csv_encoding(str(tabs)) == "utf-8-sig"
+    assert list(wormhole.spreadsheet_rows(str(semicolons))) == [["name", "city"], ["Jos\xe9", "M\xfcnchen"]]
+    assert list(wormhole.spreadsheet_rows(str(tabs))) == [["name", "city"], ["Zo\xeb", "Paris, France"]]
+
+
+def test_csv_column_types_are_inferred(settings):
+    rows = [
+        ["id", "code", "price", "ok", "day", "at", "mixed"],
+        ["1", "01234", "2.50", "true", "2024-01-02", "2024-01-02 03:04:05", "1"],
+        ["-2", "00042", "1e3", "FALSE", "2024-12-31", "2024-01-02T03:04", "x"],
+        ["", "", "", "", "", "", ""],
+    ]
+    settings['csv_infer_rows'] = 3
+    later = ["3", "7", "n/a", "true", "2024-02-30", "", "2"]
+
+    typed = list(wormhole.typed_csv_rows([list(row) for row in rows] + [later]))
+
+    assert typed[0] == rows[0]
+    assert typed[1] == [1, "01234", 2.5, True, datetime.date(2024, 1, 2),
+                        datetime.datetime(2024, 1, 2, 3, 4, 5), "1"]
+    assert typed[2] == [-2, "00042", 1000.0, False, datetime.date(2024, 12, 31),
+                        datetime.datetime(2024, 1, 2, 3, 4), "x"]
+    assert typed[3] == rows[3]
+    # values that don't fit the type the sample gave their column stay text
+    assert typed[4] == [3, "7", "n/a", True, "2024-02-30", "", "2"]
+
+
+def test_csv_to_xlsx_keeps_inferred_types(tmp_path, monkeypatch):
+    monkeypatch.setattr(wormhole, 'ENVELOPE_SUPPORT', False)
+    source = tmp_path / "data.csv"
+    source.write_text("id,price,when\n1,2.5,2024-01-02\n2,3,2024-01-03\n")
+
+    output = wormhole.convert_spreadsheets(str(source), "XLSX")
+
+    assert list(wormhole.spreadsheet_rows(output)) == [
+        ["id", "price", "when"],
+        [1, 2.5, datetime.datetime(2024, 1, 2)],
+        [2, 3.0, datetime.datetime(2024, 1, 3)],
+    ]
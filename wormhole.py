@@ -1,41 +1,54 @@
 import os
 import sys
 import shutil  # Added for ffmpeg/pandoc checks
-import customtkinter as ctk
-from tkinter import filedialog, messagebox
-from PIL import Image
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from pypdf import PdfReader
-import py7zr
 import zipfile
 import tarfile
 import tempfile
-import shutil
-import threading
-from docx import Document
-from bs4 import BeautifulSoup
-from pptx import Presentation
-from pptx.util import Inches
-import openpyxl
 import csv
-import webbrowser
 import subprocess
 import re
-import darkdetect
-import ezodf
-import requests
 import json
-try:
-    import trimesh
-    TRIMESH_SUPPORT = True
-except ImportError:
-    TRIMESH_SUPPORT = False
+import glob
+import time
+import argparse
+import multiprocessing
+import importlib
+import importlib.util
+import threading
+import queue
+import signal
+import atexit
+import collections
+import hashlib
+import stat
+import struct
+import zlib
+import bz2
+import functools
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait as wait_futures, FIRST_EXCEPTION
+
+# Converter libraries (Pillow, reportlab, pypdf, python-docx, ...) are imported
+# inside the convert_* functions that need them, so an image or archive
+# conversion never pays for the document stack. CATEGORY_IMPORTS lists what each
+# category pulls in; `python -m wormhole bench imports` reports the cost.
+CATEGORY_IMPORTS = {
+    'docs': ['pypdf', 'docx', 'bs4', 'ezodf'],
+    'presentations': ['pptx', 'reportlab.pdfgen.canvas', 'docx', 'bs4', 'ezodf'],
+    'images': ['PIL.Image'],
+    'archive': ['py7zr'],
+    'spreadsheets': ['openpyxl', 'bs4', 'ezodf'],
+    '3d': ['trimesh'],
+    'media_audio': [],
+    'media_video': [],
+}
+
+TRIMESH_SUPPORT = importlib.util.find_spec("trimesh") is not None
 
 # Check for LibreOffice
-has_libreoffice = shutil.which("soffice") is not None or shutil.which("libreoffice") is not None
+SOFFICE_PATH = shutil.which("soffice") or shutil.which("libreoffice")
+has_libreoffice = SOFFICE_PATH is not None
 ENVELOPE_SUPPORT = has_libreoffice
 
 # ---------- settings handling ----------
@@ -45,7 +58,56 @@ SETTINGS_DIR = os.path.join(LOCAL_APPDATA, "NovaFoundry_wormhole")
 SETTINGS_FILE = os.path.join(SETTINGS_DIR, "settings.json")
 
 DEFAULT_SETTINGS = {
-    "use_envelope": False
+    "use_envelope": False,
+    # number of worker processes for batch conversions (None = one per CPU)
+    "batch_workers": None,
+    # warm LibreOffice instances kept for office conversions (0 = one soffice launch per file)
+    "office_workers": 2,
+    # seconds a single LibreOffice conversion may take before its instance is restarted
+    "office_timeout": 300,
+    # resident Node workers for Envelope parsing (0 = one node launch per file)
+    "envelope_workers": 2,
+    # seconds a single Envelope parse may take before its worker is restarted
+    "envelope_timeout": 120,
+    # reuse earlier results when the same input is converted the same way again
+    "use_cache": True,
+    # least recently used results are dropped once the cache grows past this
+    "cache_max_mb": 2048,
+    # threads compressing ZIP/TGZ/TBZ2 output (None = one per CPU, shared in batches; 1 = single-threaded)
+    "archive_workers": None,
+    # compression level for archive output, 1-9 (None = the format's usual default)
+    "archive_level": None,
+    # processes extracting text from large PDFs (0 or None = one per CPU, shared in batches)
+    "pdf_workers": 1,
+    # 1-based pages to convert from PDFs, e.g. "1-5,8" (None = all)
+    "pdf_pages": None,
+    # sheets to convert from workbooks, by name or 1-based position, e.g. "Sales,3" (None = all)
+    "sheets": None,
+    # processes exporting the sheets of a workbook to CSV (None = one per CPU, shared in batches)
+    "sheet_workers": None,
+    # encoding of CSV input (None = detect) and its delimiter (None = sniff)
+    "csv_encoding": None,
+    "csv_delimiter": None,
+    # turn CSV text back into numbers, booleans and dates for XLSX/ODS output,
+    # with column types inferred from this many leading rows
+    "csv_infer_types": True,
+    "csv_infer_rows": 1000,
+    # scale images down while converting: "50%", "1920x1080" (fit inside) or "800" (longest side)
+    "image_resize": None,
+    # layers written to ICO output (None = 16, 24, 32, 40, 48, 64, 128 and 256)
+    "ico_sizes": None,
+    # image encoder effort: "fast", "balanced" (Pillow's defaults) or "smallest"
+    "image_preset": "balanced",
+    # copy media streams the target container supports instead of re-encoding them
+    "media_stream_copy": True,
+    # encoder settings for re-encoded media: "fast", "balanced" or "archival"
+    "media_profile": "balanced",
+    # ffmpeg encoder threads (None = ffmpeg's choice, usually all cores)
+    "media_threads": None,
+    # ffmpeg processes transcoding segments of a long video at once (1 = off, 0 = one per CPU)
+    "media_segment_workers": 1,
+    # convert short audio clips in a batch several to an ffmpeg run instead of one ffmpeg per clip
+    "media_batch_audio": True
 }
 
 
@@ -71,6 +133,10 @@ def save_settings(settings):
 # initial load
 SETTINGS = load_settings()
 
+
+def get_setting(key):
+    return SETTINGS.get(key, DEFAULT_SETTINGS.get(key))
+
 # Check for Node.js and envelope JavaScript parser
 has_node = shutil.which("node") is not None or shutil.which("node.exe") is not None
 # envelope folder may be bundled; we just need the directory name (relative to this file)
@@ -87,13 +153,59 @@ elif has_node:
 def envelope_html_for_file(file_path):
     """Run the Envelope JS parser via Node and return resulting HTML string.
 
-    A temporary working directory is created so that the built-in test
-    harness in `envelope/test/test.js` can write its output file without
-    interfering with the rest of the repository.
+    Parsing goes to a resident Node worker from the Envelope pool when one can
+    be started, so Node and the parser modules are loaded once per worker
+    rather than once per file. The HTML is kept in the intermediate cache, so
+    converting one document to several targets parses it only once.
     """
     if not ENVELOPE_JS_SUPPORT:
         raise RuntimeError("Envelope JS support is not available")
-    
+
+    key = None
+    if get_setting('use_cache'):
+        try:
+            key = envelope_cache_key(file_path)
+            html = envelope_cache_lookup(key)
+            if html is not None:
+                print("Using cached Envelope output.")
+                return html
+        except Exception as e:
+            print(f"Envelope cache unavailable: {e}")
+            key = None
+
+    html = _envelope_parse(file_path)
+    if key:
+        try:
+            envelope_cache_store(key, html)
+        except Exception as e:
+            print(f"Could not cache Envelope output: {e}")
+    return html
+
+
+def _envelope_parse(file_path):
+    pool = get_envelope_pool()
+    if pool is not None:
+        try:
+            reply = pool.run({'cmd': 'parse', 'path': os.path.abspath(file_path)}, timeout=get_setting('envelope_timeout'))
+        except (WorkerError, TimeoutError) as e:
+            raise RuntimeError(f"Envelope parser failed: {e}")
+        except Exception as e:
+            print(f"Envelope worker unavailable ({e}); running a one-off node process.")
+        else:
+            html = reply.get('html') or ''
+            if not html.strip():
+                raise RuntimeError("Envelope parser produced empty output")
+            return html
+    return _envelope_html_oneshot(file_path)
+
+
+def _envelope_html_oneshot(file_path):
+    """Run `envelope/test/test.js` in a fresh node process.
+
+    A temporary working directory is created so that the built-in test
+    harness can write its output file without interfering with the rest of
+    the repository.
+    """
     temp_dir = tempfile.mkdtemp()
     try:
         # Use absolute paths to ensure Node can resolve everything correctly
@@ -134,6 +246,7 @@ def envelope_html_for_file(file_path):
 def html_table_to_data(html):
     """Parse an HTML string containing <table> markup and return a list of
     rows (each row is a list of cell text values)."""
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "html.parser")
     rows = []
     for tr in soup.find_all("tr"):
@@ -141,22 +254,6 @@ def html_table_to_data(html):
         rows.append(cells)
     return rows
 
-
-if (darkdetect.theme() == "Light"):
-    BG = "#f7f8ff"
-    CARD = "#ffffff"
-    CARD_HOVER = "#e7e9f5"
-    ACCENT = "#3a63d9"
-    ACCENT_DIM = "#2a4ba8"
-    TEXT = "#1a1b25"
-else:
-    BG = "#0a0812"
-    CARD = "#120f1e"
-    CARD_HOVER = "#19172b"
-    ACCENT = "#7aa3ff"
-    ACCENT_DIM = "#4d6bbc"
-    TEXT = "#e8e6f5"
-
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller onefile."""
     try:
@@ -165,57 +262,320 @@ def resource_path(relative_path):
     except AttributeError:
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
-if (darkdetect.theme() == "Light"):
-    WORMHOLE_IMAGE_PATH = resource_path(os.path.join("Icons", "wormhole_Transparent.png"))
-    ABOUT_IMAGE1_PATH = resource_path(os.path.join("Icons", "Nova_foundry_wide_transparent_dark.png"))
-    ABOUT_IMAGE2_PATH = resource_path(os.path.join("Icons", "p2r3.png"))
-else:
-    WORMHOLE_IMAGE_PATH = resource_path(os.path.join("Icons", "wormhole_Transparent_Light.png"))
-    ABOUT_IMAGE1_PATH = resource_path(os.path.join("Icons", "Nova_foundry_wide_transparent.png"))
-    ABOUT_IMAGE2_PATH = resource_path(os.path.join("Icons", "p2r3.png"))
-try:
-    WORMHOLE_PIL_IMAGE = Image.open(WORMHOLE_IMAGE_PATH)
-except Exception as e:
-    print(f"Could not load wormhole image: {e}")
-    WORMHOLE_PIL_IMAGE = Image.new("RGBA", (100, 100), (100, 100, 100, 255))
-
-APP_ICON_PATH = resource_path(os.path.join("Icons", "Wormhole_Icon.ico"))
-
-FONTS_DIR = resource_path("fonts")
-FONT_FAMILY_REGULAR = "Pathway Extreme 36pt Regular"
-FONT_FAMILY_SEMIBOLD = "Pathway Extreme 36pt SemiBold"
-FONT_FAMILY_ITALIC = "Pathway Extreme 36pt Italic"
-FONT_FAMILY_THIN = "Pathway Extreme 36pt Thin"
-FONT_FAMILY_BLACK = "Pathway Extreme 36pt Black"
-FONT_FILES = [
-    "PathwayExtreme_36pt-Black.ttf",
-    "PathwayExtreme_36pt-Italic.ttf",
-    "PathwayExtreme_36pt-Regular.ttf",
-    "PathwayExtreme_36pt-SemiBold.ttf",
-    "PathwayExtreme_36pt-Thin.ttf"
-]
 
 VERSION = "1.3.0"
 GITHUB_URL = "https://github.com/DirectedHunt42/Wormhole"
 ENVELOPE_REPO_URL = "https://github.com/p2r3/envelope"
 
-# Set up customtkinter
-if (darkdetect.theme() == "Light"):
-    ctk.set_appearance_mode("light")
-    ctk.set_default_color_theme("blue")
-else:
-    ctk.set_appearance_mode("dark")
-    ctk.set_default_color_theme("dark-blue")
-
-# Load custom fonts
-for font_file in FONT_FILES:
-    font_path = os.path.join(FONTS_DIR, font_file)
-    if os.path.exists(font_path):
-        ctk.FontManager.load_font(font_path)
-    else:
-        print(f"Custom font file not found: {font_path}; falling back to default for this variant.")
+# ---------- resident worker processes ----------
+
+WORKER_MARKER = "@@wormhole "
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died or stopped answering mid-request."""
+
+
+class WorkerError(RuntimeError):
+    """The worker answered, but the request itself failed."""
+
+    def __init__(self, message, unsupported=False):
+        super().__init__(message)
+        self.unsupported = unsupported
+
+
+def _kill_pid(pid):
+    try:
+        os.kill(pid, signal.SIGTERM if sys.platform.startswith('win') else signal.SIGKILL)
+    except OSError:
+        pass
+
+
+class ResidentWorker:
+    """A long-lived helper process that answers JSON requests over stdin/stdout.
+
+    Requests and replies are one JSON object per line. Replies start with
+    WORKER_MARKER so anything else the helper prints is ignored. The helper
+    announces itself with a reply whose id is None once it is ready, and may
+    list extra process ids (`pids`) it owns so they can be killed with it.
+    """
+
+    def __init__(self, cmd, cwd=None, ready_timeout=120):
+        self.cmd = cmd
+        self.cwd = cwd
+        self.ready_timeout = ready_timeout
+        self.process = None
+        self.child_pids = []
+        self.last_used = 0.0
+        self._replies = None
+        self._next_id = 0
+
+    def start(self):
+        self.process = subprocess.Popen(self.cmd, cwd=self.cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        text=True, encoding='utf-8', bufsize=1)
+        self._replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self.process, self._replies), daemon=True).start()
+        try:
+            ready = self._wait_for(None, self.ready_timeout)
+        except Exception:
+            self.stop(force=True)
+            raise
+        if not ready.get('ok'):
+            self.stop(force=True)
+            raise WorkerCrashed(f"Worker failed to start: {ready.get('error')}")
+        self.last_used = time.monotonic()
+
+    @staticmethod
+    def _read_replies(process, replies):
+        for line in process.stdout:
+            if line.startswith(WORKER_MARKER):
+                replies.put(line[len(WORKER_MARKER):])
+        replies.put(None)  # stdout closed: the process is gone
+
+    def _wait_for(self, request_id, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                line = self._replies.get(timeout=remaining)
+            except queue.Empty:
+                raise TimeoutError(f"Worker did not answer within {timeout}s")
+            if line is None:
+                raise WorkerCrashed("Worker process exited")
+            message = json.loads(line)
+            if 'pids' in message:
+                self.child_pids = message['pids']
+            if message.get('id') == request_id:
+                return message
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def request(self, payload, timeout=None):
+        self._next_id += 1
+        payload = dict(payload, id=self._next_id)
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError, AttributeError) as e:
+            raise WorkerCrashed(f"Could not reach worker: {e}")
+        try:
+            message = self._wait_for(self._next_id, timeout)
+        except TimeoutError:
+            # whatever it is stuck on, it won't be useful for the next request either
+            self.stop(force=True)
+            raise
+        self.last_used = time.monotonic()
+        if not message.get('ok'):
+            raise WorkerError(message.get('error') or "Worker request failed", message.get('unsupported', False))
+        return message
+
+    def stop(self, force=False):
+        if self.process is None:
+            return
+        if not force and self.process.poll() is None:
+            try:
+                # helpers shut down cleanly when their stdin closes
+                self.process.stdin.close()
+                self.process.wait(timeout=15)
+            except (OSError, subprocess.TimeoutExpired):
+                force = True
+        if force or self.process.poll() is None:
+            for pid in self.child_pids:
+                _kill_pid(pid)
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+
+class WorkerPool:
+    """A fixed number of ResidentWorkers shared between threads.
+
+    Workers are started on first use, pinged before reuse when they have been
+    idle for `idle_check` seconds, and replaced when they crash.
+    """
+
+    def __init__(self, factory, size, idle_check=30.0):
+        self.factory = factory
+        self.size = max(1, size)
+        self.idle_check = idle_check
+        self._idle = queue.LifoQueue()  # reuse the most recently used (warmest) worker first
+        self._slots = threading.Semaphore(self.size)
+        self._lock = threading.Lock()
+        self._workers = []
+        self.closed = False
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            while True:
+                try:
+                    worker = self._idle.get_nowait()
+                except queue.Empty:
+                    worker = self.factory()
+                    worker.start()
+                    with self._lock:
+                        self._workers.append(worker)
+                    return worker
+                if self._healthy(worker):
+                    return worker
+                self._discard(worker)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _healthy(self, worker):
+        if not worker.alive():
+            return False
+        if time.monotonic() - worker.last_used < self.idle_check:
+            return True
+        try:
+            worker.request({'cmd': 'ping'}, timeout=30)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, worker):
+        worker.stop(force=True)
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def _release(self, worker):
+        if worker is not None:
+            if worker.alive() and not self.closed:
+                self._idle.put(worker)
+            else:
+                self._discard(worker)
+        self._slots.release()
+
+    def run(self, payload, timeout=None):
+        """Send one request to a free worker. If the worker crashes mid-request
+        it is replaced and the request retried once on the fresh one."""
+        for attempt in range(2):
+            worker = self._acquire()
+            try:
+                return worker.request(payload, timeout)
+            except WorkerCrashed:
+                self._discard(worker)
+                worker = None
+                if attempt:
+                    raise
+            finally:
+                self._release(worker)
+
+    def close(self):
+        self.closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+# ---------- LibreOffice worker pool ----------
+
+OFFICE_CATEGORIES = ('docs', 'presentations', 'spreadsheets')
+OFFICE_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "office_worker.py")
+_office_pool = None
+_office_python = None
+_office_lock = threading.Lock()
+
+
+def _can_import_uno(python):
+    try:
+        return subprocess.run([python, '-c', 'import uno'], capture_output=True, timeout=30).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def find_office_python():
+    """Find a Python interpreter that can `import uno` to run office_worker.py.
+
+    LibreOffice ships one next to soffice on Windows and macOS; on Linux the
+    system Python usually has it via the python3-uno package.
+    """
+    candidates = []
+    if SOFFICE_PATH:
+        program_dir = os.path.dirname(os.path.realpath(SOFFICE_PATH))
+        candidates += [os.path.join(program_dir, 'python.exe'),
+                       os.path.join(program_dir, 'python'),
+                       os.path.join(program_dir, '..', 'Resources', 'python')]
+    if not getattr(sys, 'frozen', False):
+        candidates.append(sys.executable)
+    candidates += [shutil.which('python3'), shutil.which('python')]
+    for candidate in candidates:
+        if candidate and os.path.isfile(candidate) and _can_import_uno(candidate):
+            return candidate
+    return None
+
+
+def get_office_pool():
+    """Return the shared LibreOffice worker pool, or None when it can't be used
+    (no LibreOffice, no UNO-capable Python, or disabled in settings)."""
+    global _office_pool, _office_python
+    size = get_setting('office_workers')
+    if not SOFFICE_PATH or not size or not os.path.isfile(OFFICE_WORKER_SCRIPT):
+        return None
+    with _office_lock:
+        if _office_pool is None:
+            if _office_python is None:
+                _office_python = find_office_python() or ''
+                if not _office_python:
+                    print("No Python with LibreOffice UNO bindings found; using one soffice launch per file.")
+            if not _office_python:
+                return None
+            _office_pool = WorkerPool(lambda: ResidentWorker([_office_python, OFFICE_WORKER_SCRIPT, SOFFICE_PATH]), size)
+            atexit.register(_office_pool.close)
+    return _office_pool
+
+
+def libreoffice_convert(file_path, new_file_path):
+    """Convert with LibreOffice, preferring a warm soffice from the worker pool
+    and falling back to a one-shot `soffice --convert-to` run."""
+    pool = get_office_pool()
+    if pool is not None:
+        try:
+            pool.run({'cmd': 'convert', 'src': os.path.abspath(file_path), 'dst': os.path.abspath(new_file_path)},
+                     timeout=get_setting('office_timeout'))
+            return new_file_path
+        except WorkerError as e:
+            if e.unsupported:
+                # LibreOffice has no export filter for this target; a one-shot run won't either
+                raise ValueError(str(e))
+            print(f"LibreOffice worker failed ({e}); retrying with a one-shot soffice run.")
+        except Exception as e:
+            print(f"LibreOffice worker unavailable ({e}); using a one-shot soffice run.")
+    ext = os.path.splitext(new_file_path)[1].lower()[1:]
+    out_dir = os.path.dirname(new_file_path) or '.'
+    cmd = [SOFFICE_PATH or 'soffice', '--headless', '--convert-to', ext, file_path, '--outdir', out_dir]
+    subprocess.check_call(cmd)
+    produced = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0] + '.' + ext)
+    if os.path.abspath(produced) != os.path.abspath(new_file_path):
+        os.rename(produced, new_file_path)
+    return new_file_path
+
+# ---------- Envelope worker pool ----------
+
+ENVELOPE_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "envelope_worker.js")
+_envelope_pool = None
+_envelope_lock = threading.Lock()
+
+
+def get_envelope_pool():
+    """Return the shared pool of resident Node workers for Envelope, or None
+    when Envelope is unavailable or the pool is disabled in settings."""
+    global _envelope_pool
+    size = get_setting('envelope_workers')
+    if not ENVELOPE_JS_SUPPORT or not size or not os.path.isfile(ENVELOPE_WORKER_SCRIPT):
+        return None
+    with _envelope_lock:
+        if _envelope_pool is None:
+            harness = os.path.abspath(resource_path(os.path.join("envelope", "test", "test.js")))
+            _envelope_pool = WorkerPool(lambda: ResidentWorker(["node", ENVELOPE_WORKER_SCRIPT, harness]), size)
+            atexit.register(_envelope_pool.close)
+    return _envelope_pool
 
 has_ffmpeg = shutil.which("ffmpeg") is not None
+has_ffprobe = shutil.which("ffprobe") is not None
 
 formats = {
     'docs': {
@@ -245,12 +605,61 @@ formats = {
     'media_audio': {
         'extensions': [".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"],
         'targets': ["MP3", "WAV", "OGG", "FLAC", "AAC", "M4A"],
+        # encoder options per profile and target, used for re-encoded streams
+        # only (WAV is plain PCM and has nothing to tune)
+        'profiles': {
+            'fast': {
+                'MP3': {'audio': ['-c:a', 'libmp3lame', '-q:a', '5']},
+                'OGG': {'audio': ['-c:a', 'libvorbis', '-q:a', '4']},
+                'FLAC': {'audio': ['-c:a', 'flac', '-compression_level', '0']},
+                'AAC': {'audio': ['-c:a', 'aac', '-b:a', '128k']},
+                'M4A': {'audio': ['-c:a', 'aac', '-b:a', '128k']},
+            },
+            'balanced': {
+                'MP3': {'audio': ['-c:a', 'libmp3lame', '-q:a', '2']},
+                'OGG': {'audio': ['-c:a', 'libvorbis', '-q:a', '6']},
+                'FLAC': {'audio': ['-c:a', 'flac', '-compression_level', '5']},
+                'AAC': {'audio': ['-c:a', 'aac', '-b:a', '192k']},
+                'M4A': {'audio': ['-c:a', 'aac', '-b:a', '192k']},
+            },
+            'archival': {
+                'MP3': {'audio': ['-c:a', 'libmp3lame', '-q:a', '0']},
+                'OGG': {'audio': ['-c:a', 'libvorbis', '-q:a', '9']},
+                'FLAC': {'audio': ['-c:a', 'flac', '-compression_level', '12']},
+                'AAC': {'audio': ['-c:a', 'aac', '-b:a', '256k']},
+                'M4A': {'audio': ['-c:a', 'alac']},
+            },
+        },
     },
     'media_video': {
         'extensions': [".mp4", ".avi", ".mkv", ".mov"],
         'targets': ["MP4", "AVI", "MKV", "MOV"] + [f"{a.upper()} (extract audio)" for a in ["mp3", "wav", "ogg", "flac", "aac", "m4a"]],
+        # x264/x265 presets trade speed for size at a fixed CRF quality; AVI
+        # can't hold either and gets MPEG-4 Part 2 with a fixed quantizer
+        'profiles': {
+            'fast': {
+                'MP4': {'video': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '25'], 'audio': ['-c:a', 'aac', '-b:a', '128k']},
+                'MOV': {'video': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '25'], 'audio': ['-c:a', 'aac', '-b:a', '128k']},
+                'MKV': {'video': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '25'], 'audio': ['-c:a', 'aac', '-b:a', '128k']},
+                'AVI': {'video': ['-c:v', 'mpeg4', '-q:v', '6'], 'audio': ['-c:a', 'libmp3lame', '-q:a', '5']},
+            },
+            'balanced': {
+                'MP4': {'video': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'], 'audio': ['-c:a', 'aac', '-b:a', '160k']},
+                'MOV': {'video': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'], 'audio': ['-c:a', 'aac', '-b:a', '160k']},
+                'MKV': {'video': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'], 'audio': ['-c:a', 'aac', '-b:a', '160k']},
+                'AVI': {'video': ['-c:v', 'mpeg4', '-q:v', '4'], 'audio': ['-c:a', 'libmp3lame', '-q:a', '2']},
+            },
+            'archival': {
+                # hvc1 tagging lets Apple players open HEVC in MP4/MOV
+                'MP4': {'video': ['-c:v', 'libx265', '-preset', 'slow', '-crf', '20', '-tag:v', 'hvc1'], 'audio': ['-c:a', 'aac', '-b:a', '256k']},
+                'MOV': {'video': ['-c:v', 'libx265', '-preset', 'slow', '-crf', '20', '-tag:v', 'hvc1'], 'audio': ['-c:a', 'aac', '-b:a', '256k']},
+                'MKV': {'video': ['-c:v', 'libx265', '-preset', 'slow', '-crf', '20'], 'audio': ['-c:a', 'flac']},
+                'AVI': {'video': ['-c:v', 'mpeg4', '-q:v', '2'], 'audio': ['-c:a', 'libmp3lame', '-q:a', '0']},
+            },
+        },
     },
 }
+MEDIA_PROFILES = ["fast", "balanced", "archival"]
 
 if ENVELOPE_SUPPORT:
     formats['docs']['extensions'].append('.rtf')
@@ -288,7 +697,166 @@ def get_category(file_path):
     else:
         return None
 
-def convert_docs(file_path, target):
+# batch jobs running side by side; workers a single file starts share the CPUs with them
+_batch_jobs_at_once = 1
+
+def per_file_workers(setting):
+    """Workers one file may use under `setting` (e.g. 'sheet_workers'). An
+    unset value means one per CPU, divided among the jobs of a running batch
+    so a pool of N jobs doesn't start N workers each."""
+    return get_setting(setting) or max(1, (os.cpu_count() or 1) // _batch_jobs_at_once)
+
+# PDFs with at least this many pages are split across `pdf_workers` processes
+PDF_PARALLEL_MIN_PAGES = 64
+# pages handed to a worker process at a time
+PDF_PAGES_PER_TASK = 16
+
+
+def parse_page_range(spec, page_count):
+    """Turn a 1-based page range like "1-5,8,10-" into 0-based page indices."""
+    indices = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
+        try:
+            start = int(first) if first.strip() else 1
+            stop = (int(last) if last.strip() else page_count) if dash else start
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part}")
+        if start > stop:
+            raise ValueError(f"Invalid page range: {part}")
+        if start < 1 or stop > page_count:
+            raise ValueError(f"Page range {part} is outside 1-{page_count}")
+        indices.extend(range(start - 1, stop))
+    if not indices:
+        raise ValueError(f"Invalid page range: {spec}")
+    return indices
+
+
+def _pdf_pages_text(file_path, indices):
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    return [reader.pages[i].extract_text() + '\n' for i in indices]
+
+
+def iter_pdf_text(file_path, pages=None, workers=None):
+    """Yield the text of a PDF page by page, each page followed by a newline.
+
+    `pages` is a page range as accepted by `parse_page_range` (default: the
+    `pdf_pages` setting, or every page). Large documents are extracted by
+    `workers` processes (default: the `pdf_workers` setting), a few pages per
+    task, and still come out in order.
+    """
+    from pypdf import PdfReader
+    reader = PdfReader(file_path)
+    if pages is None:
+        pages = get_setting('pdf_pages')
+    if workers is None:
+        workers = per_file_workers('pdf_workers')
+    indices = parse_page_range(pages, len(reader.pages)) if pages else range(len(reader.pages))
+    if workers <= 1 or len(indices) < PDF_PARALLEL_MIN_PAGES:
+        for i in indices:
+            yield reader.pages[i].extract_text() + '\n'
+        return
+    tasks = [indices[i:i + PDF_PAGES_PER_TASK] for i in range(0, len(indices), PDF_PAGES_PER_TASK)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep a couple of tasks per worker queued so output streams without piling up
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(_pdf_pages_text, file_path, list(task)))
+            if len(pending) > workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_text_output(chunks, new_file_path, target):
+    """Write text arriving in chunks (e.g. one per PDF page) as `target`
+    without joining it into one string first."""
+    if target in ["TXT", "MD"]:
+        with open(new_file_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    elif target == "HTML":
+        with open(new_file_path, 'w', encoding='utf-8') as f:
+            f.write("<html><body><pre>")
+            for chunk in chunks:
+                f.write(chunk.replace('<', '&lt;').replace('>', '&gt;'))
+            f.write("</pre></body></html>")
+    elif target in ["DOCX", "ODT"]:
+        if target == "DOCX":
+            from docx import Document
+            doc = Document()
+            add_paragraph = doc.add_paragraph
+        else:
+            import ezodf
+            doc = ezodf.newdoc(doctype='odt', filename=new_file_path)
+            add_paragraph = lambda para_text: doc.body.append(ezodf.Paragraph(para_text))
+        # one paragraph per line; a line may be split across chunks
+        partial = ''
+        for chunk in chunks:
+            lines = (partial + chunk).split('\n')
+            partial = lines.pop()
+            for para_text in lines:
+                add_paragraph(para_text)
+        add_paragraph(partial)
+        if target == "DOCX":
+            doc.save(new_file_path)
+        else:
+            doc.save()
+    elif target == "RTF":
+        raise ValueError("RTF output not supported without LibreOffice")
+    else:
+        raise ValueError("Unsupported target format")
+
+
+def _remember_chunks(chunks, extracted, key):
+    """Pass `chunks` through, keeping a copy in `extracted[key]` once all of
+    them have been read."""
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        yield chunk
+    extracted[key] = seen
+
+
+def extract_doc_text(file_path):
+    """Plain text of a document, for conversions without LibreOffice."""
+    from docx import Document
+    from bs4 import BeautifulSoup
+    import ezodf
+    input_ext = os.path.splitext(file_path)[1].lower()[1:]
+    if input_ext in ["txt", "md"]:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    elif input_ext == "pdf":
+        text = ''.join(iter_pdf_text(file_path))
+    elif input_ext == "docx":
+        doc = Document(file_path)
+        text = '\n'.join([para.text for para in doc.paragraphs])
+    elif input_ext == "html":
+        with open(file_path, 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+            text = soup.get_text()
+    elif input_ext == "odt":
+        doc = ezodf.opendoc(file_path)
+        text = '\n'.join(obj.text or '' for obj in doc.body if obj.kind == 'Paragraph')
+    elif input_ext == "rtf":
+        raise ValueError("RTF input not supported without LibreOffice")
+    else:
+        raise ValueError("Unsupported input format")
+    return text
+
+def convert_docs(file_path, target, extracted=None):
+    """Convert a document to `target`.
+
+    `extracted` is an optional dict shared between calls for the same file;
+    text pulled out by the manual fallback is kept there so converting to
+    several targets extracts it once.
+    """
+    from bs4 import BeautifulSoup
     input_ext = os.path.splitext(file_path)[1].lower()[1:]
     new_file_path = os.path.splitext(file_path)[0] + '.' + target.lower()
 
@@ -333,18 +901,24 @@ def convert_docs(file_path, target):
     else:
         text = None
 
+    # PDFs are streamed page by page straight into the output; LibreOffice
+    # opens them in Draw, which has none of the text export filters
+    if text is None and input_ext == "pdf":
+        if extracted is not None and 'pdf_pages' in extracted:
+            pages = extracted['pdf_pages']
+        else:
+            pages = iter_pdf_text(file_path)
+            if extracted is not None:
+                pages = _remember_chunks(pages, extracted, 'pdf_pages')
+        write_text_output(pages, new_file_path, target)
+        return new_file_path
+
     # if envelope didn't produce output, fall back to LibreOffice or manual logic
     if text is None:
         if ENVELOPE_SUPPORT:
             print("Attempting conversion with LibreOffice...")
             try:
-                ext = target.lower()
-                out_dir = os.path.dirname(new_file_path)
-                cmd = ['soffice', '--headless', '--convert-to', ext, file_path, '--outdir', out_dir]
-                subprocess.check_call(cmd)
-                produced = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0] + '.' + ext)
-                if produced != new_file_path:
-                    os.rename(produced, new_file_path)
+                libreoffice_convert(file_path, new_file_path)
                 print("LibreOffice conversion successful.")
                 return new_file_path
             except Exception as e:
@@ -352,55 +926,26 @@ def convert_docs(file_path, target):
         else:
             print("LibreOffice not supported. Falling back to manual conversion.")
 
-        # manual extraction to plain text
-        if input_ext in ["txt", "md"]:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-        elif input_ext == "pdf":
-            reader = PdfReader(file_path)
-            text = ''
-            for page in reader.pages:
-                text += page.extract_text() + '\n'
-        elif input_ext == "docx":
-            doc = Document(file_path)
-            text = '\n'.join([para.text for para in doc.paragraphs])
-        elif input_ext == "html":
-            with open(file_path, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-                text = soup.get_text()
-        elif input_ext == "odt":
-            doc = ezodf.opendoc(file_path)
-            text = '\n'.join(obj.text or '' for obj in doc.body if obj.kind == 'Paragraph')
-        elif input_ext == "rtf":
-            raise ValueError("RTF input not supported without LibreOffice")
+        # manual extraction to plain text, shared by every target of a fan-out
+        if extracted is not None and 'text' in extracted:
+            text = extracted['text']
         else:
-            raise ValueError("Unsupported input format")
+            text = extract_doc_text(file_path)
+            if extracted is not None:
+                extracted['text'] = text
 
     # at this point we have `text` for non-HTML targets
-    if target in ["TXT", "MD"]:
-        with open(new_file_path, 'w', encoding='utf-8') as f:
-            f.write(text)
-    elif target == "DOCX":
-        doc = Document()
-        for para_text in text.split('\n'):
-            doc.add_paragraph(para_text)
-        doc.save(new_file_path)
-    elif target == "HTML":
-        with open(new_file_path, 'w', encoding='utf-8') as f:
-            escaped_text = text.replace('<', '&lt;').replace('>', '&gt;')
-            f.write(f"<html><body><pre>{escaped_text}</pre></body></html>")
-    elif target == "ODT":
-        doc = ezodf.newdoc(doctype='odt', filename=new_file_path)
-        for para_text in text.split('\n'):
-            doc.body.append(ezodf.Paragraph(para_text))
-        doc.save()
-    elif target == "RTF":
-        raise ValueError("RTF output not supported without LibreOffice")
-    else:
-        raise ValueError("Unsupported target format")
+    write_text_output([text], new_file_path, target)
     return new_file_path
 
 def convert_presentations(file_path, target):
+    from pptx import Presentation
+    from pptx.util import Inches
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from docx import Document
+    from bs4 import BeautifulSoup
+    import ezodf
     input_ext = os.path.splitext(file_path)[1].lower()[1:]
     new_file_path = os.path.splitext(file_path)[0] + '.' + target.lower()
     text = None
@@ -446,13 +991,7 @@ def convert_presentations(file_path, target):
         if ENVELOPE_SUPPORT:
             print("Attempting conversion with LibreOffice...")
             try:
-                ext = target.lower()
-                out_dir = os.path.dirname(new_file_path)
-                cmd = ['soffice', '--headless', '--convert-to', ext, file_path, '--outdir', out_dir]
-                subprocess.check_call(cmd)
-                produced = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0] + '.' + ext)
-                if produced != new_file_path:
-                    os.rename(produced, new_file_path)
+                libreoffice_convert(file_path, new_file_path)
                 print("LibreOffice conversion successful.")
                 return new_file_path
             except Exception as e:
@@ -514,35 +1053,249 @@ def convert_presentations(file_path, target):
         raise ValueError("Unsupported target format")
     return new_file_path
 
-def convert_images(file_path, target):
+def image_target_size(size, spec):
+    """Size to scale an image of `size` down to for a resize spec: "50%",
+    "800x600" (fit inside the box, keeping the aspect ratio) or "800" (longest
+    side). None when no resize is needed; images are never enlarged."""
+    if not spec:
+        return None
+    width, height = size
+    spec = str(spec).strip().lower()
+    if spec.endswith('%'):
+        scale = float(spec[:-1]) / 100
+    else:
+        box_width, _, box_height = spec.partition('x')
+        box_width = int(box_width)
+        box_height = int(box_height) if box_height else box_width
+        scale = min(box_width / width, box_height / height)
+    if scale <= 0:
+        raise ValueError(f"Invalid resize: {spec}")
+    if scale >= 1:
+        return None
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def open_image(file_path):
+    """Open and decode an image, scaled down to the `image_resize` setting.
+
+    JPEGs that are being shrunk are decoded at reduced size (libjpeg can scale
+    by 1/2, 1/4 or 1/8 while decoding), so a camera photo never has to be
+    expanded to full resolution just to be thrown away again.
+    """
+    from PIL import Image
+    img = Image.open(file_path)
+    if frame_count(img) > 1:
+        # animations and multi-page files are decoded (and scaled) frame by frame while saving
+        return img
+    return scale_image(img)
+
+def scale_image(img):
+    """Decode the current frame of `img`, scaled to the `image_resize` setting."""
+    from PIL import Image
+    size = image_target_size(img.size, get_setting('image_resize'))
+    if size is None:
+        img.load()
+        return img
+    # decode at no less than twice the final size so the resample below still has detail to work with
+    img.draft(None, (size[0] * 2, size[1] * 2))
+    img.load()
+    if img.mode in ('P', '1'):
+        # Pillow resamples palette images with nearest neighbour only
+        img = img.convert('RGBA' if img.has_transparency_data else 'RGB')
+    return img.resize(size, Image.LANCZOS, reducing_gap=2.0)
+
+# targets that can hold several frames; others get the first frame of an animation
+MULTI_FRAME_TARGETS = ["GIF", "WEBP", "PNG", "TIFF", "AVIF"]
+# APNG disposal ops (none, background, previous) in GIF numbering and back
+APNG_TO_GIF_DISPOSAL = {0: 1, 1: 2, 2: 3}
+GIF_TO_APNG_DISPOSAL = {2: 1, 3: 2}
+
+def frame_count(img):
+    return getattr(img, 'n_frames', 1)
+
+def image_frames(img):
+    """Frames of `img`, decoded and scaled one at a time."""
+    from PIL import ImageSequence
+    for frame in ImageSequence.Iterator(img):
+        yield scale_image(frame).copy()
+
+def image_frame_timing(img):
+    """Per-frame durations (ms) and GIF disposal methods of a multi-frame image.
+
+    Only one decoded frame is held at a time; the image is left on its first
+    frame afterwards.
+    """
+    from PIL import ImageSequence
+    durations, disposals = [], []
+    for frame in ImageSequence.Iterator(img):
+        # WEBP and AVIF only know a frame's duration once it is decoded
+        frame.load()
+        # the APNG reader gives float durations, which the AVIF writer refuses
+        durations.append(int(round(frame.info.get('duration', 0))))
+        if hasattr(frame, 'disposal_method'):
+            disposals.append(frame.disposal_method)
+        else:
+            disposals.append(APNG_TO_GIF_DISPOSAL.get(frame.info.get('disposal'), 0))
+    img.seek(0)
+    return durations, disposals
+
+def save_frames(img, new_file_path, target, preset=None):
+    """Write every frame of a multi-frame image, keeping frame durations, loop
+    count and (for GIF and APNG) disposal methods.
+
+    Without resizing the source image itself is handed to the writer, which
+    seeks through it so only one decoded frame exists at a time (except for
+    Pillow's GIF and APNG writers, which keep every frame until the file is
+    written). Scaled frames have to be passed as a list, but they are decoded
+    and shrunk one at a time, so only the small copies are kept.
+    """
+    options = image_save_options(target, preset)
+    options['save_all'] = True
+    if target != "TIFF":
+        durations, disposals = image_frame_timing(img)
+        options['duration'] = durations
+        loop = img.info.get('loop')
+        if target == "GIF":
+            options['disposal'] = disposals
+            if loop is not None:
+                options['loop'] = loop
+        elif target in ["WEBP", "PNG"]:
+            # a GIF without a loop count plays once; WEBP and APNG default to forever
+            options['loop'] = 1 if loop is None else loop
+        if target == "PNG":
+            options['disposal'] = [GIF_TO_APNG_DISPOSAL.get(d, 0) for d in disposals]
+    image_format = "JPEG" if target == "JPG" else target
+    if get_setting('image_resize'):
+        frames = list(image_frames(img))
+        frames[0].save(new_file_path, image_format, append_images=frames[1:], **options)
+    else:
+        img.save(new_file_path, image_format, **options)
+        img.seek(0)
+
+ICO_SIZES = [16, 24, 32, 40, 48, 64, 128, 256]
+
+def ico_layers(img, sizes):
+    """Scale `img` to square ICO layers, largest first.
+
+    The largest layer is resampled from the image (padded to a square with
+    transparency); every smaller one from the smallest layer already made that
+    is at least twice its size, so a full-resolution image is only resampled
+    once however many sizes are requested.
+    """
+    from PIL import Image
+    sizes = sorted(set(sizes), reverse=True)
+    # like Pillow, don't enlarge images into sizes bigger than they are
+    fitting = [s for s in sizes if s <= max(img.size)] or sizes[-1:]
+    largest = fitting[0]
+    # opaque square images stay 24-bit; padding needs an alpha channel
+    if img.mode not in ('RGB', 'RGBA') or img.width != img.height:
+        img = img.convert('RGBA')
+    scale = largest / max(img.size)
+    base = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                      Image.LANCZOS, reducing_gap=2.0)
+    if base.size != (largest, largest):
+        square = Image.new('RGBA', (largest, largest))
+        square.paste(base, ((largest - base.width) // 2, (largest - base.height) // 2))
+        base = square
+    layers = [base]
+    for size in fitting[1:]:
+        source = min((layer for layer in layers if layer.width >= size * 2), key=lambda layer: layer.width,
+                     default=layers[-1])
+        layers.append(source.resize((size, size), Image.LANCZOS))
+    return layers
+
+def convert_images(file_path, target, ico_sizes=None, preset=None):
     input_ext = os.path.splitext(file_path)[1].lower()[1:]
     if input_ext == "jpeg":
         input_ext = "jpg"
     new_file_path = os.path.splitext(file_path)[0] + '.' + target.lower()
-    img = Image.open(file_path)
+    img = open_image(file_path)
+    save_image(img, new_file_path, target, ico_sizes, preset)
+    return new_file_path
+
+def convert_images_multi(file_path, targets):
+    """Decode an image once and write it out in every format in `targets`.
+
+    Returns a dict mapping each target to its output path, or to the
+    exception that target failed with.
+    """
+    img = open_image(file_path)
+    results = {}
+    for target in targets:
+        new_file_path = os.path.splitext(file_path)[0] + '.' + target.lower()
+        try:
+            save_image(img, new_file_path, target)
+            results[target] = new_file_path
+        except Exception as e:
+            results[target] = e
+    return results
+
+# Encoder options per preset and target. Quality stays the same across
+# presets (Pillow's defaults); the presets only trade encoding effort for
+# size. "balanced" is exactly what Pillow does by default, which for JPG,
+# GIF and TIFF is already as fast as Pillow gets, so "fast" leaves them alone.
+IMAGE_PRESETS = {
+    'fast': {
+        'PNG': {'compress_level': 1},
+        'WEBP': {'quality': 80, 'method': 0},
+        'AVIF': {'quality': 75, 'speed': 10},
+    },
+    'balanced': {
+        'JPG': {'quality': 75},
+        'PNG': {'compress_level': 6},
+        'WEBP': {'quality': 80, 'method': 4},
+        'AVIF': {'quality': 75, 'speed': 6},
+    },
+    'smallest': {
+        'JPG': {'quality': 75, 'optimize': True, 'progressive': True},
+        # optimize also means compression level 9
+        'PNG': {'optimize': True},
+        'WEBP': {'quality': 80, 'method': 6},
+        # lower speeds take minutes on large images for a percent or two
+        'AVIF': {'quality': 75, 'speed': 4},
+        'GIF': {'optimize': True},
+        'TIFF': {'compression': 'tiff_adobe_deflate'},
+    },
+}
+
+def image_save_options(target, preset=None):
+    """Pillow save() options for `target` under `preset` (default: the
+    `image_preset` setting)."""
+    preset = preset or get_setting('image_preset') or 'balanced'
+    if preset not in IMAGE_PRESETS:
+        raise ValueError(f"Unknown image preset: {preset}")
+    return dict(IMAGE_PRESETS[preset].get(target, {}))
+
+def save_image(img, new_file_path, target, ico_sizes=None, preset=None):
+    if frame_count(img) > 1:
+        if target in MULTI_FRAME_TARGETS:
+            save_frames(img, new_file_path, target, preset)
+            return
+        img.seek(0)
+        img = scale_image(img)
+    options = image_save_options(target, preset)
     if target == "JPG":
         if img.mode in ('RGBA', 'LA', 'P'):
             img = img.convert('RGB')
-        img.save(new_file_path, 'JPEG')
+        img.save(new_file_path, 'JPEG', **options)
     elif target == "PNG":
-        img.save(new_file_path, 'PNG')
+        img.save(new_file_path, 'PNG', **options)
     elif target == "WEBP":
-        img.save(new_file_path, 'WEBP')
+        img.save(new_file_path, 'WEBP', **options)
     elif target == "AVIF":
-        img.save(new_file_path, 'AVIF')
+        img.save(new_file_path, 'AVIF', **options)
     elif target == "ICO":
-        sizes = [16, 24, 32, 40, 48, 64, 128, 256]
-        selected_tuples = [(s, s) for s in sizes]
-        img.save(new_file_path, format='ICO', sizes=selected_tuples, bitmap_format="bmp")
+        layers = ico_layers(img, ico_sizes or get_setting('ico_sizes') or ICO_SIZES)
+        # layers whose size matches a requested size are written as they are instead of resampled again
+        layers[0].save(new_file_path, format='ICO', sizes=[layer.size for layer in layers],
+                       append_images=layers[1:], bitmap_format="bmp")
     elif target == "BMP":
         img.save(new_file_path, 'BMP')
     elif target == "GIF":
-        img.save(new_file_path, 'GIF')
+        img.save(new_file_path, 'GIF', **options)
     elif target == "TIFF":
-        img.save(new_file_path, 'TIFF')
+        img.save(new_file_path, 'TIFF', **options)
     else:
         raise ValueError("Unsupported target format")
-    return new_file_path
 
 def get_archive_type(fp):
     lfp = fp.lower()
@@ -558,63 +1311,542 @@ def get_archive_type(fp):
         return 'tbz2'
     raise ValueError("Unsupported archive type")
 
+# Archives are converted member by member: each member is read from the
+# source and written straight into the target, so nothing is extracted to
+# disk and memory stays bounded whatever the archive size. 7z members are
+# spooled one at a time because py7zr only hands them out by pushing.
+ARCHIVE_CHUNK = 1024 * 1024
+ARCHIVE_SPOOL_BYTES = 16 * 1024 * 1024
+ARCHIVE_EXTENSIONS = {
+    'ZIP': '.zip',
+    '7Z': '.7z',
+    'TAR': '.tar',
+    'TGZ': '.tar.gz',
+    'TBZ2': '.tar.bz2'
+}
+TAR_MODES = {'tar': '', 'tgz': 'gz', 'tbz2': 'bz2'}
+
+
+class ArchiveMember:
+    """Format-neutral description of one archive entry.
+
+    `kind` is 'file', 'dir', 'symlink' or 'other' (hard links, devices, ...,
+    which only tar targets can keep); `tarinfo` is the original entry when the
+    source is a tar archive.
+    """
+
+    def __init__(self, name, kind, size=0, mtime=None, mode=None, linkname='', tarinfo=None):
+        self.name = name.rstrip('/')
+        self.kind = kind
+        self.size = size
+        self.mtime = time.time() if mtime is None else mtime
+        if mode is None:
+            mode = 0o755 if kind == 'dir' else 0o777 if kind == 'symlink' else 0o644
+        self.mode = mode & 0o7777
+        self.linkname = linkname
+        self.tarinfo = tarinfo
+
+
+def read_archive(file_path, input_type, emit):
+    """Call `emit(member, fileobj)` for every entry of the archive, in order.
+
+    `fileobj` is a readable stream of the member's data for files and None
+    for everything else; it is only valid during the call.
+    """
+    if input_type == 'zip':
+        with zipfile.ZipFile(file_path, 'r') as z:
+            for info in z.infolist():
+                mode = info.external_attr >> 16 if info.create_system == 3 else 0
+                mtime = time.mktime(info.date_time + (0, 0, -1))
+                if info.is_dir() or stat.S_ISDIR(mode):
+                    emit(ArchiveMember(info.filename, 'dir', mtime=mtime, mode=mode or None), None)
+                elif stat.S_ISLNK(mode):
+                    linkname = z.read(info).decode('utf-8')
+                    emit(ArchiveMember(info.filename, 'symlink', mtime=mtime, mode=mode, linkname=linkname), None)
+                else:
+                    member = ArchiveMember(info.filename, 'file', info.file_size, mtime, mode or None)
+                    with z.open(info) as src:
+                        emit(member, src)
+    elif input_type == '7z':
+        import py7zr
+        from py7zr.io import WriterFactory, Py7zIO
+        with py7zr.SevenZipFile(file_path, 'r') as z:
+            infos = {}
+            for f in z.files:
+                mtime = f.lastwritetime.totimestamp() if f.lastwritetime else None
+                kind = 'dir' if f.is_directory else 'symlink' if f.is_symlink else 'file'
+                infos[f.filename] = ArchiveMember(f.filename, kind, f.uncompressed or 0, mtime, f.posix_mode)
+            # directories carry no data and are never handed to the factory
+            for member in infos.values():
+                if member.kind == 'dir':
+                    emit(member, None)
+
+            class Spool(Py7zIO):
+                def __init__(self, name):
+                    self.name = name
+                    self.data = tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_BYTES)
+
+                def write(self, b):
+                    return self.data.write(b)
+
+                def read(self, size=None):
+                    return self.data.read(size)
+
+                def seek(self, offset, whence=0):
+                    return self.data.seek(offset, whence)
+
+                def flush(self):
+                    pass
+
+                def size(self):
+                    return self.data.seek(0, os.SEEK_END)
+
+                def close(self):
+                    # py7zr calls this as soon as the member is fully decoded
+                    member = infos.get(self.name) or ArchiveMember(self.name, 'file')
+                    try:
+                        member.size = self.data.seek(0, os.SEEK_END)
+                        self.data.seek(0)
+                        if member.kind == 'symlink':
+                            member.linkname = self.data.read().decode('utf-8')
+                            emit(member, None)
+                        else:
+                            emit(member, self.data)
+                    finally:
+                        self.data.close()
+
+            class SpoolFactory(WriterFactory):
+                def create(self, filename):
+                    return Spool(filename)
+
+            z.extractall(factory=SpoolFactory())
+    else:
+        with tarfile.open(file_path, 'r:' + TAR_MODES[input_type]) as t:
+            for ti in t:
+                if ti.isdir():
+                    emit(ArchiveMember(ti.name, 'dir', mtime=ti.mtime, mode=ti.mode, tarinfo=ti), None)
+                elif ti.issym():
+                    emit(ArchiveMember(ti.name, 'symlink', mtime=ti.mtime, mode=ti.mode, linkname=ti.linkname, tarinfo=ti), None)
+                elif ti.isreg():
+                    with t.extractfile(ti) as src:
+                        emit(ArchiveMember(ti.name, 'file', ti.size, ti.mtime, ti.mode, tarinfo=ti), src)
+                else:
+                    emit(ArchiveMember(ti.name, 'other', mtime=ti.mtime, mode=ti.mode, linkname=ti.linkname, tarinfo=ti), None)
+
+
+class ZipArchiveWriter:
+    def __init__(self, path, level=None):
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED, compresslevel=level)
+
+    def add(self, member, src):
+        # zip timestamps can't go before 1980
+        info = zipfile.ZipInfo(member.name, time.localtime(max(member.mtime, 315532800))[:6])
+        info.create_system = 3
+        if member.kind == 'dir':
+            info.filename += '/'
+            info.external_attr = ((stat.S_IFDIR | member.mode) << 16) | 0x10
+            self.zip.writestr(info, b'')
+        elif member.kind == 'symlink':
+            info.external_attr = (stat.S_IFLNK | member.mode) << 16
+            self.zip.writestr(info, member.linkname.encode('utf-8'))
+        elif member.kind == 'file':
+            info.external_attr = (stat.S_IFREG | member.mode) << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = member.size
+            with self.zip.open(info, 'w', force_zip64=member.size > zipfile.ZIP64_LIMIT) as dst:
+                shutil.copyfileobj(src, dst, ARCHIVE_CHUNK)
+        else:
+            print(f"Skipping {member.name}: ZIP archives can't hold this kind of entry")
+
+    def close(self):
+        self.zip.close()
+
+
+class TarArchiveWriter:
+    def __init__(self, path, compression='', level=9, fileobj=None):
+        self.fileobj = fileobj
+        if fileobj is not None:
+            # the stream does its own compression; tarfile just writes plain tar into it
+            self.tar = tarfile.open(mode='w|', fileobj=fileobj)
+        elif compression:
+            self.tar = tarfile.open(path, 'w:' + compression, compresslevel=level)
+        else:
+            self.tar = tarfile.open(path, 'w')
+
+    def add(self, member, src):
+        if member.tarinfo is not None:
+            # tar to tar keeps owners, hard links and devices as they were
+            self.tar.addfile(member.tarinfo, src)
+            return
+        info = tarfile.TarInfo(member.name)
+        info.mtime = member.mtime
+        info.mode = member.mode
+        if member.kind == 'dir':
+            info.type = tarfile.DIRTYPE
+        elif member.kind == 'symlink':
+            info.type = tarfile.SYMTYPE
+            info.linkname = member.linkname
+        elif member.kind == 'file':
+            info.size = member.size
+        else:
+            print(f"Skipping {member.name}: unsupported entry type")
+            return
+        self.tar.addfile(info, src if member.kind == 'file' else None)
+
+    def close(self):
+        try:
+            self.tar.close()
+        finally:
+            if self.fileobj is not None:
+                self.fileobj.close()
+
+
+class SevenZipArchiveWriter:
+    """py7zr takes file metadata from the file system, so each member is
+    staged as a scratch file carrying its mode and mtime, added, and removed
+    again before the next one."""
+
+    def __init__(self, path):
+        import py7zr
+        self.zip = py7zr.SevenZipFile(path, 'w')
+        self.scratch_dir = tempfile.mkdtemp(prefix="wormhole_7z_")
+
+    def add(self, member, src):
+        if member.kind == 'symlink':
+            self._add_symlink(member)
+            return
+        if member.kind not in ('file', 'dir'):
+            print(f"Skipping {member.name}: 7Z archives can't hold this kind of entry")
+            return
+        scratch = os.path.join(self.scratch_dir, "member")
+        try:
+            if member.kind == 'dir':
+                os.mkdir(scratch)
+            else:
+                with open(scratch, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, ARCHIVE_CHUNK)
+            os.chmod(scratch, member.mode)
+            os.utime(scratch, (member.mtime, member.mtime))
+            self.zip.write(scratch, member.name)
+        finally:
+            if os.path.isdir(scratch):
+                os.rmdir(scratch)
+            elif os.path.exists(scratch):
+                os.remove(scratch)
+
+    def _add_symlink(self, member):
+        # py7zr refuses dangling links, so the link is staged at its archive
+        # path with a placeholder where it points
+        stage = os.path.join(self.scratch_dir, "link")
+        link = os.path.normpath(os.path.join(stage, *member.name.split('/')))
+        target = os.path.normpath(os.path.join(os.path.dirname(link), member.linkname))
+        if os.path.isabs(member.linkname) or not (link + os.sep).startswith(stage + os.sep) \
+                or not target.startswith(stage + os.sep):
+            print(f"Skipping symlink {member.name}: it points outside the archive")
+            return
+        try:
+            os.makedirs(os.path.dirname(link), exist_ok=True)
+            try:
+                os.symlink(member.linkname, link)
+            except OSError as e:
+                # creating symlinks needs extra privileges on Windows
+                print(f"Skipping symlink {member.name}: {e}")
+                return
+            if not os.path.lexists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                open(target, 'wb').close()
+            if os.utime in os.supports_follow_symlinks:
+                os.utime(link, (member.mtime, member.mtime), follow_symlinks=False)
+            self.zip.write(link, member.name)
+        finally:
+            shutil.rmtree(stage, ignore_errors=True)
+
+    def close(self):
+        try:
+            self.zip.close()
+        finally:
+            shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+
+# Parallel compression splits the data into blocks that are compressed on a
+# thread pool (zlib and bz2 release the GIL) and written back in order.
+# Deflate blocks are primed with the previous block's last 32 KiB and end on a
+# sync flush, so together they form one ordinary deflate stream, as pigz does;
+# bzip2 blocks become back-to-back streams, which bzip2 and Python read as one.
+DEFLATE_BLOCK = 256 * 1024
+DEFLATE_WINDOW = 32 * 1024
+
+
+def archive_workers():
+    return per_file_workers('archive_workers')
+
+
+def _deflate_block(data, level, zdict, finish):
+    if zdict:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict)
+    else:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15, 9)
+    return c.compress(data) + c.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class OrderedOutput:
+    """Writes chunks to `fp` in the order they were queued while the queued
+    work runs on a thread pool; at most `max_pending` chunks wait at once.
+
+    Items are bytes or callables returning bytes (run when their turn comes,
+    which is where compression futures are collected).
+    """
+
+    def __init__(self, fp, max_pending):
+        self.fp = fp
+        self.max_pending = max_pending
+        self.pending = collections.deque()
+        self.position = 0
+
+    def put(self, item):
+        self.pending.append(item)
+        while len(self.pending) > self.max_pending:
+            self._write_next()
+
+    def flush(self):
+        while self.pending:
+            self._write_next()
+
+    def _write_next(self):
+        item = self.pending.popleft()
+        data = item() if callable(item) else item
+        if data:
+            self.fp.write(data)
+            self.position += len(data)
+
+
+class ParallelCompressedStream:
+    """Write-only file object producing a gzip or bzip2 file, compressed in
+    parallel. Used as the fileobj of a streaming tarfile."""
+
+    def __init__(self, path, kind, level, workers):
+        self.kind = kind
+        self.level = level
+        self.fp = open(path, 'wb')
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.out = OrderedOutput(self.fp, workers * 4)
+        # bzip2 compresses in blocks of level * 100 kB anyway, so cutting there costs no ratio
+        self.block_size = DEFLATE_BLOCK if kind == 'gz' else level * 100 * 1000
+        self.buffer = bytearray()
+        self.crc = 0
+        self.size = 0
+        self.window = b''
+        if kind == 'gz':
+            self.out.put(struct.pack('<BBBBIBB', 0x1f, 0x8b, 8, 0, int(time.time()), 0, 255))
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            block = bytes(self.buffer[:self.block_size])
+            del self.buffer[:self.block_size]
+            self._submit(block, False)
+        return len(data)
+
+    def _submit(self, block, finish):
+        if self.kind == 'gz':
+            self.crc = zlib.crc32(block, self.crc)
+            self.size += len(block)
+            future = self.executor.submit(_deflate_block, block, self.level, self.window, finish)
+            self.window = (self.window + block)[-DEFLATE_WINDOW:]
+        else:
+            future = self.executor.submit(bz2.compress, block, self.level)
+        self.out.put(future.result)
+
+    def close(self):
+        if self.fp.closed:
+            return
+        try:
+            if self.kind == 'gz' or self.buffer:
+                self._submit(bytes(self.buffer), True)
+            self.buffer = bytearray()
+            if self.kind == 'gz':
+                self.out.put(struct.pack('<II', self.crc, self.size & 0xffffffff))
+            self.out.flush()
+        finally:
+            self.executor.shutdown()
+            self.fp.close()
+
+
+class ParallelZipArchiveWriter:
+    """ZIP writer whose members are deflated block-parallel.
+
+    zipfile can only compress on the calling thread, so this writes the
+    format itself: local headers are followed by the data and a data
+    descriptor (sizes aren't known until the blocks finish), then the
+    central directory, with ZIP64 records where sizes or offsets need them.
+    """
+
+    def __init__(self, path, level, workers):
+        self.level = level
+        self.fp = open(path, 'wb')
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.out = OrderedOutput(self.fp, workers * 4)
+        self.entries = []
+
+    def add(self, member, src):
+        mode = member.mode
+        if member.kind == 'dir':
+            name, mode, data = member.name + '/', stat.S_IFDIR | mode, b''
+        elif member.kind == 'symlink':
+            name, mode, data = member.name, stat.S_IFLNK | mode, member.linkname.encode('utf-8')
+        elif member.kind == 'file':
+            name, mode, data = member.name, stat.S_IFREG | mode, None
+        else:
+            print(f"Skipping {member.name}: ZIP archives can't hold this kind of entry")
+            return
+        t = time.localtime(max(member.mtime, 315532800))
+        entry = {
+            'name': name.encode('utf-8'),
+            'flags': 0 if name.isascii() else 0x800,
+            'method': zipfile.ZIP_STORED,
+            'time': t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2,
+            'date': (t.tm_year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday,
+            'crc': 0, 'csize': 0, 'usize': 0,
+            'external_attr': (mode << 16) | (0x10 if member.kind == 'dir' else 0),
+            'zip64': False,
+        }
+        self.entries.append(entry)
+        if data is not None:
+            entry.update(crc=zlib.crc32(data), csize=len(data), usize=len(data))
+            self.out.put(lambda: self._local_header(entry) + data)
+            return
+
+        entry['method'] = zipfile.ZIP_DEFLATED
+        entry['flags'] |= 0x08
+        entry['zip64'] = member.size > zipfile.ZIP64_LIMIT
+        self.out.put(lambda: self._local_header(entry))
+        window = b''
+        block = src.read(DEFLATE_BLOCK)
+        while True:
+            next_block = src.read(DEFLATE_BLOCK) if block else b''
+            finish = not next_block
+            entry['crc'] = zlib.crc32(block, entry['crc'])
+            entry['usize'] += len(block)
+            future = self.executor.submit(_deflate_block, block, self.level, window, finish)
+            self.out.put(functools.partial(self._member_data, entry, future))
+            if finish:
+                break
+            window = (window + block)[-DEFLATE_WINDOW:]
+            block = next_block
+        self.out.put(lambda: self._data_descriptor(entry))
+
+    def _member_data(self, entry, future):
+        data = future.result()
+        entry['csize'] += len(data)
+        return data
+
+    def _local_header(self, entry):
+        entry['offset'] = self.out.position
+        extra = b''
+        if entry['flags'] & 0x08:
+            # sizes follow in the data descriptor
+            crc = csize = usize = 0
+            if entry['zip64']:
+                csize = usize = 0xffffffff
+                extra = struct.pack('<HHQQ', 1, 16, 0, 0)
+        else:
+            crc, csize, usize = entry['crc'], entry['csize'], entry['usize']
+        version = 45 if entry['zip64'] else 20
+        return struct.pack('<IHHHHHIIIHH', 0x04034b50, version, entry['flags'], entry['method'],
+                           entry['time'], entry['date'], crc, csize, usize,
+                           len(entry['name']), len(extra)) + entry['name'] + extra
+
+    def _data_descriptor(self, entry):
+        if entry['zip64']:
+            return struct.pack('<IIQQ', 0x08074b50, entry['crc'], entry['csize'], entry['usize'])
+        return struct.pack('<IIII', 0x08074b50, entry['crc'], entry['csize'], entry['usize'])
+
+    def _central_directory(self):
+        records = []
+        for entry in self.entries:
+            sizes = [entry['usize'], entry['csize'], entry['offset']]
+            extra_values = [v for v in sizes if v >= 0xffffffff]
+            usize, csize, offset = (min(v, 0xffffffff) for v in sizes)
+            extra = b''
+            if extra_values:
+                extra = struct.pack('<HH', 1, 8 * len(extra_values)) + struct.pack(f'<{len(extra_values)}Q', *extra_values)
+            version = 45 if extra_values or entry['zip64'] else 20
+            records.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, 3 << 8 | version, version,
+                                       entry['flags'], entry['method'], entry['time'], entry['date'],
+                                       entry['crc'], csize, usize, len(entry['name']), len(extra), 0,
+                                       0, 0, entry['external_attr'], offset) + entry['name'] + extra)
+        return b''.join(records)
+
+    def close(self):
+        if self.fp.closed:
+            return
+        try:
+            self.out.flush()
+            start = self.out.position
+            self.out.put(self._central_directory())
+            self.out.flush()
+            size = self.out.position - start
+            count = len(self.entries)
+            if count >= 0xffff or size >= 0xffffffff or start >= 0xffffffff:
+                zip64_end = self.out.position
+                self.out.put(struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 3 << 8 | 45, 45, 0, 0, count, count, size, start))
+                self.out.put(struct.pack('<IIQI', 0x07064b50, 0, zip64_end, 1))
+            self.out.put(struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, min(count, 0xffff), min(count, 0xffff),
+                                     min(size, 0xffffffff), min(start, 0xffffffff), 0))
+            self.out.flush()
+        finally:
+            self.executor.shutdown()
+            self.fp.close()
+
+
+def open_archive_writer(path, target):
+    level = get_setting('archive_level')
+    workers = archive_workers()
+    if target == 'ZIP':
+        level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+        if workers > 1:
+            return ParallelZipArchiveWriter(path, level, workers)
+        return ZipArchiveWriter(path, level)
+    if target == '7Z':
+        return SevenZipArchiveWriter(path)
+    if target in ('TAR', 'TGZ', 'TBZ2'):
+        compression = TAR_MODES[target.lower()]
+        # tarfile's own default for both gzip and bzip2
+        level = 9 if level is None else level
+        if compression and workers > 1:
+            return TarArchiveWriter(path, fileobj=ParallelCompressedStream(path, compression, level, workers))
+        return TarArchiveWriter(path, compression, level)
+    raise ValueError("Unsupported target format")
+
+
+# files written through a temporary name get the permissions open() would
+# have given them; read once at import, as os.umask can only be read by setting it
+FILE_MODE = 0o666 & ~os.umask(0o022)
+os.umask(0o666 & ~FILE_MODE)
+
 def convert_archive(file_path, target):
     input_type = get_archive_type(file_path)
-    ext_map = {
-        'ZIP': '.zip',
-        '7Z': '.7z',
-        'TAR': '.tar',
-        'TGZ': '.tar.gz',
-        'TBZ2': '.tar.bz2'
-    }
-    new_file_path = os.path.splitext(file_path)[0] + ext_map[target]
-    temp_dir = tempfile.mkdtemp()
+    if target not in ARCHIVE_EXTENSIONS:
+        raise ValueError("Unsupported target format")
+    new_file_path = os.path.splitext(file_path)[0] + ARCHIVE_EXTENSIONS[target]
+    # write next to the destination and move into place at the end, so a
+    # failed conversion leaves nothing half-written and the source may even
+    # be the destination
+    fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(new_file_path)), suffix=".partial")
+    os.close(fd)
     try:
-        # Extract
-        if input_type == 'zip':
-            with zipfile.ZipFile(file_path, 'r') as z:
-                z.extractall(temp_dir)
-        elif input_type == '7z':
-            with py7zr.SevenZipFile(file_path, 'r') as z:
-                z.extractall(temp_dir)
-        elif input_type == 'tar':
-            with tarfile.open(file_path, 'r') as t:
-                t.extractall(temp_dir)
-        elif input_type == 'tgz':
-            with tarfile.open(file_path, 'r:gz') as t:
-                t.extractall(temp_dir)
-        elif input_type == 'tbz2':
-            with tarfile.open(file_path, 'r:bz2') as t:
-                t.extractall(temp_dir)
-        
-        # Create new archive
-        if target == 'ZIP':
-            with zipfile.ZipFile(new_file_path, 'w', zipfile.ZIP_DEFLATED) as z:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        z.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), temp_dir))
-        elif target == '7Z':
-            with py7zr.SevenZipFile(new_file_path, 'w') as z:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        z.write(os.path.join(root, file), os.path.relpath(os.path.join(root, file), temp_dir))
-        elif target == 'TAR':
-            with tarfile.open(new_file_path, 'w') as t:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        t.add(os.path.join(root, file), os.path.relpath(os.path.join(root, file), temp_dir))
-        elif target == 'TGZ':
-            with tarfile.open(new_file_path, 'w:gz') as t:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        t.add(os.path.join(root, file), os.path.relpath(os.path.join(root, file), temp_dir))
-        elif target == 'TBZ2':
-            with tarfile.open(new_file_path, 'w:bz2') as t:
-                for root, dirs, files in os.walk(temp_dir):
-                    for file in files:
-                        t.add(os.path.join(root, file), os.path.relpath(os.path.join(root, file), temp_dir))
-    finally:
-        shutil.rmtree(temp_dir)
+        writer = open_archive_writer(partial_path, target)
+        try:
+            read_archive(file_path, input_type, writer.add)
+        finally:
+            writer.close()
+        # mkstemp creates the file readable by its owner only
+        os.chmod(partial_path, FILE_MODE)
+        os.replace(partial_path, new_file_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
     return new_file_path
 
 def convert_spreadsheets(file_path, target):
@@ -651,17 +1883,18 @@ def convert_spreadsheets(file_path, target):
         except Exception as e:
             print(f"Envelope JS conversion failed: {e}")
 
-    if data is None:
+    sheets = None
+    if data is None and input_ext in ["xlsx", "ods"]:
+        sheets = select_sheets(spreadsheet_sheet_names(file_path), get_setting('sheets'))
+
+    # LibreOffice exports only the active sheet to CSV and can't pick sheets
+    # (CSV input has no sheets to pick)
+    sheet_export = (sheets is not None and bool(get_setting('sheets'))) or (target == "CSV" and len(sheets or []) > 1)
+    if data is None and not sheet_export:
         if ENVELOPE_SUPPORT:
             print("Attempting conversion with LibreOffice...")
             try:
-                ext = target.lower()
-                out_dir = os.path.dirname(new_file_path)
-                cmd = ['soffice', '--headless', '--convert-to', ext, file_path, '--outdir', out_dir]
-                subprocess.check_call(cmd)
-                produced = os.path.join(out_dir, os.path.splitext(os.path.basename(file_path))[0] + '.' + ext)
-                if produced != new_file_path:
-                    os.rename(produced, new_file_path)
+                libreoffice_convert(file_path, new_file_path)
                 print("LibreOffice conversion successful.")
                 return new_file_path
             except Exception as e:
@@ -669,1132 +1902,2335 @@ def convert_spreadsheets(file_path, target):
         else:
             print("LibreOffice not supported. Falling back to manual conversion.")
 
-        # manual extraction to data list-of-lists
-        data = []
-        if input_ext == "xlsx":
-            wb = openpyxl.load_workbook(file_path)
-            sheet = wb.active
-            data = [[cell.value or '' for cell in row] for row in sheet.rows]
-        elif input_ext == "csv":
-            with open(file_path, 'r', newline='') as f:
-                reader = csv.reader(f)
-                data = list(reader)
-        elif input_ext == "ods":
-            doc = ezodf.opendoc(file_path)
-            sheet = doc.sheets[0]
-            data = [[cell.value or '' for cell in row] for row in sheet.rows()]
+    start = time.perf_counter()
+    if data is not None:
+        count = write_spreadsheet_rows(data, new_file_path, target)
+        outputs = [new_file_path]
+    else:
+        outputs, count = write_spreadsheet_sheets(file_path, sheets, new_file_path, target)
+    elapsed = time.perf_counter() - start
+    if elapsed > 0:
+        print(f"Wrote {count} rows in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s).")
+    return outputs[0] if len(outputs) == 1 else outputs
+
+def sheet_csv_path(file_path, sheet):
+    """Output path for one sheet when a workbook becomes several CSV files."""
+    safe = re.sub(r'[\\/:*?"<>|]+', '_', sheet).strip() or "sheet"
+    return f"{os.path.splitext(file_path)[0]}_{safe}.csv"
+
+def _sheet_to_csv(file_path, sheet, out_path):
+    return write_spreadsheet_rows(spreadsheet_rows(file_path, sheet), out_path, "CSV")
+
+def write_spreadsheet_sheets(file_path, sheets, new_file_path, target):
+    """Convert the given sheets of `file_path` (None for a CSV file) and
+    return (output paths, rows written).
+
+    A CSV target gets one file per sheet, exported concurrently by
+    `sheet_workers` processes since each only needs its own sheet; XLSX and
+    ODS targets get one workbook holding every sheet.
+    """
+    if sheets is None or (len(sheets) == 1 and target == "CSV"):
+        sheet = sheets[0] if sheets else None
+        rows = spreadsheet_rows(file_path, sheet)
+        # CSV cells are all text; typed targets get numbers, booleans and dates back
+        if sheets is None and target in ["XLSX", "ODS"] and get_setting('csv_infer_types'):
+            rows = typed_csv_rows(rows)
+        return [new_file_path], write_spreadsheet_rows(rows, new_file_path, target)
+
+    if target == "CSV":
+        outputs = [sheet_csv_path(file_path, sheet) for sheet in sheets]
+        workers = min(per_file_workers('sheet_workers'), len(sheets))
+        if workers <= 1:
+            counts = [_sheet_to_csv(file_path, sheet, out) for sheet, out in zip(sheets, outputs)]
         else:
-            raise ValueError("Unsupported input format")
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                counts = list(executor.map(_sheet_to_csv, [file_path] * len(sheets), sheets, outputs))
+        return outputs, sum(counts)
+
+    count = 0
+    if target == "XLSX":
+        import openpyxl
+        wb = openpyxl.Workbook(write_only=True)
+        titles = set()
+        for sheet in sheets:
+            # Excel titles are at most 31 characters and can't contain []:*?/\
+            title = re.sub(r'[\[\]:*?/\\]', '_', sheet)[:31] or "Sheet"
+            base, n = title, 2
+            while title.lower() in titles:
+                suffix = f" ({n})"
+                title, n = base[:31 - len(suffix)] + suffix, n + 1
+            titles.add(title.lower())
+            ws = wb.create_sheet(title)
+            for row in spreadsheet_rows(file_path, sheet):
+                ws.append(row)
+                count += 1
+        wb.save(new_file_path)
+    elif target == "ODS":
+        with OdsWriter(new_file_path) as writer:
+            for sheet in sheets:
+                count += writer.add_sheet(sheet, spreadsheet_rows(file_path, sheet))
+    else:
+        raise ValueError("Unsupported target format")
+    return [new_file_path], count
+
+def spreadsheet_sheet_names(file_path):
+    """Names of the sheets in an XLSX or ODS workbook, in order; a CSV file
+    is a single sheet named after the file."""
+    input_ext = os.path.splitext(file_path)[1].lower()[1:]
+    if input_ext == "xlsx":
+        import openpyxl
+        wb = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+    elif input_ext == "ods":
+        return _ods_sheet_names(file_path)
+    elif input_ext == "csv":
+        return [os.path.splitext(os.path.basename(file_path))[0]]
+    raise ValueError("Unsupported input format")
+
+def select_sheets(names, spec):
+    """Pick sheets by a comma separated list of names or 1-based positions
+    (all of them when `spec` is empty)."""
+    if not spec:
+        return list(names)
+    selected = []
+    for token in spec.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        if token in names:
+            name = token
+        elif token.isdigit() and 1 <= int(token) <= len(names):
+            name = names[int(token) - 1]
+        else:
+            raise ValueError(f"No sheet named {token!r} (sheets: {', '.join(names)})")
+        if name not in selected:
+            selected.append(name)
+    return selected
+
+def spreadsheet_rows(file_path, sheet=None):
+    """Iterate over the rows of one sheet (default: the active/first one) as
+    lists of cell values, reading one row at a time. Empty cells are ''."""
+    input_ext = os.path.splitext(file_path)[1].lower()[1:]
+    if input_ext == "xlsx":
+        return _xlsx_rows(file_path, sheet)
+    elif input_ext == "csv":
+        return _csv_rows(file_path)
+    elif input_ext == "ods":
+        return _ods_rows(file_path, sheet)
+    raise ValueError("Unsupported input format")
+
+def _xlsx_rows(file_path, sheet=None):
+    import openpyxl
+    # read-only mode parses the sheet XML as it goes instead of building every cell
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet] if sheet is not None else wb.active
+        for row in ws.iter_rows(values_only=True):
+            yield ['' if value is None else value for value in row]
+    finally:
+        wb.close()
+
+CSV_SNIFF_BYTES = 64 * 1024
+
+def detect_csv_encoding(file_path):
+    """Guess a CSV file's encoding from its first bytes: a BOM, else UTF-8 if
+    the sample decodes as such, else the system's legacy code page."""
+    import codecs
+    import locale
+    with open(file_path, 'rb') as f:
+        sample = f.read(CSV_SNIFF_BYTES)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    try:
+        # not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        preferred = locale.getpreferredencoding(False)
+        # a UTF-8 locale is no help for a file that isn't UTF-8; cp1252 is the usual culprit
+        return 'cp1252' if preferred.lower().replace('-', '') == 'utf8' else preferred
+
+def detect_csv_dialect(f):
+    """Sniff the delimiter and quoting from the start of an open CSV file and
+    rewind it; falls back to the standard comma-separated dialect."""
+    sample = f.read(CSV_SNIFF_BYTES)
+    f.seek(0)
+    delimiter = get_setting('csv_delimiter')
+    if delimiter:
+        dialect = csv.excel()
+        dialect.delimiter = '\t' if delimiter in ('\\t', 'tab') else delimiter
+        return dialect
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|')
+    except csv.Error:
+        return csv.excel
+
+def _csv_rows(file_path):
+    encoding = get_setting('csv_encoding') or detect_csv_encoding(file_path)
+    with open(file_path, 'r', newline='', encoding=encoding) as f:
+        yield from csv.reader(f, detect_csv_dialect(f))
+
+# Column types recognised in CSV input, most specific first. Every non-empty
+# value of a column's sample must match for the type to be used.
+_CSV_INT = r'[+-]?(?:0|[1-9]\d{0,14})'
+# no leading zeros, so codes such as "01234" keep their digits
+_CSV_FLOAT = r'[+-]?(?:(?:0|[1-9]\d*)(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+_CSV_BOOL = r'(?i:true|false)'
+_CSV_DATE = r'\d{4}-\d{2}-\d{2}'
+_CSV_DATETIME = r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d{1,6})?)?'
+
+def _csv_parse_bool(value):
+    return {'true': True, 'false': False}[value.lower()]
+
+def _csv_parse_date(value):
+    import datetime
+    return datetime.date.fromisoformat(value)
+
+def _csv_parse_datetime(value):
+    import datetime
+    return datetime.datetime.fromisoformat(value)
+
+CSV_COLUMN_TYPES = [
+    ('int', _CSV_INT, int),
+    ('float', _CSV_FLOAT, float),
+    ('bool', _CSV_BOOL, _csv_parse_bool),
+    ('date', _CSV_DATE, _csv_parse_date),
+    ('datetime', _CSV_DATETIME, _csv_parse_datetime),
+]
+# each pattern matches a whole newline-joined column sample in one regex call
+_CSV_COLUMN_PATTERNS = [(name, re.compile(rf'(?:{pattern}\n)*{pattern}'), parse)
+                        for name, pattern, parse in CSV_COLUMN_TYPES]
+
+def infer_csv_column_types(sample):
+    """Pick a parser for every column of `sample` (a list of rows of strings),
+    or None for columns that stay text."""
+    width = max((len(row) for row in sample), default=0)
+    parsers = []
+    for i in range(width):
+        values = [row[i] for row in sample if i < len(row) and row[i] != '']
+        parser = None
+        if values:
+            # one regex call per column and type instead of one per cell
+            joined = '\n'.join(values)
+            if '\n' not in ''.join(values):
+                for name, pattern, parse in _CSV_COLUMN_PATTERNS:
+                    if pattern.fullmatch(joined):
+                        parser = parse
+                        break
+        parsers.append(parser)
+    return parsers
+
+def typed_csv_rows(rows, sample_size=None):
+    """Convert the text cells of CSV rows to ints, floats, booleans and dates,
+    column by column as inferred from the first `sample_size` rows. Values
+    that don't fit their column's type later on are left as text."""
+    if sample_size is None:
+        sample_size = get_setting('csv_infer_rows')
+    rows = iter(rows)
+    sample = [row for _, row in zip(range(sample_size), rows)]
+    # the first row is usually a header; it is converted like any other row
+    # but left out of the inference so its labels don't make every column text
+    inferred = infer_csv_column_types(sample[1:] if len(sample) > 1 else sample)
+    typed = [(i, parse) for i, parse in enumerate(inferred) if parse is not None]
+
+    def convert(row):
+        for i, parse in typed:
+            if i < len(row) and row[i] != '':
+                try:
+                    row[i] = parse(row[i])
+                except (ValueError, KeyError):
+                    pass
+        return row
+
+    if not typed:
+        yield from sample
+        yield from rows
+        return
+    for row in sample:
+        yield convert(row)
+    for row in rows:
+        yield convert(row)
+
+def _ods_rows(file_path, sheet=None):
+    for name, rows in _ods_tables(file_path, only=sheet, first=sheet is None):
+        yield from rows
+
+ODS_TABLE_NS = "{urn:oasis:names:tc:opendocument:xmlns:table:1.0}"
+ODS_OFFICE_NS = "{urn:oasis:names:tc:opendocument:xmlns:office:1.0}"
+ODS_TEXT_NS = "{urn:oasis:names:tc:opendocument:xmlns:text:1.0}"
+
+def _ods_sheet_names(file_path):
+    # a bare expat pass that builds no elements is several times faster than iterparse
+    import xml.parsers.expat
+    names = []
+    table_tag = ODS_TABLE_NS[1:-1] + ' table'
+    name_attr = ODS_TABLE_NS[1:-1] + ' name'
+
+    def start(tag, attrs):
+        if tag == table_tag:
+            names.append(attrs.get(name_attr))
+
+    parser = xml.parsers.expat.ParserCreate(namespace_separator=' ')
+    parser.StartElementHandler = start
+    with zipfile.ZipFile(file_path) as z, z.open('content.xml') as content:
+        parser.ParseFile(content)
+    return names
+
+def _ods_tables(file_path, only=None, first=False):
+    """Stream the tables of an ODS file's content.xml, yielding
+    (name, rows) pairs; `rows` iterates that table's rows and must be used
+    before the next pair is taken. Parsing stops once `only` (a sheet name)
+    or the `first` table has been read."""
+    import xml.etree.ElementTree as ET
+    with zipfile.ZipFile(file_path) as z, z.open('content.xml') as content:
+        events = ET.iterparse(content, events=('start', 'end'))
+        stack = []
+        for event, elem in events:
+            if event == 'end':
+                stack.pop()
+                continue
+            stack.append(elem)
+            if elem.tag != ODS_TABLE_NS + 'table':
+                continue
+            name = elem.get(ODS_TABLE_NS + 'name')
+            if only is not None and name != only:
+                _ods_skip_table(events, stack, elem)
+                continue
+            yield name, _ods_table_rows(events, stack, elem)
+            if only is not None or first:
+                return
+            # skip whatever the caller didn't read
+            _ods_skip_table(events, stack, elem)
+    if only is not None:
+        raise ValueError(f"No sheet named {only!r}")
+
+def _ods_skip_table(events, stack, table):
+    """Read up to the end of `table`, dropping everything parsed on the way
+    so that skipped sheets don't pile up in the element tree."""
+    while stack and table in stack:
+        event, child = next(events)
+        if event == 'start':
+            stack.append(child)
+        else:
+            stack.pop()
+            if stack and child is not table:
+                stack[-1].remove(child)
+    table.clear()
+
+def _ods_table_rows(events, stack, table):
+    blank_rows = 0
+    for event, elem in events:
+        if event == 'start':
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem is table:
+            return
+        if elem.tag != ODS_TABLE_NS + 'table-row':
+            continue
+        row = []
+        for cell in elem:
+            if cell.tag not in (ODS_TABLE_NS + 'table-cell', ODS_TABLE_NS + 'covered-table-cell'):
+                continue
+            value = _ods_cell_value(cell)
+            row.extend([value] * int(cell.get(ODS_TABLE_NS + 'number-columns-repeated', 1)))
+        # LibreOffice pads sheets with huge runs of empty cells and rows; drop
+        # them unless real data follows
+        while row and row[-1] == '':
+            row.pop()
+        repeat = int(elem.get(ODS_TABLE_NS + 'number-rows-repeated', 1))
+        # keep memory flat: the row element isn't needed any more
+        stack[-1].remove(elem)
+        if not row:
+            blank_rows += repeat
+            continue
+        for _ in range(blank_rows):
+            yield []
+        blank_rows = 0
+        for _ in range(repeat):
+            yield list(row)
+
+def _ods_cell_value(cell):
+    import datetime
+    value_type = cell.get(ODS_OFFICE_NS + 'value-type')
+    if value_type in ('float', 'percentage', 'currency'):
+        value = float(cell.get(ODS_OFFICE_NS + 'value'))
+        return int(value) if value.is_integer() else value
+    if value_type == 'boolean':
+        return cell.get(ODS_OFFICE_NS + 'boolean-value') == 'true'
+    if value_type == 'date':
+        text = cell.get(ODS_OFFICE_NS + 'date-value')
+        try:
+            value = datetime.datetime.fromisoformat(text)
+        except ValueError:
+            return text
+        return value.date() if 'T' not in text else value
+    lines = [_ods_paragraph_text(p) for p in cell if p.tag == ODS_TEXT_NS + 'p']
+    return '\n'.join(lines)
+
+def _ods_paragraph_text(elem):
+    parts = [elem.text or '']
+    for child in elem:
+        if child.tag == ODS_TEXT_NS + 's':
+            parts.append(' ' * int(child.get(ODS_TEXT_NS + 'c', 1)))
+        elif child.tag == ODS_TEXT_NS + 'tab':
+            parts.append('\t')
+        elif child.tag == ODS_TEXT_NS + 'line-break':
+            parts.append('\n')
+        else:
+            parts.append(_ods_paragraph_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+def write_spreadsheet_rows(rows, new_file_path, target):
+    """Write an iterable of rows as `target` and return how many were written.
 
-    # now convert `data` into requested target
+    XLSX goes through a write-only workbook, CSV row by row and ODS through
+    OdsWriter, so none of them holds more than the current row.
+    """
+    count = 0
     if target == "XLSX":
-        wb = openpyxl.Workbook()
-        sheet = wb.active
-        for row in data:
+        import openpyxl
+        wb = openpyxl.Workbook(write_only=True)
+        sheet = wb.create_sheet()
+        for row in rows:
             sheet.append(row)
+            count += 1
         wb.save(new_file_path)
     elif target == "CSV":
         with open(new_file_path, 'w', newline='') as f:
             writer = csv.writer(f)
-            writer.writerows(data)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
     elif target == "ODS":
-        doc = ezodf.newdoc(doctype='ods', filename=new_file_path)
-        max_cols = max(len(row) for row in data) if data else 1
-        sht = ezodf.Sheet('Sheet1', size=(len(data), max_cols))
-        doc.sheets.append(sht)
-        for r, row in enumerate(data):
-            for c, val in enumerate(row):
-                sht[r, c].set_value(val)
-        doc.save()
+        with OdsWriter(new_file_path) as writer:
+            count = writer.add_sheet('Sheet1', rows)
     else:
         raise ValueError("Unsupported target format")
-    return new_file_path
+    return count
+
+ODS_NAMESPACES = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:style="urn:oasis:names:tc:opendocument:xmlns:style:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0" '
+    'xmlns:number="urn:oasis:names:tc:opendocument:xmlns:datastyle:1.0" '
+    'xmlns:fo="urn:oasis:names:tc:opendocument:xmlns:xsl-fo-compatible:1.0" '
+    'office:version="1.2"'
+)
+# cell styles for dates (ce1) and date-times (ce2)
+ODS_AUTOMATIC_STYLES = (
+    '<office:automatic-styles>'
+    '<number:date-style style:name="N1"><number:year number:style="long"/><number:text>-</number:text>'
+    '<number:month number:style="long"/><number:text>-</number:text><number:day number:style="long"/></number:date-style>'
+    '<number:date-style style:name="N2"><number:year number:style="long"/><number:text>-</number:text>'
+    '<number:month number:style="long"/><number:text>-</number:text><number:day number:style="long"/>'
+    '<number:text> </number:text><number:hours number:style="long"/><number:text>:</number:text>'
+    '<number:minutes number:style="long"/><number:text>:</number:text><number:seconds number:style="long"/></number:date-style>'
+    '<style:style style:name="ce1" style:family="table-cell" style:parent-style-name="Default" style:data-style-name="N1"/>'
+    '<style:style style:name="ce2" style:family="table-cell" style:parent-style-name="Default" style:data-style-name="N2"/>'
+    '</office:automatic-styles>'
+)
+ODS_MANIFEST = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<manifest:manifest xmlns:manifest="urn:oasis:names:tc:opendocument:xmlns:manifest:1.0" manifest:version="1.2">'
+    '<manifest:file-entry manifest:full-path="/" manifest:version="1.2" manifest:media-type="application/vnd.oasis.opendocument.spreadsheet"/>'
+    '<manifest:file-entry manifest:full-path="content.xml" manifest:media-type="text/xml"/>'
+    '<manifest:file-entry manifest:full-path="styles.xml" manifest:media-type="text/xml"/>'
+    '</manifest:manifest>'
+)
+ODS_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    f'<office:document-styles {ODS_NAMESPACES}><office:styles>'
+    '<style:style style:name="Default" style:family="table-cell"/></office:styles></office:document-styles>'
+)
+
+
+def _ods_text(value):
+    """Escape text for <text:p>, keeping the spaces and tabs ODF would collapse."""
+    value = value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    value = re.sub(r'  +', lambda m: ' <text:s text:c="%d"/>' % (len(m.group()) - 1), value)
+    return value.replace('\t', '<text:tab/>')
+
+
+def ods_cell(value):
+    """content.xml markup for one cell, typed after the Python value."""
+    import datetime
+    if value is None or value == '':
+        return '<table:table-cell/>'
+    if isinstance(value, bool):
+        text = 'TRUE' if value else 'FALSE'
+        return f'<table:table-cell office:value-type="boolean" office:boolean-value="{text.lower()}"><text:p>{text}</text:p></table:table-cell>'
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and (value != value or value in (float('inf'), float('-inf'))):
+            return f'<table:table-cell office:value-type="string"><text:p>{value}</text:p></table:table-cell>'
+        return f'<table:table-cell office:value-type="float" office:value="{value!r}"><text:p>{value}</text:p></table:table-cell>'
+    if isinstance(value, datetime.datetime):
+        iso = value.replace(tzinfo=None).isoformat()
+        return f'<table:table-cell table:style-name="ce2" office:value-type="date" office:date-value="{iso}"><text:p>{value.strftime("%Y-%m-%d %H:%M:%S")}</text:p></table:table-cell>'
+    if isinstance(value, datetime.date):
+        iso = value.isoformat()
+        return f'<table:table-cell table:style-name="ce1" office:value-type="date" office:date-value="{iso}"><text:p>{iso}</text:p></table:table-cell>'
+    if isinstance(value, datetime.time):
+        duration = f"PT{value.hour:02d}H{value.minute:02d}M{value.second:02d}S"
+        return f'<table:table-cell office:value-type="time" office:time-value="{duration}"><text:p>{value.strftime("%H:%M:%S")}</text:p></table:table-cell>'
+    lines = str(value).split('\n')
+    return ('<table:table-cell office:value-type="string">'
+            + ''.join(f'<text:p>{_ods_text(line)}</text:p>' for line in lines) + '</table:table-cell>')
+
+
+def _ods_repeat(markup, count, attribute):
+    if count == 1:
+        return markup
+    # the attribute goes right after the element name
+    tag = '<table:table-row' if markup.startswith('<table:table-row') else '<table:table-cell'
+    return f'{tag} {attribute}="{count}"{markup[len(tag):]}'
+
+
+class OdsWriter:
+    """Streaming ODS writer.
+
+    Rows are turned into content.xml markup as they arrive instead of going
+    through ezodf's per-cell document model. Runs of identical cells and
+    rows are stored once with number-columns/rows-repeated. Each sheet's rows
+    are spooled (in memory up to a limit, then on disk) because the column
+    count has to be written before them.
+    """
+
+    def __init__(self, path):
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        # the mimetype comes first and uncompressed so the file is recognised as ODS
+        self.zip.writestr(zipfile.ZipInfo('mimetype'), 'application/vnd.oasis.opendocument.spreadsheet',
+                          compress_type=zipfile.ZIP_STORED)
+        self.zip.writestr('META-INF/manifest.xml', ODS_MANIFEST)
+        self.zip.writestr('styles.xml', ODS_STYLES)
+        self.content = self.zip.open('content.xml', 'w', force_zip64=True)
+        self._write(f'<?xml version="1.0" encoding="UTF-8"?>\n<office:document-content {ODS_NAMESPACES}>'
+                    f'{ODS_AUTOMATIC_STYLES}<office:body><office:spreadsheet>')
+
+    def _write(self, text):
+        self.content.write(text.encode('utf-8'))
+
+    def add_sheet(self, name, rows):
+        """Write `rows` as a sheet called `name`; returns the number of rows."""
+        count = 0
+        width = 1
+        previous, repeated = None, 0
+        with tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_BYTES, mode='w+', encoding='utf-8') as spool:
+            for row in rows:
+                count += 1
+                cells = [ods_cell(value) for value in row]
+                while cells and cells[-1] == '<table:table-cell/>':
+                    cells.pop()
+                width = max(width, len(cells))
+                markup = self._row_markup(cells)
+                if markup == previous:
+                    repeated += 1
+                    continue
+                if previous is not None:
+                    spool.write(_ods_repeat(previous, repeated, 'table:number-rows-repeated'))
+                previous, repeated = markup, 1
+            if previous is not None:
+                spool.write(_ods_repeat(previous, repeated, 'table:number-rows-repeated'))
+            spool.seek(0)
+            quoted_name = name.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;')
+            self._write(f'<table:table table:name="{quoted_name}">'
+                        f'<table:table-column table:number-columns-repeated="{width}"/>')
+            for chunk in iter(lambda: spool.read(ARCHIVE_CHUNK), ''):
+                self._write(chunk)
+            self._write('</table:table>')
+        return count
+
+    @staticmethod
+    def _row_markup(cells):
+        parts = ['<table:table-row>']
+        i = 0
+        while i < len(cells):
+            j = i + 1
+            while j < len(cells) and cells[j] == cells[i]:
+                j += 1
+            parts.append(_ods_repeat(cells[i], j - i, 'table:number-columns-repeated'))
+            i = j
+        if not cells:
+            parts.append('<table:table-cell/>')
+        parts.append('</table:table-row>')
+        return ''.join(parts)
+
+    def close(self):
+        if self.content is not None:
+            self._write('</office:spreadsheet></office:body></office:document-content>')
+            self.content.close()
+            self.content = None
+        self.zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 def convert_3d(file_path, target):
     if not TRIMESH_SUPPORT:
         raise ImportError("trimesh library not installed.")
+    import trimesh
     new_file_path = os.path.splitext(file_path)[0] + '.' + target.lower()
     mesh = trimesh.load(file_path)
     mesh.export(new_file_path)
     return new_file_path
 
-def run_ffmpeg(cmd, progress_cb=None, duration=None):
-    process = subprocess.Popen(cmd, stderr=subprocess.PIPE, universal_newlines=True)
-    while True:
-        line = process.stderr.readline().strip()
-        if not line and process.poll() is not None:
-            break
-        if line and progress_cb and duration:
-            time_match = re.search(r'time=(\d{2}):(\d{2}):(\d{2}\.\d{2})', line)
-            if time_match:
-                h, m, s = map(float, time_match.groups())
-                time = h * 3600 + m * 60 + s
-                progress_cb(time / duration)
-    process.wait()
+class ConversionCancelled(Exception):
+    """The conversion was cancelled before it finished."""
+
+
+def _progress_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # ffmpeg reports "N/A" until the first frame is out
+        return None
+
+def ffmpeg_progress(fields, duration, done):
+    """Turn one block of ffmpeg `-progress` key=value fields into a progress
+    dict: `percent` (None when the duration is unknown), `time` (seconds of
+    output written), `fps`, `speed` (times real time), `eta` (seconds, or
+    None) and `done`."""
+    # out_time_ms is in microseconds too, despite its name
+    position = _progress_number(fields.get('out_time_us', fields.get('out_time_ms')))
+    position = position / 1e6 if position and position > 0 else 0.0
+    speed = _progress_number((fields.get('speed') or '').rstrip('x'))
+    percent = eta = None
+    if duration:
+        percent = 100.0 if done else min(100.0, position / duration * 100)
+        if done:
+            eta = 0.0
+        elif speed:
+            eta = max(0.0, (duration - position) / speed)
+    return {'percent': percent, 'time': position, 'fps': _progress_number(fields.get('fps')),
+            'speed': speed, 'eta': eta, 'done': done}
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def format_media_progress(progress):
+    """One-line summary of an ffmpeg progress dict, e.g.
+    "42.0%  120 fps  4.00x  ETA 0:00:12"."""
+    if progress['percent'] is not None:
+        parts = [f"{progress['percent']:.1f}%"]
+    else:
+        parts = [format_duration(progress['time'])]
+    if progress['fps']:
+        parts.append(f"{progress['fps']:.0f} fps")
+    if progress['speed']:
+        parts.append(f"{progress['speed']:.2f}x")
+    if progress['eta'] is not None and not progress['done']:
+        parts.append(f"ETA {format_duration(progress['eta'])}")
+    return "  ".join(parts)
+
+FFMPEG_DURATION = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+
+def run_ffmpeg(cmd, progress_cb=None, duration=None, cancel=None):
+    """Run an ffmpeg command, reporting progress from its `-progress` output.
+    Without a `duration` the one ffmpeg prints for its (first) input is used.
+
+    `progress_cb` gets a dict from `ffmpeg_progress` about twice a second and
+    once more when ffmpeg is done. Setting the `cancel` event (a
+    threading.Event) stops ffmpeg and raises ConversionCancelled; cleaning up
+    what it had written is up to the caller.
+    """
+    cmd = [cmd[0], '-nostdin', '-nostats', '-progress', 'pipe:1'] + cmd[1:]
+    process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               universal_newlines=True)
+    # drain stderr so ffmpeg never blocks on it; its last lines explain failures
+    errors = collections.deque(maxlen=20)
+    probed = {'duration': duration}
+
+    def read_errors():
+        for line in process.stderr:
+            errors.append(line.rstrip())
+            if probed['duration'] is None:
+                # ffmpeg describes its input before converting, so no separate ffprobe run is needed
+                match = FFMPEG_DURATION.search(line)
+                if match:
+                    h, m, sec = match.groups()
+                    probed['duration'] = int(h) * 3600 + int(m) * 60 + float(sec)
+
+    reader = threading.Thread(target=read_errors, daemon=True)
+    reader.start()
+    cancelled = threading.Event()
+    if cancel is not None:
+        def watch():
+            # polls, so a stalled ffmpeg that prints nothing can still be stopped
+            while process.poll() is None:
+                if cancel.wait(0.1):
+                    cancelled.set()
+                    process.terminate()
+                    return
+        threading.Thread(target=watch, daemon=True).start()
+    fields = {}
+    try:
+        for line in process.stdout:
+            key, _, value = line.strip().partition('=')
+            if key != 'progress':
+                fields[key] = value
+            elif progress_cb and not cancelled.is_set():
+                progress_cb(ffmpeg_progress(fields, probed['duration'], value == 'end'))
+        process.wait()
+    except BaseException:
+        # e.g. Ctrl+C or a failing callback; don't leave ffmpeg running
+        process.kill()
+        process.wait()
+        raise
+    reader.join()
+    if cancelled.is_set():
+        raise ConversionCancelled("Conversion cancelled")
     if process.returncode != 0:
-        raise RuntimeError(f"ffmpeg failed with code {process.returncode}")
+        detail = f": {errors[-1]}" if errors else ""
+        raise RuntimeError(f"ffmpeg failed with code {process.returncode}{detail}")
+
+def convert_media(file_path, target, progress_cb=None, cancel=None):
+    result = convert_media_multi(file_path, [target], progress_cb, cancel)[target]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+# Codecs each target container can take as they are, by stream type ("*" =
+# anything). Streams that fit are stream-copied instead of re-encoded.
+CONTAINER_CODECS = {
+    'mp4': {'video': {'h264', 'hevc', 'mpeg4', 'av1', 'vp9'},
+            'audio': {'aac', 'mp3', 'alac', 'ac3', 'eac3', 'opus', 'flac'}},
+    'mov': {'video': {'h264', 'hevc', 'mpeg4', 'prores', 'mjpeg'},
+            'audio': {'aac', 'mp3', 'alac', 'ac3', 'pcm_s16le', 'pcm_s24le'}},
+    'mkv': {'video': '*', 'audio': '*'},
+    'avi': {'video': {'mpeg4', 'h264', 'mjpeg', 'msmpeg4v3'},
+            'audio': {'mp3', 'ac3', 'pcm_s16le'}},
+    'mp3': {'audio': {'mp3'}},
+    'aac': {'audio': {'aac'}},
+    'm4a': {'audio': {'aac', 'alac'}},
+    'ogg': {'audio': {'vorbis', 'opus', 'flac'}},
+    'flac': {'audio': {'flac'}},
+    'wav': {'audio': {'pcm_s16le', 'pcm_s24le', 'pcm_s32le', 'pcm_f32le', 'pcm_u8'}},
+}
 
-def convert_media(file_path, target):
+def probe_media(file_path):
+    """Duration and streams of a media file from one ffprobe run, or None if
+    ffprobe is unavailable or can't read it."""
+    if not has_ffprobe:
+        return None
+    try:
+        output = subprocess.check_output(
+            ['ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', file_path],
+            stderr=subprocess.DEVNULL)
+        info = json.loads(output)
+    except (OSError, subprocess.CalledProcessError, ValueError) as e:
+        print(f"Could not probe {file_path}: {e}")
+        return None
+    streams = [{'type': st.get('codec_type'), 'codec': st.get('codec_name'),
+                # cover art shows up as a video stream
+                'cover': bool(st.get('disposition', {}).get('attached_pic'))}
+               for st in info.get('streams', [])]
+    duration = _progress_number(info.get('format', {}).get('duration'))
+    return {'duration': duration, 'streams': streams}
+
+def media_stream_plan(probe, ext, kinds=('video', 'audio')):
+    """Whether each kind of stream in a probed input can be copied into a
+    .`ext` file as it is ('copy') or has to be re-encoded ('transcode')."""
+    allowed = CONTAINER_CODECS.get(ext, {})
+    plan = {}
+    for kind in kinds:
+        codecs = [st['codec'] for st in probe['streams'] if st['type'] == kind and not st['cover']]
+        if not codecs:
+            continue
+        fits = allowed.get(kind)
+        plan[kind] = 'copy' if fits == '*' or (fits and all(c in fits for c in codecs)) else 'transcode'
+    return plan
+
+def describe_stream_plan(plan):
+    if not plan:
+        return "converted"
+    if all(way == 'copy' for way in plan.values()):
+        return "remuxed without re-encoding"
+    if all(way == 'transcode' for way in plan.values()):
+        return "re-encoded"
+    return ", ".join(f"{'copied' if way == 'copy' else 're-encoded'} {kind}" for kind, way in plan.items())
+
+_ffmpeg_encoders = None
+_missing_encoders = set()
+
+def ffmpeg_encoders():
+    """Names of the encoders the installed ffmpeg was built with (asked once
+    per process); None or an empty set when that can't be told."""
+    global _ffmpeg_encoders
+    if _ffmpeg_encoders is None:
+        try:
+            output = subprocess.check_output(['ffmpeg', '-hide_banner', '-encoders'],
+                                             stderr=subprocess.DEVNULL, universal_newlines=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        # " V....D libx264   libx264 H.264 / AVC ..." lines follow a "------" line
+        _ffmpeg_encoders = {line.split()[1] for line in output.partition('------')[2].splitlines()
+                            if len(line.split()) > 1}
+    return _ffmpeg_encoders
+
+def media_encoder_options(target, kind, profile=None):
+    """ffmpeg options for re-encoding a `kind` ('video' or 'audio') stream
+    into `target` under the encoding profile (default: the `media_profile`
+    setting), including the thread count from `media_threads`.
+
+    If ffmpeg was built without the profile's encoder (LGPL builds have no
+    libx264, for one) the profile's options are left out and ffmpeg picks
+    the container's default encoder, as it did before profiles existed."""
+    profile = profile or get_setting('media_profile') or 'balanced'
+    if profile not in MEDIA_PROFILES:
+        raise ValueError(f"Unknown media profile: {profile}")
+    target = target.split(" ")[0].upper()
+    options = []
+    for cat in ['media_video', 'media_audio']:
+        options = formats.get(cat, {}).get('profiles', {}).get(profile, {}).get(target, {}).get(kind)
+        if options:
+            break
+    options = list(options or [])
+    codec_flag = '-c:' + kind[0]
+    if codec_flag in options:
+        encoder = options[options.index(codec_flag) + 1]
+        encoders = ffmpeg_encoders()
+        if encoders and encoder not in encoders:
+            if encoder not in _missing_encoders:
+                _missing_encoders.add(encoder)
+                print(f"ffmpeg has no {encoder} encoder; using its default {kind} encoder for {target}")
+            options = []
+    if kind == 'video' and get_setting('media_threads'):
+        options += ['-threads', str(get_setting('media_threads'))]
+    return options
+
+# only videos at least this long are split up for parallel transcoding
+MEDIA_SEGMENT_MIN_SECONDS = 120
+# several segments per worker so one slow segment doesn't hold up the rest
+MEDIA_SEGMENTS_PER_WORKER = 4
+MEDIA_SEGMENT_MIN_LENGTH = 10
+
+def media_segment_workers():
+    workers = get_setting('media_segment_workers')
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    return max(1, workers or 1)
+
+def _phase_progress(progress_cb, low, high, last=False):
+    """Rescale the progress of one step of a multi-step job to low..high%."""
+    if not progress_cb:
+        return None
+
+    def report(progress):
+        progress = dict(progress)
+        if progress['percent'] is not None:
+            progress['percent'] = low + (high - low) * progress['percent'] / 100
+        if not last:
+            progress['done'] = False
+            progress['eta'] = None
+        progress_cb(progress)
+    return report
+
+def segmentable(probe):
+    """Whether a segmented transcode writes the same streams as one ffmpeg
+    run would. That run keeps the video, one audio and one subtitle stream
+    by ffmpeg's own choice; the join can only take the video and a single
+    audio stream without second-guessing it."""
+    counts = collections.Counter(st['type'] for st in probe['streams'] if not st['cover'])
+    return counts['video'] == 1 and counts['audio'] <= 1 and not counts['subtitle']
+
+def transcode_segmented(file_path, new_file_path, target_ext, probe, plan, workers, progress_cb=None, cancel=None):
+    """Transcode the video of a long file in parallel.
+
+    The video is split at keyframes (stream copy), the pieces are encoded by
+    `workers` ffmpeg processes at once and then joined without re-encoding,
+    taking the audio, metadata and chapters straight from the source so there
+    are no gaps at the joins. Only sources `segmentable` allows can be
+    handled this way. Progress of all pieces is combined into one progress dict for
+    `progress_cb`; `cancel` stops every ffmpeg that is running.
+    """
+    duration = probe['duration']
+    length = max(MEDIA_SEGMENT_MIN_LENGTH, duration / (workers * MEDIA_SEGMENTS_PER_WORKER))
+    video_options = media_encoder_options(target_ext, 'video')
+    if not get_setting('media_threads'):
+        # the workers share the cores instead of each starting a thread per core
+        video_options += ['-threads', str(max(1, (os.cpu_count() or 1) // workers))]
+    # container tags such as hvc1 belong to the joined file, not the Matroska pieces
+    tag_options = []
+    if '-tag:v' in video_options:
+        i = video_options.index('-tag:v')
+        tag_options = video_options[i:i + 2]
+        del video_options[i:i + 2]
+    if plan.get('audio') == 'copy':
+        audio_options = ['-c:a', 'copy']
+    else:
+        audio_options = media_encoder_options(target_ext, 'audio')
+
+    # next to the output rather than in /tmp: the pieces are as big as the video
+    work_dir = tempfile.mkdtemp(prefix=".wormhole_segments_", dir=os.path.dirname(os.path.abspath(new_file_path)))
+    try:
+        run_ffmpeg(['ffmpeg', '-y', '-i', file_path, '-map', '0:v:0', '-an', '-sn', '-c', 'copy',
+                    '-f', 'segment', '-segment_time', f"{length:.3f}", '-segment_format', 'matroska',
+                    '-reset_timestamps', '1', os.path.join(work_dir, 'piece%05d.mkv')],
+                   _phase_progress(progress_cb, 0, 5), duration, cancel)
+        pieces = sorted(glob.glob(os.path.join(work_dir, 'piece*.mkv')))
+        if not pieces:
+            raise RuntimeError("ffmpeg produced no segments")
+        # Matroska rather than the target container: MP4/MOV pieces start with
+        # edit lists for the encoder delay, which the concat demuxer would turn
+        # into gaps or repeated frames at every join
+        encoded = [os.path.join(work_dir, f"encoded{i:05d}.mkv") for i in range(len(pieces))]
+
+        lock = threading.Lock()
+        times = [0.0] * len(pieces)
+        rates = [None] * len(pieces)
+        encode_start = time.perf_counter()
+
+        def piece_progress(i, progress):
+            with lock:
+                times[i] = progress['time']
+                rates[i] = None if progress['done'] else progress['fps']
+                done_seconds = min(duration, sum(times))
+                elapsed = time.perf_counter() - encode_start
+                # overall times real time, measured rather than summed from the pieces
+                speed = done_seconds / elapsed if elapsed > 0 and done_seconds else None
+                combined = {'percent': 5 + 90 * done_seconds / duration, 'time': done_seconds,
+                            'fps': sum(r for r in rates if r) or None, 'speed': speed,
+                            'eta': (duration - done_seconds) / speed if speed else None, 'done': False}
+            progress_cb(combined)
+
+        # stops the other pieces when one fails or the caller cancels
+        stop = threading.Event()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_ffmpeg, ['ffmpeg', '-y', '-i', piece, '-map', '0:v:0'] + video_options + [out],
+                                   functools.partial(piece_progress, i) if progress_cb else None, None, stop)
+                       for i, (piece, out) in enumerate(zip(pieces, encoded))]
+            pending = set(futures)
+            while pending:
+                done, pending = wait_futures(pending, timeout=0.2, return_when=FIRST_EXCEPTION)
+                failed = any(not f.cancelled() and f.exception() is not None for f in done)
+                if failed or (cancel is not None and cancel.is_set()):
+                    stop.set()
+                    for future in pending:
+                        future.cancel()
+        if cancel is not None and cancel.is_set():
+            raise ConversionCancelled("Conversion cancelled")
+        for future in futures:
+            error = None if future.cancelled() else future.exception()
+            if error is not None and not isinstance(error, ConversionCancelled):
+                raise error
+
+        list_path = os.path.join(work_dir, 'pieces.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in encoded:
+                # concat demuxer quoting: close the quote, escape it, reopen
+                f.write("file '" + path.replace("'", "'\\''") + "'\n")
+        run_ffmpeg(['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_path, '-i', file_path,
+                    '-map', '0:v:0', '-map', '1:a:0?', '-map_metadata', '1', '-map_chapters', '1',
+                    '-c:v', 'copy'] + tag_options + audio_options + [new_file_path],
+                   _phase_progress(progress_cb, 95, 100, last=True), duration, cancel)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return len(pieces)
+
+def convert_media_multi(file_path, targets, progress_cb=None, cancel=None):
+    """Write every target in `targets` from a single ffmpeg run, so the input
+    is demuxed and decoded once however many outputs are asked for.
+
+    Returns a dict mapping each target to its result (an output path, or two
+    for "(extract audio)" targets) or to the exception the run failed with.
+    `progress_cb` and `cancel` are passed to `run_ffmpeg`; a cancelled or
+    failed run leaves no partial outputs behind.
+
+    Streams whose codec the target container supports are stream-copied
+    (see CONTAINER_CODECS), so container-only changes such as MKV -> MP4 are
+    remuxed instead of re-encoded; which way each output went is printed.
+    A single long video target is transcoded in parallel segments when the
+    `media_segment_workers` setting allows it (see `transcode_segmented`).
+    """
     if not has_ffmpeg:
         raise RuntimeError("ffmpeg not found in PATH.")
-    is_extract = "(extract audio)" in target
-    target_ext = target.split(" ")[0].lower()
-    new_file_path = os.path.splitext(file_path)[0] + '.' + target_ext
-    # Get duration using ffprobe
-    duration = None
+    base, ext = os.path.splitext(file_path)
+    muted_path = base + '_no_audio' + ext
+    stream_copy = get_setting('media_stream_copy')
+    segment_workers = media_segment_workers()
+    probe = probe_media(file_path) if stream_copy or segment_workers > 1 else None
+    cmd = ['ffmpeg', '-y', '-i', file_path]
+    written = set()
+    results = {}
+    plans = {}
+    for target in targets:
+        is_extract = "(extract audio)" in target
+        target_ext = target.split(" ")[0].lower()
+        new_file_path = base + '.' + target_ext
+        # audio-only targets drop the video (and cover art) anyway
+        video_target = not is_extract and 'video' in CONTAINER_CODECS.get(target_ext, {})
+        kinds = ('video', 'audio') if video_target else ('audio',)
+        plan = media_stream_plan(probe, target_ext, kinds) if probe and stream_copy else {}
+        if probe and stream_copy:
+            plans[new_file_path] = plan
+        codec_options = []
+        for kind in kinds:
+            if plan.get(kind) == 'copy':
+                codec_options += ['-c:' + kind[0], 'copy']
+            else:
+                codec_options += media_encoder_options(target_ext, kind)
+        # output options go right before the output they apply to
+        outputs = [((['-map', '0:a:0', '-vn'] if is_extract else []) + codec_options, new_file_path)]
+        if is_extract:
+            # the muted copy keeps the source container, so its video (and any
+            # subtitles) can always be stream-copied instead of re-encoded
+            outputs.append((['-map', '0:v', '-map', '0:s?', '-an', '-c', 'copy'], muted_path))
+        for options, path in outputs:
+            if path not in written:
+                written.add(path)
+                cmd += options + [path]
+        results[target] = [new_file_path, muted_path] if is_extract else new_file_path
+    segmented = (segment_workers > 1 and len(targets) == 1 and video_target and probe is not None
+                 and segmentable(probe) and plan.get('video') != 'copy'
+                 and (probe['duration'] or 0) >= MEDIA_SEGMENT_MIN_SECONDS)
     try:
-        ffprobe_cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=noprint_wrappers=1:nokey=1', file_path]
-        duration_str = subprocess.check_output(ffprobe_cmd).decode().strip()
-        duration = float(duration_str)
-    except Exception as e:
-        print(f"Could not get duration: {e}")
-    if is_extract:
-        audio_cmd = ['ffmpeg', '-y', '-i', file_path, '-vn', new_file_path]
-        muted_path = os.path.splitext(file_path)[0] + '_no_audio' + os.path.splitext(file_path)[1]
-        video_cmd = ['ffmpeg', '-y', '-i', file_path, '-an', muted_path]
-        if duration:
-            def audio_prog(time):
-                pass  # no progress in silent
-            run_ffmpeg(audio_cmd, audio_prog, duration)
-            def video_prog(time):
-                pass
-            run_ffmpeg(video_cmd, video_prog, duration)
+        if segmented:
+            pieces = transcode_segmented(file_path, new_file_path, target_ext, probe, plan, segment_workers,
+                                         progress_cb, cancel)
+            plans.pop(new_file_path, None)
+            print(f"{os.path.basename(new_file_path)}: transcoded in {pieces} segments on {segment_workers} workers")
         else:
-            subprocess.check_call(audio_cmd)
-            subprocess.check_call(video_cmd)
-        return f"{new_file_path}, {muted_path}"
-    else:
-        cmd = ['ffmpeg', '-y', '-i', file_path, new_file_path]
-        if duration:
-            def conv_prog(time):
+            run_ffmpeg(cmd, progress_cb, probe['duration'] if probe else None, cancel)
+    except BaseException as e:
+        for path in written:
+            try:
+                os.remove(path)
+            except OSError:
                 pass
-            run_ffmpeg(cmd, conv_prog, duration)
-        else:
-            subprocess.check_call(cmd)
-        return new_file_path
+        if not isinstance(e, Exception):
+            raise
+        return {target: e for target in targets}
+    for path, plan in plans.items():
+        print(f"{os.path.basename(path)}: {describe_stream_plan(plan)}")
+    return results
+
+# short clips are converted this many to one ffmpeg run in batches; the
+# command line is kept well below Windows' 32767 character limit
+AUDIO_BATCH_CLIPS = 32
+AUDIO_BATCH_COMMAND_CHARS = 24000
+# larger files take long enough that starting ffmpeg for each doesn't matter
+AUDIO_BATCH_MAX_BYTES = 10 * 1024 * 1024
+# codecs usually found in each audio container, so a batch can tell without
+# running ffprobe whether the per-file path would have stream-copied a clip
+AUDIO_CONTAINER_CODECS = {
+    'wav': {'pcm_s16le', 'pcm_s24le', 'pcm_s32le', 'pcm_f32le', 'pcm_u8'},
+    'mp3': {'mp3'},
+    'ogg': {'vorbis', 'opus', 'flac'},
+    'flac': {'flac'},
+    'aac': {'aac'},
+    'm4a': {'aac', 'alac'},
+}
 
-def silent_convert(file_path, target):
-    if not os.path.isfile(file_path):
-        print("File not found")
-        sys.exit(1)
+# Vorbis comment field holding a picture (Ogg and FLAC files); field names are case-insensitive
+_VORBIS_PICTURE = re.compile(rb'(?i)metadata_block_picture=')
+
+def has_cover_art(file_path):
+    """Whether an audio file seems to embed a picture: an ID3 APIC/PIC frame,
+    an MP4 covr atom, a FLAC PICTURE block or a Vorbis comment picture. Reads
+    the whole file, so only meant for small ones; stray matches in the audio
+    data just make it err on the side of yes."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if b'APIC' in data or b'covr' in data or _VORBIS_PICTURE.search(data):
+        return True
+    pos = 0
+    if data[:3] == b'ID3' and len(data) >= 10:
+        # tag size is a 28 bit "syncsafe" integer
+        size = 10 + sum((b & 0x7f) << (7 * (3 - i)) for i, b in enumerate(data[6:10]))
+        if data[3] == 2 and b'PIC' in data[10:size]:
+            # ID3v2.2 frame ids have three letters
+            return True
+        pos = size
+    if data[pos:pos + 4] == b'fLaC':
+        pos += 4
+        while pos + 4 <= len(data):
+            header = data[pos]
+            if header & 0x7f == 6:
+                return True
+            pos += 4 + int.from_bytes(data[pos + 1:pos + 4], 'big')
+            if header & 0x80:
+                break
+    return False
+
+def audio_batchable(file_path, targets):
+    """Whether converting `file_path` to `targets` can share an ffmpeg run
+    with other clips: a small audio file without cover art going to audio
+    formats that would be re-encoded anyway, so the output matches
+    `convert_media_multi`'s."""
+    # without ffmpeg there are no media formats; the per-file path reports that
+    if not has_ffmpeg or not get_setting('media_batch_audio') or get_category(file_path) != 'media_audio':
+        return False
+    ext = os.path.splitext(file_path)[1].lower()[1:]
+    try:
+        if ext not in AUDIO_CONTAINER_CODECS or os.path.getsize(file_path) > AUDIO_BATCH_MAX_BYTES:
+            return False
+    except OSError:
+        return False
+    for target in targets:
+        if target not in formats['media_audio']['targets']:
+            return False
+        if get_setting('media_stream_copy') and has_ffprobe and not is_same_format(file_path, target):
+            allowed = CONTAINER_CODECS.get(target.lower(), {}).get('audio') or set()
+            if allowed == '*' or AUDIO_CONTAINER_CODECS[ext] & allowed:
+                return False
+    # a shared run maps the audio only; ffmpeg's own stream choice in the
+    # per-file run carries the picture over where the target can hold one
+    try:
+        return not has_cover_art(file_path)
+    except OSError:
+        return False
+
+def convert_audio_batch(clips, cancel=None):
+    """Convert several audio clips with one ffmpeg run, which saves starting
+    ffmpeg (and loading its codecs) for every clip.
+
+    `clips` is a list of (file_path, targets) pairs; each output takes the
+    first audio stream, metadata and chapters of its own input. Returns a
+    list with a dict per clip mapping its targets to output paths. If the run
+    fails nothing it wrote is kept and the error is raised; which clip was at
+    fault is for the caller to find out by converting them one at a time.
+    """
+    if not has_ffmpeg:
+        raise RuntimeError("ffmpeg not found in PATH.")
+    cmd = ['ffmpeg', '-y']
+    for file_path, _ in clips:
+        cmd += ['-i', file_path]
+    results = []
+    written = []
+    for i, (file_path, targets) in enumerate(clips):
+        base = os.path.splitext(file_path)[0]
+        outputs = {}
+        for target in targets:
+            new_file_path = base + '.' + target.lower()
+            # without these every output would get the first input's metadata
+            cmd += ['-map', f'{i}:a:0', '-map_metadata', str(i), '-map_chapters', str(i)]
+            cmd += media_encoder_options(target, 'audio') + [new_file_path]
+            outputs[target] = new_file_path
+            written.append(new_file_path)
+        results.append(outputs)
+    try:
+        run_ffmpeg(cmd, cancel=cancel)
+    except BaseException:
+        for path in written:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    return results
+
+# ---------- conversion result cache ----------
+
+CACHE_DIR = os.path.join(SETTINGS_DIR, "cache")
+CACHE_DB = os.path.join(CACHE_DIR, "cache.db")
+CACHE_RESULTS_DIR = os.path.join(CACHE_DIR, "results")
+
+
+ENVELOPE_CACHE_DIR = os.path.join(CACHE_DIR, "envelope")
+# parsed Envelope HTML kept in memory for fan-out within one process
+ENVELOPE_MEMORY_ENTRIES = 8
+
+_digest_memo = {}
+_envelope_memo = collections.OrderedDict()
+
+
+def file_digest(file_path):
+    """SHA-256 of the file's contents, remembered while its size and mtime
+    stay the same so fan-out to several targets hashes it once."""
+    st = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+    if memo_key in _digest_memo:
+        return _digest_memo[memo_key]
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    _digest_memo[memo_key] = digest.hexdigest()
+    return _digest_memo[memo_key]
+
+
+def conversion_backend(file_path, target=None):
+    """Describe the settings and tools that change how `file_path` converts
+    (to `target`, where that matters)."""
+    backend = {'version': VERSION}
+    if get_category(file_path) in OFFICE_CATEGORIES:
+        backend['envelope'] = bool(get_setting('use_envelope') and ENVELOPE_JS_SUPPORT)
+        backend['libreoffice'] = ENVELOPE_SUPPORT
+        if file_path.lower().endswith('.pdf'):
+            backend['pdf_pages'] = get_setting('pdf_pages')
+        if get_category(file_path) == 'spreadsheets':
+            backend['sheets'] = get_setting('sheets')
+        if file_path.lower().endswith('.csv'):
+            backend['csv'] = [get_setting(key) for key in
+                              ('csv_encoding', 'csv_delimiter', 'csv_infer_types', 'csv_infer_rows')]
+    elif get_category(file_path) == 'images':
+        backend['image_resize'] = get_setting('image_resize')
+        backend['ico_sizes'] = get_setting('ico_sizes')
+        backend['image_preset'] = get_setting('image_preset')
+    elif get_category(file_path) in ['media_audio', 'media_video']:
+        backend['stream_copy'] = bool(get_setting('media_stream_copy') and has_ffprobe)
+        backend['media_profile'] = get_setting('media_profile')
+        backend['media_threads'] = get_setting('media_threads')
+        if target:
+            # the encoder ffmpeg really uses: the profile's, or its own default
+            # when it was built without that one
+            backend['encoder_options'] = [media_encoder_options(target, kind) for kind in ('video', 'audio')]
+        # segments start with a keyframe each, so the bytes depend on where
+        # the video is cut
+        workers = media_segment_workers()
+        backend['segments'] = (workers, MEDIA_SEGMENT_MIN_SECONDS, MEDIA_SEGMENTS_PER_WORKER,
+                               MEDIA_SEGMENT_MIN_LENGTH) if workers > 1 else None
+    elif get_category(file_path) == 'archive':
+        # parallel and single-threaded compression produce different bytes
+        backend['archive_parallel'] = archive_workers() > 1
+        backend['archive_level'] = get_setting('archive_level')
+    return backend
+
+
+def cache_key(file_path, target, options=None):
+    """Key a conversion by input content, target, backend and options."""
+    parts = {
+        'input': file_digest(file_path),
+        # the same bytes can parse differently depending on the extension
+        'ext': os.path.splitext(file_path)[1].lower(),
+        'target': target,
+        'backend': conversion_backend(file_path, target),
+        'options': options or {},
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _cache_connect():
+    os.makedirs(CACHE_RESULTS_DIR, exist_ok=True)
+    # sqlite keeps the index consistent when several batch workers share it
+    conn = sqlite3.connect(CACHE_DB, timeout=30)
+    conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, outputs TEXT, size INTEGER, last_used REAL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS intermediates (key TEXT PRIMARY KEY, size INTEGER, last_used REAL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+    return conn
+
+
+def _bump_stat(conn, name, amount=1):
+    conn.execute("INSERT INTO stats VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?", (name, amount, amount))
+
+
+def _result_paths(result):
+    # converters that write several files (sheet exports, audio extractions)
+    # return a list of their paths instead of a single path
+    return [result] if isinstance(result, str) else list(result)
+
+
+def format_result(result):
+    """Return a conversion result as one line for display."""
+    return ", ".join(_result_paths(result))
+
+
+def cache_lookup(key, file_path):
+    """Copy a cached result next to `file_path` and return it in the same form
+    the converter would have, or return None on a miss."""
+    entry_dir = os.path.join(CACHE_RESULTS_DIR, key)
+    with closing(_cache_connect()) as conn, conn:
+        row = conn.execute("SELECT outputs FROM entries WHERE key = ?", (key,)).fetchone()
+        suffixes = json.loads(row[0]) if row else []
+        if not row or not all(os.path.isfile(os.path.join(entry_dir, str(i))) for i in range(len(suffixes))):
+            if row:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            _bump_stat(conn, 'misses')
+            return None
+        stem = os.path.splitext(file_path)[0]
+        outputs = [stem + suffix for suffix in suffixes]
+        for i, out in enumerate(outputs):
+            shutil.copyfile(os.path.join(entry_dir, str(i)), out)
+        conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+        _bump_stat(conn, 'hits')
+    return outputs[0] if len(outputs) == 1 else outputs
+
+
+def cache_store(key, file_path, result):
+    """Keep a copy of the files a conversion produced under `key`."""
+    outputs = _result_paths(result)
+    stem = os.path.splitext(file_path)[0]
+    # outputs are replayed relative to the input's name, so only cache results shaped that way
+    if not all(os.path.isfile(p) and p.startswith(stem) for p in outputs):
+        return
+    os.makedirs(CACHE_RESULTS_DIR, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=CACHE_DIR)
+    size = 0
+    for i, out in enumerate(outputs):
+        shutil.copyfile(out, os.path.join(staging, str(i)))
+        size += os.path.getsize(out)
+    entry_dir = os.path.join(CACHE_RESULTS_DIR, key)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    try:
+        os.rename(staging, entry_dir)
+    except OSError:
+        # another worker stored the same result first
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    with closing(_cache_connect()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                     (key, json.dumps([p[len(stem):] for p in outputs]), size, time.time()))
+        _cache_evict(conn, get_setting('cache_max_mb') * 1024 * 1024)
+
+
+def envelope_cache_key(file_path):
+    """Key Envelope output by input content and extension.
+
+    Envelope HTML doesn't depend on the target, so every target of a document
+    shares one entry.
+    """
+    parts = {
+        'input': file_digest(file_path),
+        'ext': os.path.splitext(file_path)[1].lower(),
+        'version': VERSION,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def envelope_cache_lookup(key):
+    """Return cached Envelope HTML for `key`, or None on a miss."""
+    if key in _envelope_memo:
+        _envelope_memo.move_to_end(key)
+        return _envelope_memo[key]
+    path = os.path.join(ENVELOPE_CACHE_DIR, key + ".html")
+    with closing(_cache_connect()) as conn, conn:
+        row = conn.execute("SELECT key FROM intermediates WHERE key = ?", (key,)).fetchone()
+        if not row or not os.path.isfile(path):
+            if row:
+                conn.execute("DELETE FROM intermediates WHERE key = ?", (key,))
+            _bump_stat(conn, 'envelope_misses')
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        conn.execute("UPDATE intermediates SET last_used = ? WHERE key = ?", (time.time(), key))
+        _bump_stat(conn, 'envelope_hits')
+    _remember_envelope_html(key, html)
+    return html
+
+
+def envelope_cache_store(key, html):
+    _remember_envelope_html(key, html)
+    os.makedirs(ENVELOPE_CACHE_DIR, exist_ok=True)
+    path = os.path.join(ENVELOPE_CACHE_DIR, key + ".html")
+    fd, staging = tempfile.mkstemp(dir=ENVELOPE_CACHE_DIR, suffix=".tmp")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(staging, path)
+    with closing(_cache_connect()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO intermediates VALUES (?, ?, ?)",
+                     (key, os.path.getsize(path), time.time()))
+        _cache_evict(conn, get_setting('cache_max_mb') * 1024 * 1024)
+
+
+def _remember_envelope_html(key, html):
+    _envelope_memo[key] = html
+    _envelope_memo.move_to_end(key)
+    while len(_envelope_memo) > ENVELOPE_MEMORY_ENTRIES:
+        _envelope_memo.popitem(last=False)
+
+
+def _cache_evict(conn, max_bytes):
+    """Drop least recently used results and intermediates until the cache
+    fits in `max_bytes`."""
+    total = conn.execute("SELECT (SELECT COALESCE(SUM(size), 0) FROM entries)"
+                         " + (SELECT COALESCE(SUM(size), 0) FROM intermediates)").fetchone()[0]
+    if total <= max_bytes:
+        return
+    rows = conn.execute("SELECT 'entries', key, size, last_used FROM entries"
+                        " UNION ALL SELECT 'intermediates', key, size, last_used FROM intermediates"
+                        " ORDER BY last_used").fetchall()
+    for table, key, size, _ in rows:
+        if total <= max_bytes:
+            break
+        conn.execute(f"DELETE FROM {table} WHERE key = ?", (key,))
+        if table == 'entries':
+            shutil.rmtree(os.path.join(CACHE_RESULTS_DIR, key), ignore_errors=True)
+        else:
+            _envelope_memo.pop(key, None)
+            try:
+                os.remove(os.path.join(ENVELOPE_CACHE_DIR, key + ".html"))
+            except OSError:
+                pass
+        total -= size
+        _bump_stat(conn, 'evictions')
+
+
+def cache_stats():
+    with closing(_cache_connect()) as conn:
+        entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        intermediates, intermediate_size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM intermediates").fetchone()
+        stats = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+    stats.update(entries=entries, intermediates=intermediates, size=size + intermediate_size)
+    return stats
+
+
+def cache_clear():
+    with closing(_cache_connect()) as conn, conn:
+        conn.execute("DELETE FROM entries")
+        conn.execute("DELETE FROM intermediates")
+        conn.execute("DELETE FROM stats")
+    shutil.rmtree(CACHE_RESULTS_DIR, ignore_errors=True)
+    shutil.rmtree(ENVELOPE_CACHE_DIR, ignore_errors=True)
+    _envelope_memo.clear()
+
+def is_same_format(file_path, target):
     input_ext = os.path.splitext(file_path)[1].lower()[1:]
     if input_ext == 'jpeg':
         input_ext = 'jpg'
+    return target.lower() == input_ext or (target.lower().startswith(input_ext) and "(extract audio)" in target)
+
+def convert_file(file_path, target, info=None):
+    """Convert a single file, dispatching on `get_category`.
+
+    Unlike `silent_convert` this never exits the process; problems are raised
+    so that callers converting many files can record them and carry on.
+    Results come from the conversion cache when possible; if `info` is a dict
+    it is told whether that happened (`info['cached']`).
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
     cat = get_category(file_path)
     if not cat:
-        print("Unsupported file type")
-        sys.exit(1)
-    if target.lower() == input_ext or (target.lower().startswith(input_ext) and "(extract audio)" in target):
-        print("Input and output formats are the same")
-        sys.exit(0)
-    try:
-        if cat == 'docs':
-            new_fp = convert_docs(file_path, target)
-        elif cat == 'presentations':
-            new_fp = convert_presentations(file_path, target)
-        elif cat == 'images':
-            new_fp = convert_images(file_path, target)
-        elif cat == 'archive':
-            new_fp = convert_archive(file_path, target)
-        elif cat == 'spreadsheets':
-            new_fp = convert_spreadsheets(file_path, target)
-        elif cat == '3d':
-            new_fp = convert_3d(file_path, target)
-        elif cat in ['media_audio', 'media_video']:
-            new_fp = convert_media(file_path, target)
-        # On success, stay silent (no print)
-    except Exception as e:
-        # Optionally show error popup (uncomment if wanted; otherwise silent fail)
-        # messagebox.showerror("Conversion Failed", str(e))
-        print(f"Conversion failed: {str(e)}")  # Fallback, but silent in --windowed mode
-        sys.exit(1)
+        raise ValueError("Unsupported file type")
+    if info is None:
+        info = {}
+    info['cached'] = False
 
-class WormholeApp(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        self.title("Wormhole File Converter")
-        self.configure(fg_color=BG)
-        # Center the main window
-        self.update_idletasks()
-        screen_width = self.winfo_screenwidth()
-        screen_height = self.winfo_screenheight()
-        x = (screen_width // 2) - (400 // 2)
-        y = (screen_height // 2) - (700 // 2) - 30
-        self.geometry(f"400x700+{x}+{y}")
-        self._build_ui()
-        self.check_for_updates()
-        if sys.platform.startswith('win'):
-            pass  # Registration moved to --register
-        if len(sys.argv) > 1:
-            file = sys.argv[1]
-            if os.path.isfile(file):
-                cat = get_category(file)
-                if cat:
-                    open_func = getattr(self, f'open_{cat}_window')
-                    open_func(preselected_file=file)
-
-    def register_context_menu(self):
+    key = None
+    if get_setting('use_cache'):
         try:
-            import winreg
-            if hasattr(sys, '_MEIPASS'):
-                # Bundled mode
-                exe_path = sys.executable
-            else:
-                # Script mode
-                exe_path = f'"{sys.executable}" "{os.path.abspath(__file__)}"'
-            icon_path = sys.executable if hasattr(sys, '_MEIPASS') else APP_ICON_PATH
-            for cat, info in formats.items():
-                for ext in info['extensions']:
-                    main_key_path = rf"Software\Classes\SystemFileAssociations\{ext}\shell\WormholeConvert"
-                    key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, main_key_path, 0, winreg.KEY_SET_VALUE)
-                    winreg.SetValueEx(key, "MUIVerb", 0, winreg.REG_SZ, "Convert with Wormhole")
-                    winreg.SetValueEx(key, "Icon", 0, winreg.REG_SZ, icon_path)
-                    winreg.SetValueEx(key, "SubCommands", 0, winreg.REG_SZ, "")
-                    # Create the shell subkey under main
-                    shell_key_path = main_key_path + r"\shell"
-                    winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, shell_key_path, 0, winreg.KEY_SET_VALUE)
-                    for i, tgt in enumerate(sorted(info['targets'])):  # Sort for consistent order
-                        clean_tgt = tgt.replace(' ', '')
-                        sub_key_name = f"{i:02d}_{clean_tgt}"  # Prefix for ordering
-                        sub_key_path = shell_key_path + rf"\{sub_key_name}"
-                        sub_key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, sub_key_path, 0, winreg.KEY_SET_VALUE)
-                        winreg.SetValueEx(sub_key, None, 0, winreg.REG_SZ, f"To {tgt}")
-                        winreg.CloseKey(sub_key)
-                        cmd_key_path = sub_key_path + r"\command"
-                        cmd_key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, cmd_key_path, 0, winreg.KEY_SET_VALUE)
-                        winreg.SetValueEx(cmd_key, None, 0, winreg.REG_SZ, f'{exe_path} "%1" "{tgt}"')
-                        winreg.CloseKey(cmd_key)
-                    winreg.CloseKey(key)
+            key = cache_key(file_path, target)
+            cached = cache_lookup(key, file_path)
+            if cached:
+                info['cached'] = True
+                return cached
         except Exception as e:
-            print(f"Failed to register context menu: {e}")
+            print(f"Conversion cache unavailable: {e}")
+            key = None
 
-    def unregister_context_menu(self):
+    result = _convert_category(cat, file_path, target)
+    if key:
         try:
-            import winreg
-            for cat, info in formats.items():
-                for ext in info['extensions']:
-                    main_key_path = rf"Software\Classes\SystemFileAssociations\{ext}\shell\WormholeConvert"
-                    self._delete_registry_key(winreg.HKEY_CURRENT_USER, main_key_path)
-                    # Also clean up old flat structure if exists
-                    for tgt in info['targets']:
-                        clean_tgt = tgt.replace(' ', '')
-                        old_sub_key_path = rf"Software\Classes\SystemFileAssociations\{ext}\shell\To{clean_tgt}"
-                        self._delete_registry_key(winreg.HKEY_CURRENT_USER, old_sub_key_path)
+            cache_store(key, file_path, result)
         except Exception as e:
-            print(f"Failed to unregister context menu: {e}")
-
-    def _delete_registry_key(self, root, key_path):
-        import winreg
-        try:
-            key = winreg.OpenKey(root, key_path, 0, winreg.KEY_ALL_ACCESS)
-            num_subkeys, _, _ = winreg.QueryInfoKey(key)
-            for i in range(num_subkeys):
-                subkey_name = winreg.EnumKey(key, 0)
-                self._delete_registry_key(root, key_path + "\\" + subkey_name)
-            winreg.CloseKey(key)
-            winreg.DeleteKey(root, key_path)
-        except FileNotFoundError:
-            pass  # Key already gone
-
-    def _build_ui(self):
-        if os.path.exists(APP_ICON_PATH):
-            try:
-                if sys.platform.startswith('win'):
-                    import ctypes
-                    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("wormhole.file.converter")
-                self.iconbitmap(APP_ICON_PATH)
-            except Exception as e:
-                print(f"Could not set application icon: {e}")
-                
-        # Custom label for instructions
-        image = ctk.CTkImage(light_image=WORMHOLE_PIL_IMAGE, dark_image=WORMHOLE_PIL_IMAGE, size=(306, 204))
-        img_label = ctk.CTkLabel(self, image=image, text="", fg_color=BG)
-        img_label.pack(pady=10)
-
-        label = ctk.CTkLabel(self, text="Select a file type category:", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-        label.pack(pady=20)
-
-        # Buttons for each category (using semibold for buttons if desired; otherwise keep normal)
-        docs_text = "Docs 📨" if (ENVELOPE_SUPPORT or (ENVELOPE_JS_SUPPORT and SETTINGS.get('use_envelope'))) else "Docs"
-        btn_docs = ctk.CTkButton(self, text=docs_text, command=self.open_docs_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_docs.pack(pady=5)
-
-        presentations_text = "Presentations 📨" if (ENVELOPE_SUPPORT or (ENVELOPE_JS_SUPPORT and SETTINGS.get('use_envelope'))) else "Presentations"
-        btn_presentations = ctk.CTkButton(self, text=presentations_text, command=self.open_presentations_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_presentations.pack(pady=5)
-
-        btn_images = ctk.CTkButton(self, text="Images", command=self.open_images_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_images.pack(pady=5)
-
-        btn_archive = ctk.CTkButton(self, text="Archive", command=self.open_archive_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_archive.pack(pady=5)
-
-        spreadsheets_text = "Spreadsheets 📨" if (ENVELOPE_SUPPORT or (ENVELOPE_JS_SUPPORT and SETTINGS.get('use_envelope'))) else "Spreadsheets"
-        btn_spreadsheets = ctk.CTkButton(self, text=spreadsheets_text, command=self.open_spreadsheets_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_spreadsheets.pack(pady=5)
-
-        btn_3d = ctk.CTkButton(self, text="3D Models", command=self.open_3d_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_3d.pack(pady=5)
-
-        btn_media = ctk.CTkButton(self, text="Media", command=self.open_media_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
-        btn_media.pack(pady=5)
-
-        btn_about = ctk.CTkButton(self, text="About", command=self.open_about, fg_color='#888', text_color=BG, hover_color='#666', corner_radius=20, width=100, font=(FONT_FAMILY_SEMIBOLD, 10))
-        btn_about.pack(pady=5)
-
-    def open_about(self):
-        about_win = ctk.CTkToplevel(self)
-        about_win.title("About Wormhole")
-        about_win.geometry("350x600")
-        about_win.configure(fg_color=BG)
-        # Center the window
-        about_win.update_idletasks()
-        screen_width = about_win.winfo_screenwidth()
-        screen_height = about_win.winfo_screenheight()
-        x = (screen_width // 2) - (350 // 2)
-        y = (screen_height // 2) - (600 // 2)
-        about_win.geometry(f"350x600+{x}+{y}")
-        # Set icon
-        if os.path.exists(APP_ICON_PATH):
+            print(f"Could not cache conversion result: {e}")
+    return result
+
+def _convert_category(cat, file_path, target):
+    if cat == 'docs':
+        return convert_docs(file_path, target)
+    elif cat == 'presentations':
+        return convert_presentations(file_path, target)
+    elif cat == 'images':
+        return convert_images(file_path, target)
+    elif cat == 'archive':
+        return convert_archive(file_path, target)
+    elif cat == 'spreadsheets':
+        return convert_spreadsheets(file_path, target)
+    elif cat == '3d':
+        return convert_3d(file_path, target)
+    elif cat in ['media_audio', 'media_video']:
+        return convert_media(file_path, target)
+    raise ValueError(f"No converter for category {cat}")
+
+def convert_file_multi(file_path, targets, info=None, progress_cb=None, cancel=None):
+    """Convert one file to several targets, decoding the input once where the
+    category allows it (one Image.open, one ffmpeg run, one text extraction).
+
+    Returns a dict mapping each target to its result. Targets in the input's
+    own format are refused rather than written over the input. A failing
+    target doesn't stop the others: if `info` is a dict its errors are recorded in
+    `info['errors']` (target -> exception), otherwise the first one is raised.
+    `info['cached']` lists the targets that came from the conversion cache.
+    Media conversions report progress to `progress_cb` and can be stopped with
+    the `cancel` event (see `run_ffmpeg`).
+    """
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    cat = get_category(file_path)
+    if not cat:
+        raise ValueError("Unsupported file type")
+    targets = list(dict.fromkeys(targets))
+    if info is None:
+        info = {}
+        raise_errors = True
+    else:
+        raise_errors = False
+    info['cached'] = []
+    info['errors'] = {}
+    # writing the source format again would overwrite the input itself
+    for target in targets:
+        if is_same_format(file_path, target):
+            info['errors'][target] = ValueError("Input and output formats are the same")
+    targets = [t for t in targets if t not in info['errors']]
+
+    results = {}
+    keys = {}
+    if get_setting('use_cache'):
+        for target in targets:
             try:
-                about_win.after(250, lambda: about_win.iconbitmap(APP_ICON_PATH))
+                keys[target] = cache_key(file_path, target)
+                cached = cache_lookup(keys[target], file_path)
             except Exception as e:
-                print(f"Could not set icon for about window: {e}")
-        about_win.transient(self)
-        about_win.grab_set()
+                print(f"Conversion cache unavailable: {e}")
+                keys.clear()
+                break
+            if cached:
+                results[target] = cached
+                info['cached'].append(target)
+
+    pending = [t for t in targets if t not in results]
+    if pending:
+        for target, result in _convert_category_multi(cat, file_path, pending, progress_cb, cancel).items():
+            if isinstance(result, Exception):
+                info['errors'][target] = result
+                continue
+            results[target] = result
+            if target in keys:
+                try:
+                    cache_store(keys[target], file_path, result)
+                except Exception as e:
+                    print(f"Could not cache conversion result: {e}")
+    if raise_errors and info['errors']:
+        raise next(iter(info['errors'].values()))
+    return results
 
-        # Image 1
+def _convert_category_multi(cat, file_path, targets, progress_cb=None, cancel=None):
+    if cat == 'images':
         try:
-            img1 = Image.open(ABOUT_IMAGE1_PATH)
-            if img1.height > 100:
-                new_width = int(img1.width * (100 / img1.height))
-                img1 = img1.resize((new_width, 100), Image.Resampling.LANCZOS)
-            ctk_img1 = ctk.CTkImage(light_image=img1, dark_image=img1, size=(img1.width, img1.height))
-            label_img1 = ctk.CTkLabel(about_win, image=ctk_img1, text="")
-            label_img1.pack(pady=10)
+            return convert_images_multi(file_path, targets)
         except Exception as e:
-            print(f"Could not load about image 1: {e}")
-
-        # Image 2
+            # the image couldn't even be opened
+            return {target: e for target in targets}
+    if cat in ['media_audio', 'media_video']:
         try:
-            img2 = Image.open(ABOUT_IMAGE2_PATH)
-            if img2.height > 100:
-                new_width = int(img2.width * (100 / img2.height))
-                img2 = img2.resize((new_width, 100), Image.Resampling.LANCZOS)
-            ctk_img2 = ctk.CTkImage(light_image=img2, dark_image=img2, size=(img2.width, img2.height))
-            label_img2 = ctk.CTkLabel(about_win, image=ctk_img2, text="")
-            label_img2.pack(pady=10)
+            return convert_media_multi(file_path, targets, progress_cb, cancel)
         except Exception as e:
-            print(f"Could not load about image 2: {e}")
-
-        # version and credits merged into a single block
-        info_text = f"Version {VERSION}\n© Nova Foundry    Envelope © p2r3"
-        label_version = ctk.CTkLabel(about_win, text=info_text, fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 14), justify="center")
-        label_version.pack(pady=(0,5))
-
-        github_link = ctk.CTkLabel(about_win, text="Github Repo", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
-        github_link.pack()
-        github_link.bind("<Button-1>", lambda e: webbrowser.open_new(GITHUB_URL))
-
-        # envelope toggle (moved from settings popup)
-        var = ctk.BooleanVar(value=SETTINGS.get('use_envelope', False))
-        chk = ctk.CTkCheckBox(about_win, text="Enable Envelope JS conversions", variable=var)
-        chk.pack(pady=10)
-        def _on_toggle():
-            SETTINGS['use_envelope'] = var.get()
-            save_settings(SETTINGS)
-            messagebox.showinfo("Settings", "Preferences saved. Restart the app for changes to take effect.")
-        var.trace_add('write', lambda *args: _on_toggle())
-
-        links_frame = ctk.CTkFrame(about_win, fg_color=BG)
-        support_link = ctk.CTkLabel(links_frame, text="Support Nova Foundry", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
-        support_link.pack(side="left", padx=10)
-        official_link = ctk.CTkLabel(links_frame, text="Visit Official Website", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
-        official_link.pack(side="left", padx=10)
-        help_link = ctk.CTkLabel(links_frame, text="Help", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
-        help_link.pack(side="left", padx=10)
-        links_frame.pack(pady=10)
-
-        def open_official_link(event):
-            webbrowser.open_new("https://novafoundry.ca")
-        def open_support_link(event):
-            webbrowser.open_new("https://novafoundry.ca/support")
-        def open_help_link(event):
-            webbrowser.open_new("https://github.com/DirectedHunt42/Wormhole/wiki")
-        support_link.bind("<Button-1>", open_support_link)
-        official_link.bind("<Button-1>", open_official_link)
-        help_link.bind("<Button-1>", open_help_link)
-
-        # License (always show box; catch any errors so UI doesn't abort)
+            return {target: e for target in targets}
+    # other categories convert target by target; documents share their text
+    # extraction and Envelope output is cached, so the source is still parsed once
+    # a single target streams its text; only a real fan-out keeps a copy to share
+    extracted = {} if len(targets) > 1 else None
+    results = {}
+    for target in targets:
         try:
-            # always resolve path relative to the executable's folder
-            exe_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(__file__)
-            license_path = os.path.join(exe_dir, "LICENSE.txt")
-            print(f"[DEBUG] about dialog looking for license at {license_path}")
-            if os.path.exists(license_path):
-                try:
-                    with open(license_path, 'r', encoding='utf-8-sig') as f:
-                        license_text = f.read().strip()
-                except PermissionError as pe:
-                    # copy-out workaround
-                    tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.txt')
-                    tmp.close()
-                    try:
-                        shutil.copy2(license_path, tmp.name)
-                        with open(tmp.name, 'r', encoding='utf-8-sig') as f2:
-                            license_text = f2.read().strip()
-                    finally:
-                        try:
-                            os.unlink(tmp.name)
-                        except Exception:
-                            pass
+            if cat == 'docs':
+                results[target] = convert_docs(file_path, target, extracted)
             else:
-                license_text = "LICENSE.txt not found."
-        except Exception as e:
-            license_text = f"Error loading license: {e}"
-            print(f"[ERROR] could not load license text: {e}")
-            try:
-                messagebox.showwarning("About", f"Failed to load LICENSE.txt:\n{e}")
-            except Exception:
-                pass
-        try:
-            textbox = ctk.CTkTextbox(about_win, width=300, height=200)
-            textbox.insert("0.0", license_text)
-            textbox.configure(state="disabled")
-            textbox.pack(pady=10)
+                results[target] = _convert_category(cat, file_path, target)
         except Exception as e:
-            print(f"[ERROR] failed to create license textbox: {e}")
-            try:
-                messagebox.showwarning("About", f"Could not display license text box:\n{e}")
-            except Exception:
-                pass
-            # fallback: show error label instead
-            label_err = ctk.CTkLabel(about_win, text=f"License box error: {e}", fg_color=BG, text_color=TEXT)
-            label_err.pack(pady=10)
-
-    def check_for_updates(self):
-        try:
-            response = requests.get("https://api.github.com/repos/DirectedHunt42/Wormhole/releases/latest")
-            if response.status_code == 200:
-                data = response.json()
-                latest_version = data['tag_name']
-                if self.is_newer_version(latest_version, VERSION):
-                    if messagebox.askyesno("Update Available", f"A new version {latest_version} is available. Do you want to download and install it?"):
-                        self.download_and_install_update(data)
-        except Exception:
-            pass  # Fail silently if no internet or other issues
-
-    def is_newer_version(self, latest, current):
-        def parse(v):
-            return tuple(int(x) for x in v.lstrip('v').split('.'))
-        return parse(latest) > parse(current)
-
-    def download_and_install_update(self, data):
-        for asset in data['assets']:
-            if asset['name'] == 'Wormhole_setup.exe':
-                url = asset['browser_download_url']
-                try:
-                    response = requests.get(url, stream=True)
-                    if response.status_code == 200:
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.exe') as tmp:
-                            for chunk in response.iter_content(chunk_size=1024):
-                                tmp.write(chunk)
-                            tmp_path = tmp.name
-                        os.startfile(tmp_path)
-                        sys.exit(0)
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to download or run update: {str(e)}")
-                return
-        messagebox.showerror("Error", "Wormhole_setup.exe not found in the latest release.")
-
-# Functions to open subwindows for each category
-
-def open_docs_window(master, preselected_file=None):
-    docs_win = ctk.CTkToplevel(master)
-    docs_win.title("Docs Conversions")
-    docs_win.geometry("300x300")
-    docs_win.configure(fg_color=BG)
-    # Center the window
-    docs_win.update_idletasks()
-    screen_width = docs_win.winfo_screenwidth()
-    screen_height = docs_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (300 // 2)
-    docs_win.geometry(f"300x300+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
-        try:
-            docs_win.after(250, lambda: docs_win.iconbitmap(APP_ICON_PATH))
-        except Exception as e:
-            print(f"Could not set icon for docs window: {e}")
-    # Make it transient and grab set to stay on top
-    docs_win.transient(master)
-    docs_win.grab_set()
-
-    label = ctk.CTkLabel(docs_win, text="Docs Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    base_filetypes = "*.txt;*.pdf;*.docx;*.html;*.md;*.odt"
-    if ENVELOPE_SUPPORT:
-        base_filetypes += ";*.rtf"
-    filetypes = [("Docs files", base_filetypes)]
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select Docs File", filetypes=filetypes)
-        if fp:
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(docs_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(docs_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
-
-    combo_values = ["TXT", "DOCX 📨", "HTML 📨", "MD", "ODT 📨"]
-    if ENVELOPE_SUPPORT:
-        combo_values.append("RTF 📨")
-    target_var = ctk.StringVar(value="TXT")
-    combo = ctk.CTkComboBox(docs_win, values=combo_values, variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    progress_bar = ctk.CTkProgressBar(docs_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target_display = target_var.get()
-        target = target_display.split(" 📨")[0].upper()
-        input_ext = os.path.splitext(fp)[1].lower()[1:]
-        if target.lower() == input_ext:
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
-
-        def conversion_thread():
-            try:
-                new_file_path = convert_docs(fp, target)
-                docs_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
-            except FileNotFoundError:
-                docs_win.after(0, lambda: messagebox.showerror("Error", "LibreOffice required for this conversion. Please install LibreOffice."))
-            except Exception as e:
-                docs_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                docs_win.after(0, progress_bar.stop)
-                docs_win.after(0, progress_bar.pack_forget)
-                docs_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(docs_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
-
-def open_presentations_window(master, preselected_file=None):
-    pres_win = ctk.CTkToplevel(master)
-    pres_win.title("Presentations Conversions")
-    pres_win.geometry("300x300")
-    pres_win.configure(fg_color=BG)
-    # Center the window
-    pres_win.update_idletasks()
-    screen_width = pres_win.winfo_screenwidth()
-    screen_height = pres_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (300 // 2)
-    pres_win.geometry(f"300x300+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
-        try:
-            pres_win.after(250, lambda: pres_win.iconbitmap(APP_ICON_PATH))
-        except Exception as e:
-            print(f"Could not set icon for presentations window: {e}")
-    # Make it transient and grab set to stay on top
-    pres_win.transient(master)
-    pres_win.grab_set()
-
-    label = ctk.CTkLabel(pres_win, text="Presentations Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select Presentation File", filetypes=[("Presentation files", "*.pptx;*.odp")])
-        if fp:
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(pres_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(pres_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
+            results[target] = e
+    return results
 
-    combo_values = ["PPTX 📨", "PDF 📨", "TXT", "DOCX 📨", "ODP 📨"]
-    target_var = ctk.StringVar(value="PDF 📨")
-    combo = ctk.CTkComboBox(pres_win, values=combo_values, variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    progress_bar = ctk.CTkProgressBar(pres_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target_display = target_var.get()
-        target = target_display.split(" 📨")[0].upper()
-        input_ext = os.path.splitext(fp)[1].lower()[1:]
-        if target.lower() == input_ext:
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
+def silent_convert(file_path, target):
+    if not os.path.isfile(file_path):
+        print("File not found")
+        sys.exit(1)
+    cat = get_category(file_path)
+    if not cat:
+        print("Unsupported file type")
+        sys.exit(1)
+    if is_same_format(file_path, target):
+        print("Input and output formats are the same")
+        sys.exit(0)
+    try:
+        new_fp = convert_file(file_path, target)
+        # On success, stay silent (no print)
+    except Exception as e:
+        # Optionally show error popup (uncomment if wanted; otherwise silent fail)
+        # messagebox.showerror("Conversion Failed", str(e))
+        print(f"Conversion failed: {str(e)}")  # Fallback, but silent in --windowed mode
+        sys.exit(1)
 
-        def conversion_thread():
-            try:
-                new_file_path = convert_presentations(fp, target)
-                pres_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
-            except FileNotFoundError:
-                pres_win.after(0, lambda: messagebox.showerror("Error", "LibreOffice required for this conversion. Please install LibreOffice."))
-            except Exception as e:
-                pres_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                pres_win.after(0, progress_bar.stop)
-                pres_win.after(0, progress_bar.pack_forget)
-                pres_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(pres_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
-
-def open_images_window(master, preselected_file=None):
-    img_win = ctk.CTkToplevel(master)
-    img_win.title("Images Conversions")
-    img_win.geometry("300x450")
-    img_win.configure(fg_color=BG)
-    # Center the window
-    img_win.update_idletasks()
-    screen_width = img_win.winfo_screenwidth()
-    screen_height = img_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (450 // 2)
-    img_win.geometry(f"300x450+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
-        try:
-            img_win.after(250, lambda: img_win.iconbitmap(APP_ICON_PATH))
-        except Exception as e:
-            print(f"Could not set icon for images window: {e}")
-    # Make it transient and grab set to stay on top
-    img_win.transient(master)
-    img_win.grab_set()
-
-    label = ctk.CTkLabel(img_win, text="Images Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select Image File", filetypes=[("Image files", "*.jpg;*.jpeg;*.png;*.webp;*.avif;*.ico;*.bmp;*.gif;*.tiff")])
-        if fp:
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(img_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(img_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
-
-    target_var = ctk.StringVar(value="PNG")
-    combo = ctk.CTkComboBox(img_win, values=["PNG", "JPG", "WEBP", "AVIF", "ICO", "BMP", "GIF", "TIFF"], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    ico_frame = ctk.CTkFrame(img_win, fg_color=BG)
-    ico_label = ctk.CTkLabel(ico_frame, text="Select ICO sizes:", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    ico_label.pack(pady=10)
-    sizes = [16, 24, 32, 40, 48, 64, 128, 256]
-    check_vars = [ctk.BooleanVar(value=True) for _ in sizes]  # Default checked
-    for i, s in enumerate(sizes):
-        cb = ctk.CTkCheckBox(ico_frame, text=f"{s}x{s}", variable=check_vars[i])
-        cb.pack(anchor="w")
-
-    def update_ico_frame(event=None):
-        if target_var.get() == "ICO":
-            ico_frame.pack(pady=5)
-            img_win.geometry("300x450")
+# ---------- batch conversion ----------
+
+def parse_targets(value):
+    """Split a comma separated list of targets ("PNG,WEBP,AVIF")."""
+    targets = []
+    for t in (value or '').split(','):
+        # only the format is upper-cased; modifiers like "(extract audio)" are matched in lower case
+        fmt, _, modifier = t.strip().partition(' ')
+        if fmt:
+            targets.append(fmt.upper() + (' ' + modifier.strip().lower() if modifier.strip() else ''))
+    return targets
+
+def expand_batch_inputs(patterns, target=None, manifest=None):
+    """Build a list of (file_path, target) jobs from glob patterns and/or a
+    manifest file. `target` may be a comma separated list, giving one job per
+    target for every file.
+
+    Manifest lines hold a path, optionally followed by a tab and target(s) that
+    override `target` for that file. Blank lines and lines starting with `#`
+    are ignored; relative paths are resolved against the manifest's folder.
+    """
+    jobs = []
+    seen = set()
+
+    def add(fp, tgt):
+        targets = parse_targets(tgt)
+        if not targets:
+            raise ValueError(f"No target format given for {fp}")
+        for t in targets:
+            key = (os.path.abspath(fp), t)
+            if key not in seen:
+                seen.add(key)
+                jobs.append((fp, t))
+
+    for pattern in patterns or []:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            # keep literal paths so they are reported as missing rather than dropped
+            add(pattern, target)
+        for fp in matches:
+            if os.path.isfile(fp):
+                add(fp, target)
+
+    if manifest:
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                fp, _, tgt = line.partition('\t')
+                fp = fp.strip()
+                if not os.path.isabs(fp):
+                    fp = os.path.join(base_dir, fp)
+                add(fp, tgt.strip() or target)
+    return jobs
+
+def _batch_job(file_path, targets, progress_cb=None):
+    """Convert one input to each of `targets` and describe every outcome as a
+    dict instead of raising, so one bad file can't take the rest of the batch
+    down with it."""
+    results = {t: {'input': file_path, 'target': t, 'status': 'ok', 'output': None, 'error': None, 'cached': False}
+               for t in targets}
+    start = time.perf_counter()
+    pending = []
+    for target, result in results.items():
+        if is_same_format(file_path, target):
+            result['status'] = 'skipped'
+            result['error'] = "Input and output formats are the same"
         else:
-            ico_frame.pack_forget()
-            img_win.geometry("300x300")
-        img_win.update_idletasks()
-
-    combo.configure(command=lambda choice: update_ico_frame())
-
-    progress_bar = ctk.CTkProgressBar(img_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target = target_var.get().upper()
-        input_ext = os.path.splitext(fp)[1].lower()[1:]
-        if input_ext == "jpeg":
-            input_ext = "jpg"
-        if target.lower() == input_ext or (target == "JPG" and input_ext in ["jpg", "jpeg"]):
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
-
-        def conversion_thread():
-            try:
-                if target == "ICO":
-                    selected_sizes = [sizes[i] for i, v in enumerate(check_vars) if v.get()]
-                    if not selected_sizes:
-                        img_win.after(0, lambda: messagebox.showerror("Error", "Select at least one size for ICO"))
-                        return
-                new_file_path = convert_images(fp, target)
-                img_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
-            except Exception as e:
-                img_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                img_win.after(0, progress_bar.stop)
-                img_win.after(0, progress_bar.pack_forget)
-                img_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(img_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
-
-    # Initially hide ico_frame if not ICO
-    update_ico_frame()
-
-def open_archive_window(master, preselected_file=None):
-    arch_win = ctk.CTkToplevel(master)
-    arch_win.title("Archive Conversions")
-    arch_win.geometry("300x300")
-    arch_win.configure(fg_color=BG)
-    # Center the window
-    arch_win.update_idletasks()
-    screen_width = arch_win.winfo_screenwidth()
-    screen_height = arch_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (300 // 2)
-    arch_win.geometry(f"300x300+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
+            pending.append(target)
+    if pending:
+        info = {}
         try:
-            arch_win.after(250, lambda: arch_win.iconbitmap(APP_ICON_PATH))
+            outputs = convert_file_multi(file_path, pending, info, progress_cb)
         except Exception as e:
-            print(f"Could not set icon for archive window: {e}")
-    # Make it transient and grab set to stay on top
-    arch_win.transient(master)
-    arch_win.grab_set()
-
-    label = ctk.CTkLabel(arch_win, text="Archive Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select Archive File", filetypes=[("Archive files", "*.zip;*.7z;*.tar;*.tar.gz;*.tgz;*.tar.bz2;*.tbz2")])
-        if fp:
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(arch_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(arch_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
-
-    target_var = ctk.StringVar(value="ZIP")
-    combo = ctk.CTkComboBox(arch_win, values=["ZIP", "7Z", "TAR", "TGZ", "TBZ2"], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    progress_bar = ctk.CTkProgressBar(arch_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target = target_var.get().upper()
-        try:
-            input_type = get_archive_type(fp)
-        except ValueError:
-            messagebox.showerror("Error", "Unsupported input format")
-            return
-        if target.lower() == input_type:
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
-
-        def conversion_thread():
-            try:
-                new_file_path = convert_archive(fp, target)
-                arch_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
-            except Exception as e:
-                arch_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                arch_win.after(0, progress_bar.stop)
-                arch_win.after(0, progress_bar.pack_forget)
-                arch_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(arch_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
-
-def open_spreadsheets_window(master, preselected_file=None):
-    spreadsheets_win = ctk.CTkToplevel(master)
-    spreadsheets_win.title("Spreadsheets Conversions")
-    spreadsheets_win.geometry("300x300")
-    spreadsheets_win.configure(fg_color=BG)
-    # Center the window
-    spreadsheets_win.update_idletasks()
-    screen_width = spreadsheets_win.winfo_screenwidth()
-    screen_height = spreadsheets_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (300 // 2)
-    spreadsheets_win.geometry(f"300x300+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
+            outputs = {}
+            info['errors'] = {t: e for t in pending}
+        for target in pending:
+            result = results[target]
+            error = info.get('errors', {}).get(target)
+            if error is not None:
+                result['status'] = 'failed'
+                result['error'] = str(error) or error.__class__.__name__
+            else:
+                result['output'] = outputs[target]
+                result['cached'] = target in info.get('cached', [])
+    # targets of one input are converted together, so they share its time
+    seconds = time.perf_counter() - start
+    for result in results.values():
+        result['seconds'] = seconds
+    return [results[t] for t in targets]
+
+def _batch_audio_clips(clips, workers, on_done):
+    """Convert short audio clips, given as (file_path, targets) pairs, many to
+    an ffmpeg run (see `convert_audio_batch`) with up to `workers` runs at a
+    time. `on_done(n, results)` is called in this thread with the `_batch_job`
+    style results of clip n as soon as its run finishes."""
+    use_cache = get_setting('use_cache')
+    pending = []
+    for n, (file_path, targets) in enumerate(clips):
+        results = {t: {'input': file_path, 'target': t, 'status': 'ok', 'output': None, 'error': None,
+                       'cached': False, 'seconds': 0.0} for t in targets}
+        keys = {}
+        for target, result in results.items():
+            if is_same_format(file_path, target):
+                result['status'] = 'skipped'
+                result['error'] = "Input and output formats are the same"
+                continue
+            keys[target] = None
+            if use_cache:
+                try:
+                    key = cache_key(file_path, target)
+                    cached = cache_lookup(key, file_path)
+                except Exception as e:
+                    print(f"Conversion cache unavailable: {e}")
+                    use_cache = False
+                    continue
+                if cached:
+                    result['output'] = cached
+                    result['cached'] = True
+                else:
+                    keys[target] = key
+        todo = [t for t in keys if not results[t]['cached']]
+        if todo:
+            pending.append((n, todo, keys, results))
+        else:
+            on_done(n, [results[t] for t in targets])
+
+    # spread the clips over all workers before making runs longer
+    per_run = max(1, min(AUDIO_BATCH_CLIPS, -(-len(pending) // max(1, workers))))
+    runs = [[]]
+    chars = 0
+    for item in pending:
+        length = len(clips[item[0]][0]) * (1 + len(item[1])) + 80 * len(item[1])
+        if runs[-1] and (len(runs[-1]) >= per_run or chars + length > AUDIO_BATCH_COMMAND_CHARS):
+            runs.append([])
+            chars = 0
+        runs[-1].append(item)
+        chars += length
+
+    def convert_run(run):
+        start = time.perf_counter()
         try:
-            spreadsheets_win.after(250, lambda: spreadsheets_win.iconbitmap(APP_ICON_PATH))
-        except Exception as e:
-            print(f"Could not set icon for spreadsheets window: {e}")
-    # Make it transient and grab set to stay on top
-    spreadsheets_win.transient(master)
-    spreadsheets_win.grab_set()
-
-    label = ctk.CTkLabel(spreadsheets_win, text="Spreadsheets Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select Spreadsheet File", filetypes=[("Spreadsheet files", "*.xlsx;*.csv;*.ods")])
-        if fp:
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(spreadsheets_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(spreadsheets_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
-
-    combo_values = ["XLSX 📨", "CSV", "ODS 📨"]
-    target_var = ctk.StringVar(value="XLSX 📨")
-    combo = ctk.CTkComboBox(spreadsheets_win, values=combo_values, variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    progress_bar = ctk.CTkProgressBar(spreadsheets_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target_display = target_var.get()
-        target = target_display.split(" 📨")[0].upper()
-        input_ext = os.path.splitext(fp)[1].lower()[1:]
-        if target.lower() == input_ext:
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
+            outputs = convert_audio_batch([(clips[n][0], todo) for n, todo, _, _ in run])
+        except Exception:
+            # one unreadable clip fails the whole run; convert the targets that
+            # are still to do one clip at a time so every clip gets its own result
+            done = []
+            for n, todo, _, results in run:
+                for result in _batch_job(clips[n][0], todo):
+                    results[result['target']] = result
+                done.append((n, [results[t] for t in clips[n][1]]))
+            return done
+        # the clips were converted together, so they share the run's time
+        seconds = (time.perf_counter() - start) / len(run)
+        done = []
+        for (n, todo, keys, results), clip_outputs in zip(run, outputs):
+            for target in todo:
+                results[target]['output'] = clip_outputs[target]
+                results[target]['seconds'] = seconds
+                if keys[target]:
+                    try:
+                        cache_store(keys[target], clips[n][0], clip_outputs[target])
+                    except Exception as e:
+                        print(f"Could not cache conversion result: {e}")
+            done.append((n, [results[t] for t in clips[n][1]]))
+        return done
 
-        def conversion_thread():
+    if not pending:
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(runs)))) as pool:
+        for future in as_completed([pool.submit(convert_run, run) for run in runs]):
+            for n, results in future.result():
+                on_done(n, results)
+
+def _init_batch_worker(settings, jobs_at_once):
+    global _batch_jobs_at_once
+    SETTINGS.update(settings)
+    _batch_jobs_at_once = jobs_at_once
+
+def batch_convert(jobs, workers=None, on_result=None, on_progress=None):
+    """Convert many (file_path, target) jobs across a process pool, with
+    office documents sharing the LibreOffice worker pool. Jobs that share an
+    input are converted together in one fan-out.
+
+    Short audio clips are converted several to an ffmpeg run (see
+    `audio_batchable`) instead of each starting its own; those runs go on
+    alongside the other jobs, with a share of the workers.
+
+    Results come back in job order; `on_result` is called with each result as
+    soon as it finishes so callers can report progress. When the jobs run in
+    this process (one worker or one input), `on_progress(file_path, progress)`
+    is also called with media conversion progress.
+    """
+    if workers is None:
+        workers = get_setting('batch_workers') or os.cpu_count() or 1
+    results = [None] * len(jobs)
+
+    # jobs for the same input run together so it is decoded once for all its targets
+    groups = {}
+    for i, (fp, tgt) in enumerate(jobs):
+        groups.setdefault(os.path.abspath(fp), []).append(i)
+    tasks = [(jobs[indices[0]][0], indices) for indices in groups.values()]
+
+    # shared audio runs report from their own thread
+    lock = threading.Lock()
+
+    def collect(indices, task_results):
+        with lock:
+            for i, res in zip(indices, task_results):
+                results[i] = res
+                if on_result:
+                    on_result(res)
+
+    # short audio clips are mostly ffmpeg start-up time, so they share runs;
+    # a failed run removes all it wrote, so clips whose outputs would overwrite
+    # another input or output are left out
+    clip_tasks = []
+    clip_outputs = set()
+    for n, (fp, indices) in enumerate(tasks):
+        targets = [jobs[i][1] for i in indices]
+        outputs = {os.path.splitext(os.path.abspath(fp))[0] + '.' + t.lower()
+                   for t in targets if not is_same_format(fp, t)}
+        if audio_batchable(fp, targets) and not outputs & (clip_outputs | groups.keys()):
+            clip_tasks.append(n)
+            clip_outputs |= outputs
+    clip_thread = None
+    clip_errors = []
+    if len(clip_tasks) > 1:
+        clips = [(tasks[n][0], [jobs[i][1] for i in tasks[n][1]]) for n in clip_tasks]
+        clip_indices = [tasks[n][1] for n in clip_tasks]
+        batched = set(clip_tasks)
+        others = [task for n, task in enumerate(tasks) if n not in batched]
+
+        def run_clips(clip_workers):
             try:
-                new_file_path = convert_spreadsheets(fp, target)
-                spreadsheets_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
-            except FileNotFoundError:
-                spreadsheets_win.after(0, lambda: messagebox.showerror("Error", "LibreOffice required for this conversion. Please install LibreOffice."))
-            except Exception as e:
-                spreadsheets_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                spreadsheets_win.after(0, progress_bar.stop)
-                spreadsheets_win.after(0, progress_bar.pack_forget)
-                spreadsheets_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(spreadsheets_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
+                _batch_audio_clips(clips, clip_workers, lambda n, task_results: collect(clip_indices[n], task_results))
+            except BaseException as e:
+                clip_errors.append(e)
+
+        if workers > 1 and others:
+            # split the workers between the shared runs and everything else by task count
+            clip_workers = min(workers - 1, max(1, workers * len(clips) // len(tasks)))
+            workers -= clip_workers
+            clip_thread = threading.Thread(target=run_clips, args=(clip_workers,), daemon=True)
+            clip_thread.start()
+        else:
+            run_clips(workers)
+        tasks = others
 
-def open_3d_window(master, preselected_file=None):
-    if not TRIMESH_SUPPORT:
-        messagebox.showerror("Error", "trimesh library not installed. Please install trimesh to enable 3D file support.")
+    try:
+        _convert_batch_tasks(jobs, tasks, workers, collect, on_progress)
+    finally:
+        if clip_thread is not None:
+            clip_thread.join()
+    if clip_errors:
+        raise clip_errors[0]
+    return results
+
+def _convert_batch_tasks(jobs, tasks, workers, collect, on_progress=None):
+    """Convert `batch_convert`'s tasks (an input and the indices of its jobs)
+    on `workers` processes and the office threads, handing the results of
+    each to `collect` as it finishes."""
+    global _batch_jobs_at_once
+    if workers <= 1 or len(tasks) <= 1:
+        for fp, indices in tasks:
+            progress_cb = functools.partial(on_progress, fp) if on_progress else None
+            collect(indices, _batch_job(fp, [jobs[i][1] for i in indices], progress_cb))
         return
 
-    threed_win = ctk.CTkToplevel(master)
-    threed_win.title("3D Model Conversions")
-    threed_win.geometry("300x300")
-    threed_win.configure(fg_color=BG)
-    # Center the window
-    threed_win.update_idletasks()
-    screen_width = threed_win.winfo_screenwidth()
-    screen_height = threed_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (300 // 2)
-    threed_win.geometry(f"300x300+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
-        try:
-            threed_win.after(250, lambda: threed_win.iconbitmap(APP_ICON_PATH))
-        except Exception as e:
-            print(f"Could not set icon for 3D window: {e}")
-    # Make it transient and grab set to stay on top
-    threed_win.transient(master)
-    threed_win.grab_set()
-
-    label = ctk.CTkLabel(threed_win, text="3D Model Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select 3D File", filetypes=[("3D files", "*.obj;*.stl;*.ply;*.fbx;*.glb")])
-        if fp:
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(threed_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(threed_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
-
-    target_var = ctk.StringVar(value="OBJ")
-    combo = ctk.CTkComboBox(threed_win, values=["OBJ", "STL", "PLY", "FBX", "GLB"], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    progress_bar = ctk.CTkProgressBar(threed_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target = target_var.get().upper()
-        input_ext = os.path.splitext(fp)[1].lower()[1:]
-        if target.lower() == input_ext:
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
-
-        def conversion_thread():
-            try:
-                new_file_path = convert_3d(fp, target)
-                threed_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
-            except Exception as e:
-                threed_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                threed_win.after(0, progress_bar.stop)
-                threed_win.after(0, progress_bar.pack_forget)
-                threed_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(threed_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
-
-def open_media_window(master, preselected_file=None):
-    media_win = ctk.CTkToplevel(master)
-    media_win.title("Media Conversions")
-    media_win.geometry("300x300")
-    media_win.configure(fg_color=BG)
-    # Center the window
-    media_win.update_idletasks()
-    screen_width = media_win.winfo_screenwidth()
-    screen_height = media_win.winfo_screenheight()
-    x = (screen_width // 2) - (300 // 2)
-    y = (screen_height // 2) - (300 // 2)
-    media_win.geometry(f"300x300+{x}+{y}")
-    # Set icon
-    if os.path.exists(APP_ICON_PATH):
-        try:
-            media_win.after(250, lambda: media_win.iconbitmap(APP_ICON_PATH))
-        except Exception as e:
-            print(f"Could not set icon for media window: {e}")
-    # Make it transient and grab set to stay on top
-    media_win.transient(master)
-    media_win.grab_set()
-
-    label = ctk.CTkLabel(media_win, text="Media Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
-    label.pack(pady=10)
-
-    file_path_var = ctk.StringVar(value="")
-
-    audio_formats = ["mp3", "wav", "ogg", "flac", "aac", "m4a"]
-    video_formats = ["mp4", "avi", "mkv", "mov"]
-    media_filetypes = [("Media files", "*." + ";*.".join(audio_formats + video_formats))]
-
-    def select_file():
-        fp = filedialog.askopenfilename(title="Select Media File", filetypes=media_filetypes)
-        if fp:
-            input_ext = os.path.splitext(fp)[1].lower()[1:]
-            if input_ext in audio_formats:
-                combo.configure(values=[fmt.upper() for fmt in audio_formats])
-                target_var.set("MP3")
-            elif input_ext in video_formats:
-                video_values = [fmt.upper() for fmt in video_formats]
-                audio_values = [fmt.upper() + " (extract audio)" for fmt in audio_formats]
-                combo.configure(values=video_values + audio_values)
-                target_var.set("MP4")
-            else:
-                messagebox.showerror("Error", "Unsupported media format")
-                return
-            file_path_var.set(fp)
-            file_label.configure(text=os.path.basename(fp))
-
-    btn_select = ctk.CTkButton(media_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_select.pack(pady=5)
-
-    file_label = ctk.CTkLabel(media_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
-    file_label.pack(pady=5)
-
-    target_var = ctk.StringVar(value="")
-    combo = ctk.CTkComboBox(media_win, values=[], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
-    combo.pack(pady=5)
-
-    progress_bar = ctk.CTkProgressBar(media_win, width=250, mode="indeterminate")
-    # Initially not packed
-
-    if preselected_file:
-        input_ext = os.path.splitext(preselected_file)[1].lower()[1:]
-        if input_ext in audio_formats:
-            combo.configure(values=[fmt.upper() for fmt in audio_formats])
-            target_var.set("MP3")
-        elif input_ext in video_formats:
-            video_values = [fmt.upper() for fmt in video_formats]
-            audio_values = [fmt.upper() + " (extract audio)" for fmt in audio_formats]
-            combo.configure(values=video_values + audio_values)
-            target_var.set("MP4")
-        file_path_var.set(preselected_file)
-        file_label.configure(text=os.path.basename(preselected_file))
-
-    def do_convert():
-        fp = file_path_var.get()
-        if not fp:
-            messagebox.showerror("Error", "No file selected")
-            return
-        target = target_var.get()
-        input_ext = os.path.splitext(fp)[1].lower()[1:]
-        is_extract = "(extract audio)" in target
-        target_ext = target.split(" ")[0].lower()
-        if target_ext == input_ext:
-            messagebox.showwarning("Warning", "Input and output formats are the same")
-            return
-
-        def conversion_thread():
+    # Office jobs mostly wait on LibreOffice, so they run on threads in this
+    # process where they can share the warm soffice pool; everything else is
+    # CPU-bound Python and goes to worker processes.
+    # The same goes for Envelope parsing when it is enabled.
+    office_threads = 0
+    if any(get_category(fp) in OFFICE_CATEGORIES for fp, _ in jobs):
+        shared_pools = [get_office_pool()]
+        if get_setting('use_envelope'):
+            shared_pools.append(get_envelope_pool())
+        office_threads = max([pool.size for pool in shared_pools if pool is not None], default=0)
+    office_tasks = set()
+    if office_threads:
+        office_tasks = {n for n, (fp, _) in enumerate(tasks) if get_category(fp) in OFFICE_CATEGORIES}
+    process_count = len(tasks) - len(office_tasks)
+    process_workers = min(workers, process_count)
+    thread_workers = office_threads if office_tasks else 0
+    # files that start workers of their own (sheets, PDF pages) share the CPUs
+    saved_jobs_at_once, _batch_jobs_at_once = _batch_jobs_at_once, process_workers + thread_workers
+    process_pool = None
+    if process_count:
+        # hand over settings changed on the command line; spawned workers would otherwise reload them from disk
+        process_pool = ProcessPoolExecutor(max_workers=process_workers, initializer=_init_batch_worker,
+                                           initargs=(dict(SETTINGS), _batch_jobs_at_once))
+    thread_pool = ThreadPoolExecutor(max_workers=thread_workers) if office_tasks else None
+    try:
+        futures = {}
+        for n, (fp, indices) in enumerate(tasks):
+            executor = thread_pool if n in office_tasks else process_pool
+            futures[executor.submit(_batch_job, fp, [jobs[i][1] for i in indices])] = indices
+        for future in as_completed(futures):
+            indices = futures[future]
             try:
-                new_file_path = convert_media(fp, target)
-                media_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
+                task_results = future.result()
             except Exception as e:
-                media_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
-            finally:
-                media_win.after(0, progress_bar.stop)
-                media_win.after(0, progress_bar.pack_forget)
-                media_win.after(0, lambda: btn_convert.configure(state="normal"))
-
-        progress_bar.pack(pady=5)
-        progress_bar.start()
-        btn_convert.configure(state="disabled")
-        thread = threading.Thread(target=conversion_thread)
-        thread.start()
-
-    btn_convert = ctk.CTkButton(media_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
-    btn_convert.pack(pady=5)
-
-# Extend the app class with open methods
-class WormholeApp(WormholeApp):
-    def open_docs_window(self, preselected_file=None):
-        open_docs_window(self, preselected_file)
-
-    def open_presentations_window(self, preselected_file=None):
-        open_presentations_window(self, preselected_file)
-
-    def open_images_window(self, preselected_file=None):
-        open_images_window(self, preselected_file)
-
-    def open_archive_window(self, preselected_file=None):
-        open_archive_window(self, preselected_file)
+                # the worker process itself died (e.g. crashed inside a native library)
+                task_results = [{'input': jobs[i][0], 'target': jobs[i][1], 'status': 'failed', 'output': None,
+                                 'error': f"Worker failed: {e}", 'cached': False, 'seconds': 0.0}
+                                for i in indices]
+            collect(indices, task_results)
+    finally:
+        for executor in (process_pool, thread_pool):
+            if executor is not None:
+                executor.shutdown()
+        _batch_jobs_at_once = saved_jobs_at_once
+
+def print_batch_result(res):
+    if res['status'] == 'ok':
+        cached = ", cached" if res.get('cached') else ""
+        print(f"[ok]      {res['input']} -> {format_result(res['output'])} ({res['seconds']:.2f}s{cached})")
+    elif res['status'] == 'skipped':
+        print(f"[skipped] {res['input']} -> {res['target']}: {res['error']}")
+    else:
+        print(f"[failed]  {res['input']} -> {res['target']}: {res['error']}")
+
+def print_media_progress(file_path, progress):
+    """Keep one status line on stderr up to date while ffmpeg runs."""
+    line = f"{os.path.basename(file_path)}: {format_media_progress(progress)}"
+    sys.stderr.write("\r" + line.ljust(79))
+    if progress['done']:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def add_setting_arguments(parser):
+    """Options shared by `convert` and `batch` that override settings for one run."""
+    parser.add_argument("--office-workers", type=int, default=None, help="warm LibreOffice instances to keep (0 = one soffice launch per file)")
+    parser.add_argument("--envelope-workers", type=int, default=None, help="resident Node workers for Envelope (0 = one node launch per file)")
+    parser.add_argument("--archive-workers", type=int, default=None, help="threads compressing ZIP/TGZ/TBZ2 output (1 = single-threaded)")
+    parser.add_argument("--archive-level", type=int, default=None, choices=range(1, 10), metavar="1-9",
+                        help="compression level for archive output")
+    parser.add_argument("--pages", dest="pdf_pages", default=None, help="pages to convert from PDF input, e.g. 1-5,8,10-")
+    parser.add_argument("--pdf-workers", type=int, default=None, help="processes extracting text from large PDFs (0 = one per CPU)")
+    parser.add_argument("--sheets", default=None, help="sheets to convert from XLSX/ODS input, by name or 1-based position (default: all)")
+    parser.add_argument("--sheet-workers", type=int, default=None, help="processes exporting workbook sheets to CSV (0 = one per CPU)")
+    parser.add_argument("--csv-encoding", default=None, help="encoding of CSV input (default: detect)")
+    parser.add_argument("--csv-delimiter", default=None, help="delimiter of CSV input, e.g. ';' or tab (default: sniff)")
+    parser.add_argument("--no-infer-types", dest="csv_infer_types", action="store_false", default=None,
+                        help="keep CSV cells as text in XLSX/ODS output")
+    parser.add_argument("--resize", dest="image_resize", type=_resize_argument, default=None,
+                        help="scale images down to fit, e.g. 1920x1080, 800 (longest side) or 50%%")
+    parser.add_argument("--image-preset", default=None, choices=list(IMAGE_PRESETS),
+                        help="trade image encoding time for size (default: balanced)")
+    parser.add_argument("--ico-sizes", type=_ico_sizes_argument, default=None,
+                        help="comma separated layer sizes for ICO output, e.g. 16,32,48 (default: all)")
+    parser.add_argument("--media-profile", default=None, choices=MEDIA_PROFILES,
+                        help="encoder settings for re-encoded audio and video (default: balanced)")
+    parser.add_argument("--media-threads", type=int, default=None, help="threads per ffmpeg encoder (default: ffmpeg's choice)")
+    parser.add_argument("--segment-workers", dest="media_segment_workers", type=int, default=None,
+                        help="transcode long videos in this many parallel segments (0 = one per CPU, 1 = off)")
+    parser.add_argument("--no-audio-batch", dest="media_batch_audio", action="store_false", default=None,
+                        help="start one ffmpeg per audio clip instead of converting short clips several to a run")
+    parser.add_argument("--no-stream-copy", dest="media_stream_copy", action="store_false", default=None,
+                        help="re-encode all media streams even when the target container could take them as they are")
+    parser.add_argument("--no-cache", action="store_true", help="always convert, ignoring and not updating the result cache")
+
+def _ico_sizes_argument(value):
+    try:
+        sizes = [int(s) for s in value.split(',') if s.strip()]
+    except ValueError:
+        sizes = []
+    if not sizes or any(s < 1 or s > 256 for s in sizes):
+        raise argparse.ArgumentTypeError(f"invalid ICO sizes {value!r}; use sizes from 1 to 256, e.g. 16,32,48")
+    return sizes
+
+def _resize_argument(value):
+    try:
+        image_target_size((1, 1), value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r}; use WxH, a longest side or a percentage")
+    return value
+
+def apply_setting_arguments(args):
+    for key in ('office_workers', 'envelope_workers', 'archive_workers', 'archive_level', 'pdf_pages', 'pdf_workers',
+                'sheets', 'sheet_workers', 'csv_encoding', 'csv_delimiter', 'csv_infer_types', 'image_resize', 'ico_sizes', 'image_preset', 'media_stream_copy', 'media_profile', 'media_threads', 'media_segment_workers', 'media_batch_audio'):
+        if getattr(args, key) is not None:
+            SETTINGS[key] = getattr(args, key)
+    if args.no_cache:
+        SETTINGS['use_cache'] = False
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="wormhole batch", description="Convert many files at once.")
+    parser.add_argument("inputs", nargs="*", help="files or glob patterns (use ** for recursive matches)")
+    parser.add_argument("-t", "--to", dest="target", help="target format(s), e.g. PNG, PNG,WEBP,AVIF or \"MP3 (extract audio)\"")
+    parser.add_argument("-m", "--manifest", help="text file with one input per line (optionally path<TAB>TARGET[,TARGET...])")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    add_setting_arguments(parser)
+    args = parser.parse_args(argv)
+    apply_setting_arguments(args)
+    if not args.inputs and not args.manifest:
+        parser.error("no inputs given")
 
-    def open_spreadsheets_window(self, preselected_file=None):
-        open_spreadsheets_window(self, preselected_file)
+    try:
+        jobs = expand_batch_inputs(args.inputs, args.target, args.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    on_progress = print_media_progress if sys.stderr.isatty() else None
+    results = batch_convert(jobs, args.workers, on_result=print_batch_result, on_progress=on_progress)
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r['status'] == 'ok')
+    skipped = sum(1 for r in results if r['status'] == 'skipped')
+    failed = len(results) - ok - skipped
+    cached = sum(1 for r in results if r.get('cached'))
+    print(f"{len(results)} conversions in {elapsed:.2f}s: {ok} converted ({cached} from cache), {skipped} skipped, {failed} failed")
+    return 1 if failed else 0
+
+
+def convert_main(argv):
+    parser = argparse.ArgumentParser(prog="wormhole convert", description="Convert files without starting the GUI.")
+    parser.add_argument("inputs", nargs="+", help="files to convert")
+    parser.add_argument("-t", "--to", dest="target", required=True,
+                        help="target format(s), e.g. PNG or \"MP3 (extract audio)\"; a comma separated list converts each input once to all of them")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="worker processes when converting several files")
+    add_setting_arguments(parser)
+    args = parser.parse_args(argv)
+    apply_setting_arguments(args)
+    targets = parse_targets(args.target)
+    if not targets:
+        parser.error("no target format given")
+    jobs = [(fp, target) for fp in args.inputs for target in targets]
+    on_progress = print_media_progress if sys.stderr.isatty() else None
+    results = batch_convert(jobs, args.workers, on_result=print_batch_result, on_progress=on_progress)
+    return 1 if any(r['status'] == 'failed' for r in results) else 0
+
+def cache_main(argv):
+    parser = argparse.ArgumentParser(prog="wormhole cache", description="Inspect or empty the conversion result cache.")
+    parser.add_argument("action", choices=["stats", "clear"])
+    args = parser.parse_args(argv)
+    if args.action == "clear":
+        cache_clear()
+        print(f"Cleared {CACHE_DIR}")
+        return 0
+    stats = cache_stats()
+    lookups = stats.get('hits', 0) + stats.get('misses', 0)
+    hit_rate = f"{stats.get('hits', 0) / lookups:.0%}" if lookups else "n/a"
+    print(f"Cache: {CACHE_DIR}")
+    print(f"  entries:   {stats['entries']} ({stats['size'] / (1024 * 1024):.1f} MB of {get_setting('cache_max_mb')} MB)")
+    print(f"  hits:      {stats.get('hits', 0)}")
+    print(f"  misses:    {stats.get('misses', 0)} (hit rate {hit_rate})")
+    print(f"  envelope:  {stats['intermediates']} parsed documents, "
+          f"{stats.get('envelope_hits', 0)} hits, {stats.get('envelope_misses', 0)} misses")
+    print(f"  evictions: {stats.get('evictions', 0)}")
+    print(f"  enabled:   {'yes' if get_setting('use_cache') else 'no'}")
+    return 0
+
+# ---------- benchmarks ----------
+
+# `wormhole convert` should reach argument parsing within this many seconds
+HEADLESS_STARTUP_TARGET = 0.5
+GUI_MODULES = ('tkinter', 'customtkinter', 'darkdetect')
+
+def _headless_cmd(*args):
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, *args]
+    return [sys.executable, os.path.abspath(__file__), *args]
+
+def bench_startup(runs=5, target=HEADLESS_STARTUP_TARGET):
+    """Time how long a headless command takes to start and check that it
+    never imports any GUI module."""
+    cmd = _headless_cmd('convert', '--help')
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    median = timings[len(timings) // 2]
+    print(f"headless startup: min {timings[0] * 1000:.0f} ms, median {median * 1000:.0f} ms (target {target * 1000:.0f} ms)")
+
+    passed = median <= target
+    if not getattr(sys, 'frozen', False):
+        result = subprocess.run([sys.executable, '-X', 'importtime', *cmd[1:]], capture_output=True, text=True)
+        imported = {line.rsplit('|', 1)[-1].strip().split('.')[0] for line in result.stderr.splitlines() if '|' in line}
+        gui_loaded = sorted(imported.intersection(GUI_MODULES))
+        print(f"GUI modules imported: {', '.join(gui_loaded) if gui_loaded else 'none'}")
+        passed = passed and not gui_loaded
+    return 0 if passed else 1
+
+def import_cost(modules):
+    """Import `modules` in a fresh interpreter under `-X importtime` and return
+    (total_seconds, {package: seconds}, missing_modules)."""
+    code = ("import importlib, sys\n"
+            "sys.stderr.write('-- wormhole bench --\\n')\n"
+            "for m in sys.argv[1:]:\n"
+            "    try:\n"
+            "        importlib.import_module(m)\n"
+            "    except ImportError:\n"
+            "        print('missing:' + m)\n")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code, *modules],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    # skip the interpreter's own startup imports, which happen before the marker
+    stderr = result.stderr.split('-- wormhole bench --', 1)[-1]
+    costs = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        # nested imports are indented; only count top-level ones so nothing is counted twice
+        if name.startswith('  '):
+            continue
+        package = name.strip().split('.')[0]
+        costs[package] = costs.get(package, 0) + int(parts[1]) / 1e6
+    missing = [line[len('missing:'):] for line in result.stdout.splitlines() if line.startswith('missing:')]
+    return sum(costs.values()), costs, missing
+
+def bench_imports():
+    """Report what the headless core and each converter category cost to import."""
+    if getattr(sys, 'frozen', False):
+        print("Import benchmark needs a Python interpreter (not available in the frozen build)")
+        return 1
+    rows = [('core', ['wormhole'])] + list(CATEGORY_IMPORTS.items())
+    for name, modules in rows:
+        if not modules:
+            print(f"{name:<14} {0:>7.0f} ms  (no converter libraries)")
+            continue
+        total, costs, missing = import_cost(modules)
+        heaviest = sorted(costs.items(), key=lambda kv: kv[1], reverse=True)[:4]
+        detail = ", ".join(f"{mod} {sec * 1000:.0f}" for mod, sec in heaviest)
+        if missing:
+            detail += f"; missing: {', '.join(missing)}"
+        print(f"{name:<14} {total * 1000:>7.0f} ms  ({detail})")
+    return 0
+
+def _bench_csv_file(path, rows):
+    import random
+    rng = random.Random(42)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'price', 'active', 'day', 'stamp', 'zip'])
+        for i in range(rows):
+            writer.writerow([i, f"item {rng.randrange(1000)}", f"{rng.random() * 100:.2f}", rng.choice(['true', 'false']),
+                             f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                             f"2024-01-01 {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00", f"{rng.randrange(100000):05d}"])
+
+def bench_csv(rows=200000, path=None):
+    """Time reading a CSV file with and without type inference, and writing
+    it to XLSX and ODS with types."""
+    temp_dir = tempfile.mkdtemp(prefix="wormhole_bench_")
+    try:
+        if path is None:
+            path = os.path.join(temp_dir, "bench.csv")
+            _bench_csv_file(path, rows)
+        size = os.path.getsize(path) / (1024 * 1024)
+        print(f"{path}: {size:.1f} MB")
+
+        start = time.perf_counter()
+        count = sum(1 for _ in spreadsheet_rows(path))
+        plain = time.perf_counter() - start
+        print(f"read as text:      {plain:6.2f}s  ({count / plain:,.0f} rows/s)")
+
+        start = time.perf_counter()
+        sample = [row for _, row in zip(range(get_setting('csv_infer_rows')), spreadsheet_rows(path))]
+        header = sample[0] if sample else []
+        parsers = infer_csv_column_types(sample[1:])
+        inference = time.perf_counter() - start
+        types = [p.__name__.replace('_csv_parse_', '') if p else 'text' for p in parsers]
+        print(f"inferred types:    {', '.join(f'{h}={t}' for h, t in zip(header, types))} ({inference * 1000:.1f} ms)")
+
+        start = time.perf_counter()
+        sum(1 for _ in typed_csv_rows(spreadsheet_rows(path)))
+        typed = time.perf_counter() - start
+        print(f"read with types:   {typed:6.2f}s  ({count / typed:,.0f} rows/s, "
+              f"inference and conversion {max(typed - plain, 0) / typed:.0%} of it)")
+
+        for target in ("XLSX", "ODS"):
+            out = os.path.join(temp_dir, "bench." + target.lower())
+            start = time.perf_counter()
+            write_spreadsheet_rows(typed_csv_rows(spreadsheet_rows(path)), out, target)
+            elapsed = time.perf_counter() - start
+            print(f"write {target:<4} typed: {elapsed:6.2f}s  ({count / elapsed:,.0f} rows/s)")
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 0
+
+def _bench_image():
+    from PIL import Image, ImageFilter
+    # smooth areas, edges and some sensor-like noise, roughly like a photo
+    base = Image.effect_mandelbrot((1600, 1200), (-2.0, -1.2, 1.0, 1.2), 64)
+    noise = Image.effect_noise((1600, 1200), 24).filter(ImageFilter.GaussianBlur(1))
+    return Image.merge('RGB', (base, Image.blend(base, noise, 0.3), noise.point(lambda v: 255 - v)))
+
+def bench_images(path=None, targets=None):
+    """Encode one image with every preset and report time and size. Presets
+    that write a format the same way as "balanced" are left out."""
+    import io
+    from PIL import Image
+    if path:
+        img = Image.open(path)
+        img.load()
+    else:
+        img = _bench_image()
+    print(f"{path or 'generated test image'}: {img.width}x{img.height} {img.mode}")
+    print(f"{'target':<7}{'preset':<10}{'seconds':>9}{'bytes':>12}{'vs balanced':>13}")
+    for target in targets or ["JPG", "PNG", "WEBP", "AVIF"]:
+        frame = img.convert('RGB') if target == "JPG" and img.mode not in ('RGB', 'L') else img
+        sizes = {}
+        for preset in IMAGE_PRESETS:
+            if preset != 'balanced' and target not in IMAGE_PRESETS[preset]:
+                # the preset writes this format with Pillow's defaults, like "balanced"
+                continue
+            buffer = io.BytesIO()
+            start = time.perf_counter()
+            frame.save(buffer, "JPEG" if target == "JPG" else target, **image_save_options(target, preset))
+            elapsed = time.perf_counter() - start
+            sizes[preset] = (elapsed, buffer.tell())
+        for preset, (elapsed, size) in sizes.items():
+            ratio = size / sizes['balanced'][1]
+            print(f"{target:<7}{preset:<10}{elapsed:>9.3f}{size:>12,}{ratio:>12.0%}")
+    return 0
+
+def bench_media(path=None, target="MP4", profiles=None, seconds=10):
+    """Transcode a sample clip with each media profile and report encode
+    speed and output size. Without `path` a test clip is generated."""
+    if not has_ffmpeg:
+        print("ffmpeg not found in PATH.")
+        return 1
+    temp_dir = tempfile.mkdtemp(prefix="wormhole_bench_")
+    saved = {key: SETTINGS.get(key) for key in ('media_profile', 'media_stream_copy')}
+    try:
+        if path:
+            # outputs are written next to the input, so work on a copy
+            sample = os.path.join(temp_dir, "sample" + os.path.splitext(path)[1])
+            shutil.copyfile(path, sample)
+        else:
+            audio_only = target.upper() in formats['media_audio']['targets']
+            sample = os.path.join(temp_dir, "sample" + (".wav" if audio_only else ".mkv"))
+            cmd = ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', f'sine=frequency=440:duration={seconds}']
+            if not audio_only:
+                cmd += ['-f', 'lavfi', '-i', f'testsrc2=size=1280x720:rate=30:duration={seconds}', '-c:v', 'ffv1']
+            subprocess.run(cmd + [sample], check=True)
+        print(f"{path or 'generated test clip'} -> {target}")
+        print(f"{'profile':<10}{'seconds':>9}{'fps':>8}{'speed':>8}{'bytes':>14}")
+        # always encode, even when the sample could simply be remuxed
+        SETTINGS['media_stream_copy'] = False
+        for profile in profiles or MEDIA_PROFILES:
+            SETTINGS['media_profile'] = profile
+            last = {}
+            start = time.perf_counter()
+            output = convert_media(sample, target, progress_cb=last.update)
+            elapsed = time.perf_counter() - start
+            fps = f"{last['fps']:.0f}" if last.get('fps') else "-"
+            speed = f"{last['speed']:.2f}x" if last.get('speed') else "-"
+            print(f"{profile:<10}{elapsed:>9.2f}{fps:>8}{speed:>8}{os.path.getsize(output):>14,}")
+            os.remove(output)
+    finally:
+        SETTINGS.update(saved)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 0
 
-    def open_3d_window(self, preselected_file=None):
-        open_3d_window(self, preselected_file)
+def bench_audio(clips=2000, seconds=1.0, target="MP3", workers=None):
+    """Convert a folder of short generated clips with one ffmpeg per clip and
+    with clips batched into shared ffmpeg runs, and compare the throughput."""
+    if not has_ffmpeg:
+        print("ffmpeg not found in PATH.")
+        return 1
+    if workers is None:
+        workers = get_setting('batch_workers') or os.cpu_count() or 1
+    temp_dir = tempfile.mkdtemp(prefix="wormhole_bench_")
+    saved = {key: SETTINGS.get(key) for key in ('media_batch_audio', 'use_cache')}
+    try:
+        # one long tone cut into clips, so making them costs a single ffmpeg run
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi',
+                        '-i', f'sine=frequency=440:duration={clips * seconds}', '-f', 'segment',
+                        '-segment_time', str(seconds), os.path.join(temp_dir, 'clip%05d.wav')], check=True)
+        jobs = [(path, target) for path in sorted(glob.glob(os.path.join(temp_dir, 'clip*.wav')))]
+        print(f"{len(jobs)} clips of {seconds:g}s WAV -> {target}, {workers} workers")
+        print(f"{'mode':<10}{'seconds':>9}{'clips/s':>9}{'failed':>8}")
+        SETTINGS['use_cache'] = False
+        for mode, batched in (("per file", False), ("batched", True)):
+            SETTINGS['media_batch_audio'] = batched
+            start = time.perf_counter()
+            results = batch_convert(jobs, workers)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for r in results if r['status'] != 'ok')
+            print(f"{mode:<10}{elapsed:>9.2f}{len(jobs) / elapsed:>9.1f}{failed:>8}")
+            for r in results:
+                if r['output']:
+                    for path in _result_paths(r['output']):
+                        os.remove(path)
+    finally:
+        SETTINGS.update(saved)
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    return 0
+
+def bench_main(argv):
+    parser = argparse.ArgumentParser(prog="wormhole bench", description="Measure conversion performance.")
+    sub = parser.add_subparsers(dest="kind", required=True)
+    p_startup = sub.add_parser("startup", help="headless startup time")
+    p_startup.add_argument("--runs", type=int, default=5)
+    p_startup.add_argument("--target", type=float, default=HEADLESS_STARTUP_TARGET, help="target median in seconds")
+    sub.add_parser("imports", help="import cost of the core and of each converter category")
+    p_csv = sub.add_parser("csv", help="CSV reading, type inference and typed XLSX/ODS output")
+    p_csv.add_argument("--rows", type=int, default=200000, help="rows in the generated test file")
+    p_csv.add_argument("--file", default=None, help="benchmark this CSV file instead of a generated one")
+    p_images = sub.add_parser("images", help="encoding time and size of each image preset")
+    p_images.add_argument("--file", default=None, help="benchmark this image instead of a generated one")
+    p_images.add_argument("--to", dest="targets", default=None, help="targets to encode, e.g. JPG,WEBP (default: JPG,PNG,WEBP,AVIF)")
+    p_media = sub.add_parser("media", help="encode time, fps and size of each media profile")
+    p_media.add_argument("--file", default=None, help="sample clip to transcode (default: a generated 720p test clip)")
+    p_media.add_argument("--to", dest="target", default="MP4", help="target format (default: MP4)")
+    p_media.add_argument("--profiles", default=None, help="comma separated profiles to run (default: all)")
+    p_media.add_argument("--seconds", type=int, default=10, help="length of the generated clip")
+    p_media.add_argument("--media-threads", type=int, default=None, help="threads per ffmpeg encoder")
+    p_audio = sub.add_parser("audio", help="one ffmpeg per clip vs. batched runs on many short audio clips")
+    p_audio.add_argument("--clips", type=int, default=2000, help="number of generated clips")
+    p_audio.add_argument("--seconds", type=float, default=1.0, help="length of each clip")
+    p_audio.add_argument("--to", dest="target", default="MP3", help="target format (default: MP3)")
+    p_audio.add_argument("-w", "--workers", type=int, default=None, help="batch workers (default: one per CPU)")
+    args = parser.parse_args(argv)
+    if args.kind == "startup":
+        return bench_startup(args.runs, args.target)
+    elif args.kind == "imports":
+        return bench_imports()
+    elif args.kind == "csv":
+        return bench_csv(args.rows, args.file)
+    elif args.kind == "images":
+        return bench_images(args.file, parse_targets(args.targets) or None)
+    elif args.kind == "media":
+        if args.media_threads is not None:
+            SETTINGS['media_threads'] = args.media_threads
+        profiles = [p.strip() for p in args.profiles.split(',')] if args.profiles else None
+        if profiles and any(p not in MEDIA_PROFILES for p in profiles):
+            parser.error(f"profiles must be among {', '.join(MEDIA_PROFILES)}")
+        return bench_media(args.file, args.target.upper(), profiles, args.seconds)
+    elif args.kind == "audio":
+        return bench_audio(args.clips, args.seconds, args.target.upper(), args.workers)
+    return 0
+
+# ---------- entry point ----------
+
+def launch_gui():
+    """Start the customtkinter GUI. It lives in its own module so that the
+    headless commands never import tkinter or load themes, fonts and images."""
+    # wormhole_gui imports this module by name; when running as a script, point
+    # that name at the running module so both share a single SETTINGS dict
+    sys.modules.setdefault('wormhole', sys.modules[__name__])
+    import wormhole_gui
+    return wormhole_gui.run(sys.argv[1:])
+
+HEADLESS_COMMANDS = {
+    "convert": convert_main,
+    "batch": batch_main,
+    "bench": bench_main,
+    "cache": cache_main,
+}
 
-    def open_media_window(self, preselected_file=None):
-        open_media_window(self, preselected_file)
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        if argv[0] in HEADLESS_COMMANDS:
+            try:
+                return HEADLESS_COMMANDS[argv[0]](argv[1:])
+            except KeyboardInterrupt:
+                # running ffmpeg conversions have already removed their partial outputs
+                print("\nCancelled", file=sys.stderr)
+                return 130
+        elif len(argv) == 2 and argv[0] not in ("--register", "--unregister"):
+            # context menu entry: wormhole "<file>" "<target>"
+            silent_convert(argv[0], argv[1])
+            return 0
+    return launch_gui()
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--register":
-            app = WormholeApp()  # Init to access methods
-            app.register_context_menu()
-            sys.exit(0)
-        elif sys.argv[1] == "--unregister":
-            app = WormholeApp()
-            app.unregister_context_menu()
-            sys.exit(0)
-        elif len(sys.argv) == 3:
-            silent_convert(sys.argv[1], sys.argv[2])
-            sys.exit(0)
-    app = WormholeApp()
-    app.mainloop()
\ No newline at end of file
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,1127 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import webbrowser
+import customtkinter as ctk
+from tkinter import filedialog, messagebox
+from PIL import Image
+import darkdetect
+import requests
+import wormhole
+from wormhole import (
+    SETTINGS, save_settings, resource_path, formats, get_category, get_archive_type,
+    ENVELOPE_SUPPORT, ENVELOPE_JS_SUPPORT, TRIMESH_SUPPORT, VERSION, GITHUB_URL, ICO_SIZES, IMAGE_PRESETS,
+    convert_docs, convert_presentations, convert_images, convert_archive,
+    convert_spreadsheets, convert_3d, format_result, convert_media, format_media_progress, ConversionCancelled,
+)
+
+# Everything in this module is GUI-only; wormhole.py imports it lazily so that
+# headless conversions never pay for tkinter, theme detection or font loading.
+
+SYSTEM_THEME = darkdetect.theme()
+
+if (SYSTEM_THEME == "Light"):
+    BG = "#f7f8ff"
+    CARD = "#ffffff"
+    CARD_HOVER = "#e7e9f5"
+    ACCENT = "#3a63d9"
+    ACCENT_DIM = "#2a4ba8"
+    TEXT = "#1a1b25"
+else:
+    BG = "#0a0812"
+    CARD = "#120f1e"
+    CARD_HOVER = "#19172b"
+    ACCENT = "#7aa3ff"
+    ACCENT_DIM = "#4d6bbc"
+    TEXT = "#e8e6f5"
+if (SYSTEM_THEME == "Light"):
+    WORMHOLE_IMAGE_PATH = resource_path(os.path.join("Icons", "wormhole_Transparent.png"))
+    ABOUT_IMAGE1_PATH = resource_path(os.path.join("Icons", "Nova_foundry_wide_transparent_dark.png"))
+    ABOUT_IMAGE2_PATH = resource_path(os.path.join("Icons", "p2r3.png"))
+else:
+    WORMHOLE_IMAGE_PATH = resource_path(os.path.join("Icons", "wormhole_Transparent_Light.png"))
+    ABOUT_IMAGE1_PATH = resource_path(os.path.join("Icons", "Nova_foundry_wide_transparent.png"))
+    ABOUT_IMAGE2_PATH = resource_path(os.path.join("Icons", "p2r3.png"))
+try:
+    WORMHOLE_PIL_IMAGE = Image.open(WORMHOLE_IMAGE_PATH)
+except Exception as e:
+    print(f"Could not load wormhole image: {e}")
+    WORMHOLE_PIL_IMAGE = Image.new("RGBA", (100, 100), (100, 100, 100, 255))
+
+APP_ICON_PATH = resource_path(os.path.join("Icons", "Wormhole_Icon.ico"))
+
+FONTS_DIR = resource_path("fonts")
+FONT_FAMILY_REGULAR = "Pathway Extreme 36pt Regular"
+FONT_FAMILY_SEMIBOLD = "Pathway Extreme 36pt SemiBold"
+FONT_FAMILY_ITALIC = "Pathway Extreme 36pt Italic"
+FONT_FAMILY_THIN = "Pathway Extreme 36pt Thin"
+FONT_FAMILY_BLACK = "Pathway Extreme 36pt Black"
+FONT_FILES = [
+    "PathwayExtreme_36pt-Black.ttf",
+    "PathwayExtreme_36pt-Italic.ttf",
+    "PathwayExtreme_36pt-Regular.ttf",
+    "PathwayExtreme_36pt-SemiBold.ttf",
+    "PathwayExtreme_36pt-Thin.ttf"
+]
+
+# Set up customtkinter
+if (SYSTEM_THEME == "Light"):
+    ctk.set_appearance_mode("light")
+    ctk.set_default_color_theme("blue")
+else:
+    ctk.set_appearance_mode("dark")
+    ctk.set_default_color_theme("dark-blue")
+
+# Load custom fonts
+for font_file in FONT_FILES:
+    font_path = os.path.join(FONTS_DIR, font_file)
+    if os.path.exists(font_path):
+        ctk.FontManager.load_font(font_path)
+    else:
+        print(f"Custom font file not found: {font_path}; falling back to default for this variant.")
+class WormholeApp(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        self.title("Wormhole File Converter")
+        self.configure(fg_color=BG)
+        # Center the main window
+        self.update_idletasks()
+        screen_width = self.winfo_screenwidth()
+        screen_height = self.winfo_screenheight()
+        x = (screen_width // 2) - (400 // 2)
+        y = (screen_height // 2) - (700 // 2) - 30
+        self.geometry(f"400x700+{x}+{y}")
+        self._build_ui()
+        self.check_for_updates()
+        if sys.platform.startswith('win'):
+            pass  # Registration moved to --register
+        if len(sys.argv) > 1:
+            file = sys.argv[1]
+            if os.path.isfile(file):
+                cat = get_category(file)
+                if cat:
+                    open_func = getattr(self, f'open_{cat}_window')
+                    open_func(preselected_file=file)
+
+    def register_context_menu(self):
+        try:
+            import winreg
+            if hasattr(sys, '_MEIPASS'):
+                # Bundled mode
+                exe_path = sys.executable
+            else:
+                # Script mode
+                exe_path = f'"{sys.executable}" "{os.path.abspath(wormhole.__file__)}"'
+            icon_path = sys.executable if hasattr(sys, '_MEIPASS') else APP_ICON_PATH
+            for cat, info in formats.items():
+                for ext in info['extensions']:
+                    main_key_path = rf"Software\Classes\SystemFileAssociations\{ext}\shell\WormholeConvert"
+                    key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, main_key_path, 0, winreg.KEY_SET_VALUE)
+                    winreg.SetValueEx(key, "MUIVerb", 0, winreg.REG_SZ, "Convert with Wormhole")
+                    winreg.SetValueEx(key, "Icon", 0, winreg.REG_SZ, icon_path)
+                    winreg.SetValueEx(key, "SubCommands", 0, winreg.REG_SZ, "")
+                    # Create the shell subkey under main
+                    shell_key_path = main_key_path + r"\shell"
+                    winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, shell_key_path, 0, winreg.KEY_SET_VALUE)
+                    for i, tgt in enumerate(sorted(info['targets'])):  # Sort for consistent order
+                        clean_tgt = tgt.replace(' ', '')
+                        sub_key_name = f"{i:02d}_{clean_tgt}"  # Prefix for ordering
+                        sub_key_path = shell_key_path + rf"\{sub_key_name}"
+                        sub_key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, sub_key_path, 0, winreg.KEY_SET_VALUE)
+                        winreg.SetValueEx(sub_key, None, 0, winreg.REG_SZ, f"To {tgt}")
+                        winreg.CloseKey(sub_key)
+                        cmd_key_path = sub_key_path + r"\command"
+                        cmd_key = winreg.CreateKeyEx(winreg.HKEY_CURRENT_USER, cmd_key_path, 0, winreg.KEY_SET_VALUE)
+                        winreg.SetValueEx(cmd_key, None, 0, winreg.REG_SZ, f'{exe_path} "%1" "{tgt}"')
+                        winreg.CloseKey(cmd_key)
+                    winreg.CloseKey(key)
+        except Exception as e:
+            print(f"Failed to register context menu: {e}")
+
+    def unregister_context_menu(self):
+        try:
+            import winreg
+            for cat, info in formats.items():
+                for ext in info['extensions']:
+                    main_key_path = rf"Software\Classes\SystemFileAssociations\{ext}\shell\WormholeConvert"
+                    self._delete_registry_key(winreg.HKEY_CURRENT_USER, main_key_path)
+                    # Also clean up old flat structure if exists
+                    for tgt in info['targets']:
+                        clean_tgt = tgt.replace(' ', '')
+                        old_sub_key_path = rf"Software\Classes\SystemFileAssociations\{ext}\shell\To{clean_tgt}"
+                        self._delete_registry_key(winreg.HKEY_CURRENT_USER, old_sub_key_path)
+        except Exception as e:
+            print(f"Failed to unregister context menu: {e}")
+
+    def _delete_registry_key(self, root, key_path):
+        import winreg
+        try:
+            key = winreg.OpenKey(root, key_path, 0, winreg.KEY_ALL_ACCESS)
+            num_subkeys, _, _ = winreg.QueryInfoKey(key)
+            for i in range(num_subkeys):
+                subkey_name = winreg.EnumKey(key, 0)
+                self._delete_registry_key(root, key_path + "\\" + subkey_name)
+            winreg.CloseKey(key)
+            winreg.DeleteKey(root, key_path)
+        except FileNotFoundError:
+            pass  # Key already gone
+
+    def _build_ui(self):
+        if os.path.exists(APP_ICON_PATH):
+            try:
+                if sys.platform.startswith('win'):
+                    import ctypes
+                    ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID("wormhole.file.converter")
+                self.iconbitmap(APP_ICON_PATH)
+            except Exception as e:
+                print(f"Could not set application icon: {e}")
+                
+        # Custom label for instructions
+        image = ctk.CTkImage(light_image=WORMHOLE_PIL_IMAGE, dark_image=WORMHOLE_PIL_IMAGE, size=(306, 204))
+        img_label = ctk.CTkLabel(self, image=image, text="", fg_color=BG)
+        img_label.pack(pady=10)
+
+        label = ctk.CTkLabel(self, text="Select a file type category:", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+        label.pack(pady=20)
+
+        # Buttons for each category (using semibold for buttons if desired; otherwise keep normal)
+        docs_text = "Docs 📨" if (ENVELOPE_SUPPORT or (ENVELOPE_JS_SUPPORT and SETTINGS.get('use_envelope'))) else "Docs"
+        btn_docs = ctk.CTkButton(self, text=docs_text, command=self.open_docs_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_docs.pack(pady=5)
+
+        presentations_text = "Presentations 📨" if (ENVELOPE_SUPPORT or (ENVELOPE_JS_SUPPORT and SETTINGS.get('use_envelope'))) else "Presentations"
+        btn_presentations = ctk.CTkButton(self, text=presentations_text, command=self.open_presentations_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_presentations.pack(pady=5)
+
+        btn_images = ctk.CTkButton(self, text="Images", command=self.open_images_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_images.pack(pady=5)
+
+        btn_archive = ctk.CTkButton(self, text="Archive", command=self.open_archive_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_archive.pack(pady=5)
+
+        spreadsheets_text = "Spreadsheets 📨" if (ENVELOPE_SUPPORT or (ENVELOPE_JS_SUPPORT and SETTINGS.get('use_envelope'))) else "Spreadsheets"
+        btn_spreadsheets = ctk.CTkButton(self, text=spreadsheets_text, command=self.open_spreadsheets_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_spreadsheets.pack(pady=5)
+
+        btn_3d = ctk.CTkButton(self, text="3D Models", command=self.open_3d_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_3d.pack(pady=5)
+
+        btn_media = ctk.CTkButton(self, text="Media", command=self.open_media_window, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=300, font=(FONT_FAMILY_SEMIBOLD, 20))
+        btn_media.pack(pady=5)
+
+        btn_about = ctk.CTkButton(self, text="About", command=self.open_about, fg_color='#888', text_color=BG, hover_color='#666', corner_radius=20, width=100, font=(FONT_FAMILY_SEMIBOLD, 10))
+        btn_about.pack(pady=5)
+
+    def open_about(self):
+        about_win = ctk.CTkToplevel(self)
+        about_win.title("About Wormhole")
+        about_win.geometry("350x600")
+        about_win.configure(fg_color=BG)
+        # Center the window
+        about_win.update_idletasks()
+        screen_width = about_win.winfo_screenwidth()
+        screen_height = about_win.winfo_screenheight()
+        x = (screen_width // 2) - (350 // 2)
+        y = (screen_height // 2) - (600 // 2)
+        about_win.geometry(f"350x600+{x}+{y}")
+        # Set icon
+        if os.path.exists(APP_ICON_PATH):
+            try:
+                about_win.after(250, lambda: about_win.iconbitmap(APP_ICON_PATH))
+            except Exception as e:
+                print(f"Could not set icon for about window: {e}")
+        about_win.transient(self)
+        about_win.grab_set()
+
+        # Image 1
+        try:
+            img1 = Image.open(ABOUT_IMAGE1_PATH)
+            if img1.height > 100:
+                new_width = int(img1.width * (100 / img1.height))
+                img1 = img1.resize((new_width, 100), Image.Resampling.LANCZOS)
+            ctk_img1 = ctk.CTkImage(light_image=img1, dark_image=img1, size=(img1.width, img1.height))
+            label_img1 = ctk.CTkLabel(about_win, image=ctk_img1, text="")
+            label_img1.pack(pady=10)
+        except Exception as e:
+            print(f"Could not load about image 1: {e}")
+
+        # Image 2
+        try:
+            img2 = Image.open(ABOUT_IMAGE2_PATH)
+            if img2.height > 100:
+                new_width = int(img2.width * (100 / img2.height))
+                img2 = img2.resize((new_width, 100), Image.Resampling.LANCZOS)
+            ctk_img2 = ctk.CTkImage(light_image=img2, dark_image=img2, size=(img2.width, img2.height))
+            label_img2 = ctk.CTkLabel(about_win, image=ctk_img2, text="")
+            label_img2.pack(pady=10)
+        except Exception as e:
+            print(f"Could not load about image 2: {e}")
+
+        # version and credits merged into a single block
+        info_text = f"Version {VERSION}\n© Nova Foundry    Envelope © p2r3"
+        label_version = ctk.CTkLabel(about_win, text=info_text, fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 14), justify="center")
+        label_version.pack(pady=(0,5))
+
+        github_link = ctk.CTkLabel(about_win, text="Github Repo", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
+        github_link.pack()
+        github_link.bind("<Button-1>", lambda e: webbrowser.open_new(GITHUB_URL))
+
+        # envelope toggle (moved from settings popup)
+        var = ctk.BooleanVar(value=SETTINGS.get('use_envelope', False))
+        chk = ctk.CTkCheckBox(about_win, text="Enable Envelope JS conversions", variable=var)
+        chk.pack(pady=10)
+        def _on_toggle():
+            SETTINGS['use_envelope'] = var.get()
+            save_settings(SETTINGS)
+            messagebox.showinfo("Settings", "Preferences saved. Restart the app for changes to take effect.")
+        var.trace_add('write', lambda *args: _on_toggle())
+
+        links_frame = ctk.CTkFrame(about_win, fg_color=BG)
+        support_link = ctk.CTkLabel(links_frame, text="Support Nova Foundry", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
+        support_link.pack(side="left", padx=10)
+        official_link = ctk.CTkLabel(links_frame, text="Visit Official Website", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
+        official_link.pack(side="left", padx=10)
+        help_link = ctk.CTkLabel(links_frame, text="Help", font=(FONT_FAMILY_REGULAR, 10), text_color=ACCENT, fg_color=BG, cursor="hand2")
+        help_link.pack(side="left", padx=10)
+        links_frame.pack(pady=10)
+
+        def open_official_link(event):
+            webbrowser.open_new("https://novafoundry.ca")
+        def open_support_link(event):
+            webbrowser.open_new("https://novafoundry.ca/support")
+        def open_help_link(event):
+            webbrowser.open_new("https://github.com/DirectedHunt42/Wormhole/wiki")
+        support_link.bind("<Button-1>", open_support_link)
+        official_link.bind("<Button-1>", open_official_link)
+        help_link.bind("<Button-1>", open_help_link)
+
+        # License (always show box; catch any errors so UI doesn't abort)
+        try:
+            # always resolve path relative to the executable's folder
+            exe_dir = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(__file__)
+            license_path = os.path.join(exe_dir, "LICENSE.txt")
+            print(f"[DEBUG] about dialog looking for license at {license_path}")
+            if os.path.exists(license_path):
+                try:
+                    with open(license_path, 'r', encoding='utf-8-sig') as f:
+                        license_text = f.read().strip()
+                except PermissionError as pe:
+                    # copy-out workaround
+                    tmp = tempfile.NamedTemporaryFile(delete=False, suffix='.txt')
+                    tmp.close()
+                    try:
+                        shutil.copy2(license_path, tmp.name)
+                        with open(tmp.name, 'r', encoding='utf-8-sig') as f2:
+                            license_text = f2.read().strip()
+                    finally:
+                        try:
+                            os.unlink(tmp.name)
+                        except Exception:
+                            pass
+            else:
+                license_text = "LICENSE.txt not found."
+        except Exception as e:
+            license_text = f"Error loading license: {e}"
+            print(f"[ERROR] could not load license text: {e}")
+            try:
+                messagebox.showwarning("About", f"Failed to load LICENSE.txt:\n{e}")
+            except Exception:
+                pass
+        try:
+            textbox = ctk.CTkTextbox(about_win, width=300, height=200)
+            textbox.insert("0.0", license_text)
+            textbox.configure(state="disabled")
+            textbox.pack(pady=10)
+        except Exception as e:
+            print(f"[ERROR] failed to create license textbox: {e}")
+            try:
+                messagebox.showwarning("About", f"Could not display license text box:\n{e}")
+            except Exception:
+                pass
+            # fallback: show error label instead
+            label_err = ctk.CTkLabel(about_win, text=f"License box error: {e}", fg_color=BG, text_color=TEXT)
+            label_err.pack(pady=10)
+
+    def check_for_updates(self):
+        try:
+            response = requests.get("https://api.github.com/repos/DirectedHunt42/Wormhole/releases/latest")
+            if response.status_code == 200:
+                data = response.json()
+                latest_version = data['tag_name']
+                if self.is_newer_version(latest_version, VERSION):
+                    if messagebox.askyesno("Update Available", f"A new version {latest_version} is available. Do you want to download and install it?"):
+                        self.download_and_install_update(data)
+        except Exception:
+            pass  # Fail silently if no internet or other issues
+
+    def is_newer_version(self, latest, current):
+        def parse(v):
+            return tuple(int(x) for x in v.lstrip('v').split('.'))
+        return parse(latest) > parse(current)
+
+    def download_and_install_update(self, data):
+        for asset in data['assets']:
+            if asset['name'] == 'Wormhole_setup.exe':
+                url = asset['browser_download_url']
+                try:
+                    response = requests.get(url, stream=True)
+                    if response.status_code == 200:
+                        with tempfile.NamedTemporaryFile(delete=False, suffix='.exe') as tmp:
+                            for chunk in response.iter_content(chunk_size=1024):
+                                tmp.write(chunk)
+                            tmp_path = tmp.name
+                        os.startfile(tmp_path)
+                        sys.exit(0)
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to download or run update: {str(e)}")
+                return
+        messagebox.showerror("Error", "Wormhole_setup.exe not found in the latest release.")
+
+# Functions to open subwindows for each category
+
+def open_docs_window(master, preselected_file=None):
+    docs_win = ctk.CTkToplevel(master)
+    docs_win.title("Docs Conversions")
+    docs_win.geometry("300x300")
+    docs_win.configure(fg_color=BG)
+    # Center the window
+    docs_win.update_idletasks()
+    screen_width = docs_win.winfo_screenwidth()
+    screen_height = docs_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (300 // 2)
+    docs_win.geometry(f"300x300+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            docs_win.after(250, lambda: docs_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for docs window: {e}")
+    # Make it transient and grab set to stay on top
+    docs_win.transient(master)
+    docs_win.grab_set()
+
+    label = ctk.CTkLabel(docs_win, text="Docs Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    base_filetypes = "*.txt;*.pdf;*.docx;*.html;*.md;*.odt"
+    if ENVELOPE_SUPPORT:
+        base_filetypes += ";*.rtf"
+    filetypes = [("Docs files", base_filetypes)]
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select Docs File", filetypes=filetypes)
+        if fp:
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(docs_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(docs_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    combo_values = ["TXT", "DOCX 📨", "HTML 📨", "MD", "ODT 📨"]
+    if ENVELOPE_SUPPORT:
+        combo_values.append("RTF 📨")
+    target_var = ctk.StringVar(value="TXT")
+    combo = ctk.CTkComboBox(docs_win, values=combo_values, variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    progress_bar = ctk.CTkProgressBar(docs_win, width=250, mode="indeterminate")
+    # Initially not packed
+
+    if preselected_file:
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target_display = target_var.get()
+        target = target_display.split(" 📨")[0].upper()
+        input_ext = os.path.splitext(fp)[1].lower()[1:]
+        if target.lower() == input_ext:
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+
+        def conversion_thread():
+            try:
+                new_file_path = convert_docs(fp, target)
+                docs_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
+            except FileNotFoundError:
+                docs_win.after(0, lambda: messagebox.showerror("Error", "LibreOffice required for this conversion. Please install LibreOffice."))
+            except Exception as e:
+                docs_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                docs_win.after(0, progress_bar.stop)
+                docs_win.after(0, progress_bar.pack_forget)
+                docs_win.after(0, lambda: btn_convert.configure(state="normal"))
+
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(docs_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+
+def open_presentations_window(master, preselected_file=None):
+    pres_win = ctk.CTkToplevel(master)
+    pres_win.title("Presentations Conversions")
+    pres_win.geometry("300x300")
+    pres_win.configure(fg_color=BG)
+    # Center the window
+    pres_win.update_idletasks()
+    screen_width = pres_win.winfo_screenwidth()
+    screen_height = pres_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (300 // 2)
+    pres_win.geometry(f"300x300+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            pres_win.after(250, lambda: pres_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for presentations window: {e}")
+    # Make it transient and grab set to stay on top
+    pres_win.transient(master)
+    pres_win.grab_set()
+
+    label = ctk.CTkLabel(pres_win, text="Presentations Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select Presentation File", filetypes=[("Presentation files", "*.pptx;*.odp")])
+        if fp:
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(pres_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(pres_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    combo_values = ["PPTX 📨", "PDF 📨", "TXT", "DOCX 📨", "ODP 📨"]
+    target_var = ctk.StringVar(value="PDF 📨")
+    combo = ctk.CTkComboBox(pres_win, values=combo_values, variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    progress_bar = ctk.CTkProgressBar(pres_win, width=250, mode="indeterminate")
+    # Initially not packed
+
+    if preselected_file:
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target_display = target_var.get()
+        target = target_display.split(" 📨")[0].upper()
+        input_ext = os.path.splitext(fp)[1].lower()[1:]
+        if target.lower() == input_ext:
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+
+        def conversion_thread():
+            try:
+                new_file_path = convert_presentations(fp, target)
+                pres_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
+            except FileNotFoundError:
+                pres_win.after(0, lambda: messagebox.showerror("Error", "LibreOffice required for this conversion. Please install LibreOffice."))
+            except Exception as e:
+                pres_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                pres_win.after(0, progress_bar.stop)
+                pres_win.after(0, progress_bar.pack_forget)
+                pres_win.after(0, lambda: btn_convert.configure(state="normal"))
+
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(pres_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+
+def open_images_window(master, preselected_file=None):
+    img_win = ctk.CTkToplevel(master)
+    img_win.title("Images Conversions")
+    img_win.geometry("300x490")
+    img_win.configure(fg_color=BG)
+    # Center the window
+    img_win.update_idletasks()
+    screen_width = img_win.winfo_screenwidth()
+    screen_height = img_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (490 // 2)
+    img_win.geometry(f"300x490+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            img_win.after(250, lambda: img_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for images window: {e}")
+    # Make it transient and grab set to stay on top
+    img_win.transient(master)
+    img_win.grab_set()
+
+    label = ctk.CTkLabel(img_win, text="Images Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select Image File", filetypes=[("Image files", "*.jpg;*.jpeg;*.png;*.webp;*.avif;*.ico;*.bmp;*.gif;*.tiff")])
+        if fp:
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(img_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(img_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    target_var = ctk.StringVar(value="PNG")
+    combo = ctk.CTkComboBox(img_win, values=["PNG", "JPG", "WEBP", "AVIF", "ICO", "BMP", "GIF", "TIFF"], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    # encoder effort; remembered for the next conversion
+    preset_var = ctk.StringVar(value=SETTINGS.get('image_preset') or "balanced")
+    preset_combo = ctk.CTkComboBox(img_win, values=list(IMAGE_PRESETS), variable=preset_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    preset_combo.pack(pady=5)
+
+    ico_frame = ctk.CTkFrame(img_win, fg_color=BG)
+    ico_label = ctk.CTkLabel(ico_frame, text="Select ICO sizes:", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    ico_label.pack(pady=10)
+    sizes = ICO_SIZES
+    check_vars = [ctk.BooleanVar(value=True) for _ in sizes]  # Default checked
+    for i, s in enumerate(sizes):
+        cb = ctk.CTkCheckBox(ico_frame, text=f"{s}x{s}", variable=check_vars[i])
+        cb.pack(anchor="w")
+
+    def update_ico_frame(event=None):
+        if target_var.get() == "ICO":
+            ico_frame.pack(pady=5)
+            img_win.geometry("300x490")
+        else:
+            ico_frame.pack_forget()
+            img_win.geometry("300x340")
+        img_win.update_idletasks()
+
+    combo.configure(command=lambda choice: update_ico_frame())
+
+    progress_bar = ctk.CTkProgressBar(img_win, width=250, mode="indeterminate")
+    # Initially not packed
+
+    if preselected_file:
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target = target_var.get().upper()
+        input_ext = os.path.splitext(fp)[1].lower()[1:]
+        if input_ext == "jpeg":
+            input_ext = "jpg"
+        if target.lower() == input_ext or (target == "JPG" and input_ext in ["jpg", "jpeg"]):
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+        preset = preset_var.get()
+        if preset != SETTINGS.get('image_preset'):
+            SETTINGS['image_preset'] = preset
+            save_settings(SETTINGS)
+
+        def conversion_thread():
+            try:
+                selected_sizes = None
+                if target == "ICO":
+                    selected_sizes = [sizes[i] for i, v in enumerate(check_vars) if v.get()]
+                    if not selected_sizes:
+                        img_win.after(0, lambda: messagebox.showerror("Error", "Select at least one size for ICO"))
+                        return
+                new_file_path = convert_images(fp, target, selected_sizes, preset)
+                img_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
+            except Exception as e:
+                img_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                img_win.after(0, progress_bar.stop)
+                img_win.after(0, progress_bar.pack_forget)
+                img_win.after(0, lambda: btn_convert.configure(state="normal"))
+
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(img_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+
+    # Initially hide ico_frame if not ICO
+    update_ico_frame()
+
+def open_archive_window(master, preselected_file=None):
+    arch_win = ctk.CTkToplevel(master)
+    arch_win.title("Archive Conversions")
+    arch_win.geometry("300x300")
+    arch_win.configure(fg_color=BG)
+    # Center the window
+    arch_win.update_idletasks()
+    screen_width = arch_win.winfo_screenwidth()
+    screen_height = arch_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (300 // 2)
+    arch_win.geometry(f"300x300+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            arch_win.after(250, lambda: arch_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for archive window: {e}")
+    # Make it transient and grab set to stay on top
+    arch_win.transient(master)
+    arch_win.grab_set()
+
+    label = ctk.CTkLabel(arch_win, text="Archive Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select Archive File", filetypes=[("Archive files", "*.zip;*.7z;*.tar;*.tar.gz;*.tgz;*.tar.bz2;*.tbz2")])
+        if fp:
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(arch_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(arch_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    target_var = ctk.StringVar(value="ZIP")
+    combo = ctk.CTkComboBox(arch_win, values=["ZIP", "7Z", "TAR", "TGZ", "TBZ2"], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    progress_bar = ctk.CTkProgressBar(arch_win, width=250, mode="indeterminate")
+    # Initially not packed
+
+    if preselected_file:
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target = target_var.get().upper()
+        try:
+            input_type = get_archive_type(fp)
+        except ValueError:
+            messagebox.showerror("Error", "Unsupported input format")
+            return
+        if target.lower() == input_type:
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+
+        def conversion_thread():
+            try:
+                new_file_path = convert_archive(fp, target)
+                arch_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
+            except Exception as e:
+                arch_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                arch_win.after(0, progress_bar.stop)
+                arch_win.after(0, progress_bar.pack_forget)
+                arch_win.after(0, lambda: btn_convert.configure(state="normal"))
+
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(arch_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+
+def open_spreadsheets_window(master, preselected_file=None):
+    spreadsheets_win = ctk.CTkToplevel(master)
+    spreadsheets_win.title("Spreadsheets Conversions")
+    spreadsheets_win.geometry("300x300")
+    spreadsheets_win.configure(fg_color=BG)
+    # Center the window
+    spreadsheets_win.update_idletasks()
+    screen_width = spreadsheets_win.winfo_screenwidth()
+    screen_height = spreadsheets_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (300 // 2)
+    spreadsheets_win.geometry(f"300x300+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            spreadsheets_win.after(250, lambda: spreadsheets_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for spreadsheets window: {e}")
+    # Make it transient and grab set to stay on top
+    spreadsheets_win.transient(master)
+    spreadsheets_win.grab_set()
+
+    label = ctk.CTkLabel(spreadsheets_win, text="Spreadsheets Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select Spreadsheet File", filetypes=[("Spreadsheet files", "*.xlsx;*.csv;*.ods")])
+        if fp:
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(spreadsheets_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(spreadsheets_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    combo_values = ["XLSX 📨", "CSV", "ODS 📨"]
+    target_var = ctk.StringVar(value="XLSX 📨")
+    combo = ctk.CTkComboBox(spreadsheets_win, values=combo_values, variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    progress_bar = ctk.CTkProgressBar(spreadsheets_win, width=250, mode="indeterminate")
+    # Initially not packed
+
+    if preselected_file:
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target_display = target_var.get()
+        target = target_display.split(" 📨")[0].upper()
+        input_ext = os.path.splitext(fp)[1].lower()[1:]
+        if target.lower() == input_ext:
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+
+        def conversion_thread():
+            try:
+                new_file_path = convert_spreadsheets(fp, target)
+                spreadsheets_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {format_result(new_file_path)}"))
+            except FileNotFoundError:
+                spreadsheets_win.after(0, lambda: messagebox.showerror("Error", "LibreOffice required for this conversion. Please install LibreOffice."))
+            except Exception as e:
+                spreadsheets_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                spreadsheets_win.after(0, progress_bar.stop)
+                spreadsheets_win.after(0, progress_bar.pack_forget)
+                spreadsheets_win.after(0, lambda: btn_convert.configure(state="normal"))
+
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(spreadsheets_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+
+def open_3d_window(master, preselected_file=None):
+    if not TRIMESH_SUPPORT:
+        messagebox.showerror("Error", "trimesh library not installed. Please install trimesh to enable 3D file support.")
+        return
+
+    threed_win = ctk.CTkToplevel(master)
+    threed_win.title("3D Model Conversions")
+    threed_win.geometry("300x300")
+    threed_win.configure(fg_color=BG)
+    # Center the window
+    threed_win.update_idletasks()
+    screen_width = threed_win.winfo_screenwidth()
+    screen_height = threed_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (300 // 2)
+    threed_win.geometry(f"300x300+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            threed_win.after(250, lambda: threed_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for 3D window: {e}")
+    # Make it transient and grab set to stay on top
+    threed_win.transient(master)
+    threed_win.grab_set()
+
+    label = ctk.CTkLabel(threed_win, text="3D Model Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select 3D File", filetypes=[("3D files", "*.obj;*.stl;*.ply;*.fbx;*.glb")])
+        if fp:
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(threed_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(threed_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    target_var = ctk.StringVar(value="OBJ")
+    combo = ctk.CTkComboBox(threed_win, values=["OBJ", "STL", "PLY", "FBX", "GLB"], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    progress_bar = ctk.CTkProgressBar(threed_win, width=250, mode="indeterminate")
+    # Initially not packed
+
+    if preselected_file:
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target = target_var.get().upper()
+        input_ext = os.path.splitext(fp)[1].lower()[1:]
+        if target.lower() == input_ext:
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+
+        def conversion_thread():
+            try:
+                new_file_path = convert_3d(fp, target)
+                threed_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {new_file_path}"))
+            except Exception as e:
+                threed_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                threed_win.after(0, progress_bar.stop)
+                threed_win.after(0, progress_bar.pack_forget)
+                threed_win.after(0, lambda: btn_convert.configure(state="normal"))
+
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(threed_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+
+def open_media_window(master, preselected_file=None):
+    media_win = ctk.CTkToplevel(master)
+    media_win.title("Media Conversions")
+    media_win.geometry("300x380")
+    media_win.configure(fg_color=BG)
+    # Center the window
+    media_win.update_idletasks()
+    screen_width = media_win.winfo_screenwidth()
+    screen_height = media_win.winfo_screenheight()
+    x = (screen_width // 2) - (300 // 2)
+    y = (screen_height // 2) - (380 // 2)
+    media_win.geometry(f"300x380+{x}+{y}")
+    # Set icon
+    if os.path.exists(APP_ICON_PATH):
+        try:
+            media_win.after(250, lambda: media_win.iconbitmap(APP_ICON_PATH))
+        except Exception as e:
+            print(f"Could not set icon for media window: {e}")
+    # Make it transient and grab set to stay on top
+    media_win.transient(master)
+    media_win.grab_set()
+
+    label = ctk.CTkLabel(media_win, text="Media Converter", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 12))
+    label.pack(pady=10)
+
+    file_path_var = ctk.StringVar(value="")
+
+    audio_formats = ["mp3", "wav", "ogg", "flac", "aac", "m4a"]
+    video_formats = ["mp4", "avi", "mkv", "mov"]
+    media_filetypes = [("Media files", "*." + ";*.".join(audio_formats + video_formats))]
+
+    def select_file():
+        fp = filedialog.askopenfilename(title="Select Media File", filetypes=media_filetypes)
+        if fp:
+            input_ext = os.path.splitext(fp)[1].lower()[1:]
+            if input_ext in audio_formats:
+                combo.configure(values=[fmt.upper() for fmt in audio_formats])
+                target_var.set("MP3")
+            elif input_ext in video_formats:
+                video_values = [fmt.upper() for fmt in video_formats]
+                audio_values = [fmt.upper() + " (extract audio)" for fmt in audio_formats]
+                combo.configure(values=video_values + audio_values)
+                target_var.set("MP4")
+            else:
+                messagebox.showerror("Error", "Unsupported media format")
+                return
+            file_path_var.set(fp)
+            file_label.configure(text=os.path.basename(fp))
+
+    btn_select = ctk.CTkButton(media_win, text="Select File", command=select_file, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_select.pack(pady=5)
+
+    file_label = ctk.CTkLabel(media_win, text="No file selected", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    file_label.pack(pady=5)
+
+    target_var = ctk.StringVar(value="")
+    combo = ctk.CTkComboBox(media_win, values=[], variable=target_var, font=(FONT_FAMILY_REGULAR, 10), width=250)
+    combo.pack(pady=5)
+
+    progress_bar = ctk.CTkProgressBar(media_win, width=250, mode="indeterminate")
+    status_label = ctk.CTkLabel(media_win, text="", fg_color=BG, text_color=TEXT, font=(FONT_FAMILY_REGULAR, 10))
+    # Initially not packed
+    cancel_event = threading.Event()
+
+    def show_progress(progress):
+        if not media_win.winfo_exists():
+            return
+        if progress['percent'] is not None:
+            # switch from the spinner to real progress once ffmpeg reports some
+            if progress_bar.cget("mode") != "determinate":
+                progress_bar.stop()
+                progress_bar.configure(mode="determinate")
+            progress_bar.set(progress['percent'] / 100)
+        status_label.configure(text=format_media_progress(progress))
+
+    def cancel_conversion():
+        cancel_event.set()
+        btn_cancel.configure(state="disabled")
+
+    def close_window():
+        # don't leave ffmpeg running (or half-written files behind) when the window goes away
+        cancel_event.set()
+        media_win.destroy()
+
+    media_win.protocol("WM_DELETE_WINDOW", close_window)
+
+    if preselected_file:
+        input_ext = os.path.splitext(preselected_file)[1].lower()[1:]
+        if input_ext in audio_formats:
+            combo.configure(values=[fmt.upper() for fmt in audio_formats])
+            target_var.set("MP3")
+        elif input_ext in video_formats:
+            video_values = [fmt.upper() for fmt in video_formats]
+            audio_values = [fmt.upper() + " (extract audio)" for fmt in audio_formats]
+            combo.configure(values=video_values + audio_values)
+            target_var.set("MP4")
+        file_path_var.set(preselected_file)
+        file_label.configure(text=os.path.basename(preselected_file))
+
+    def do_convert():
+        fp = file_path_var.get()
+        if not fp:
+            messagebox.showerror("Error", "No file selected")
+            return
+        target = target_var.get()
+        input_ext = os.path.splitext(fp)[1].lower()[1:]
+        is_extract = "(extract audio)" in target
+        target_ext = target.split(" ")[0].lower()
+        if target_ext == input_ext:
+            messagebox.showwarning("Warning", "Input and output formats are the same")
+            return
+
+        def on_progress(progress):
+            if not cancel_event.is_set():
+                media_win.after(0, lambda: show_progress(progress))
+
+        def finish():
+            if not media_win.winfo_exists():
+                return
+            progress_bar.stop()
+            progress_bar.pack_forget()
+            status_label.pack_forget()
+            btn_cancel.pack_forget()
+            btn_convert.configure(state="normal")
+
+        def conversion_thread():
+            try:
+                new_file_path = convert_media(fp, target, on_progress, cancel_event)
+                media_win.after(0, lambda: messagebox.showinfo("Success", f"File converted to: {format_result(new_file_path)}"))
+            except ConversionCancelled:
+                if media_win.winfo_exists():
+                    media_win.after(0, lambda: messagebox.showinfo("Cancelled", "Conversion cancelled"))
+            except Exception as e:
+                if media_win.winfo_exists():
+                    media_win.after(0, lambda e=e: messagebox.showerror("Error", f"Conversion failed: {str(e)}"))
+            finally:
+                if media_win.winfo_exists():
+                    media_win.after(0, finish)
+
+        cancel_event.clear()
+        progress_bar.configure(mode="indeterminate")
+        progress_bar.pack(pady=5)
+        progress_bar.start()
+        status_label.configure(text="Starting...")
+        status_label.pack(pady=2)
+        btn_cancel.configure(state="normal")
+        btn_cancel.pack(pady=5)
+        btn_convert.configure(state="disabled")
+        thread = threading.Thread(target=conversion_thread)
+        thread.start()
+
+    btn_convert = ctk.CTkButton(media_win, text="Convert", command=do_convert, fg_color=ACCENT, text_color=BG, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    btn_convert.pack(pady=5)
+    btn_cancel = ctk.CTkButton(media_win, text="Cancel", command=cancel_conversion, fg_color=BG, text_color=ACCENT, border_color=ACCENT, border_width=1, hover_color=ACCENT_DIM, corner_radius=20, width=250, font=(FONT_FAMILY_SEMIBOLD, 10))
+    # Shown only while converting
+
+# Extend the app class with open methods
+class WormholeApp(WormholeApp):
+    def open_docs_window(self, preselected_file=None):
+        open_docs_window(self, preselected_file)
+
+    def open_presentations_window(self, preselected_file=None):
+        open_presentations_window(self, preselected_file)
+
+    def open_images_window(self, preselected_file=None):
+        open_images_window(self, preselected_file)
+
+    def open_archive_window(self, preselected_file=None):
+        open_archive_window(self, preselected_file)
+
+    def open_spreadsheets_window(self, preselected_file=None):
+        open_spreadsheets_window(self, preselected_file)
+
+    def open_3d_window(self, preselected_file=None):
+        open_3d_window(self, preselected_file)
+
+    def open_media_window(self, preselected_file=None):
+        open_media_window(self, preselected_file)
+
+def run(argv):
+    if argv and argv[0] == "--register":
+        app = WormholeApp()  # Init to access methods
+        app.register_context_menu()
+        return 0
+    elif argv and argv[0] == "--unregister":
+        app = WormholeApp()
+        app.unregister_context_menu()
+        return 0
+    app = WormholeApp()
+    app.mainloop()
+    return 0